@@ -0,0 +1,174 @@
+"""Pronunciación grabada de letras, sílabas y palabras.
+
+Los clips son archivos locales en datos/audio/, uno por texto y con el texto como nombre
+("a.ogg", "ca.wav", "casa.ogg"); si existen los dos formatos se prefiere OGG. El directorio
+se examina una sola vez, en el primer uso.
+
+Ningún clic espera al disco: reproducir un clip que ya está decodificado es inmediato, y
+todo lo demás (iniciar el mezclador, examinar el directorio, decodificar, abrir un archivo
+para streaming) se hace en un hilo propio. Los clips pequeños se decodifican a
+pygame.mixer.Sound y se guardan en una caché LRU acotada por memoria; los grandes no se
+decodifican enteros, sino que se reproducen en streaming con pygame.mixer.music.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from linguistica import normalizar
+
+RUTA_AUDIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "audio")
+EXTENSIONES = (".ogg", ".wav")  # En orden de preferencia
+
+
+class SistemaAudio:
+    """Reproduce y precarga clips por texto; sin mezclador o sin clips, todo es una operación vacía"""
+
+    def __init__(self, directorio=RUTA_AUDIO, memoria_maxima=16 << 20, limite_streaming=512 << 10, activo=True):
+        self.directorio = directorio
+        self.memoria_maxima = memoria_maxima  # Bytes de muestras decodificadas en la caché
+        self.limite_streaming = limite_streaming  # Archivos mayores se reproducen sin decodificar
+        self.activo = activo
+        self.disponible = None  # None hasta intentar iniciar el mezclador
+        self.clips = None  # texto -> (ruta, bytes en disco), leído en el primer uso
+        self.sonidos = OrderedDict()  # texto -> (Sound, bytes decodificados), del menos al más reciente
+        self.memoria = 0
+        self.pendientes = set()  # Textos que se están decodificando
+        self.aciertos = 0
+        self.fallos = 0
+        self.lock = threading.Lock()
+        self._ejecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio") if activo else None
+
+    # Hilo de audio
+    def _preparar(self):
+        """Inicia el mezclador y lee el índice de clips; devuelve False si no hay audio"""
+        if self.disponible is None:
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+                self.disponible = True
+            except pygame.error:
+                self.disponible = False
+            clips = {}
+            try:
+                with os.scandir(self.directorio) as entradas:
+                    for entrada in entradas:
+                        nombre, extension = os.path.splitext(entrada.name)
+                        if extension.lower() not in EXTENSIONES or not entrada.is_file():
+                            continue
+                        texto = normalizar(nombre)
+                        previo = clips.get(texto)
+                        if previo is None or EXTENSIONES.index(extension.lower()) < previo[2]:
+                            clips[texto] = (entrada.path, entrada.stat().st_size, EXTENSIONES.index(extension.lower()))
+            except OSError:
+                pass  # Sin directorio de audio: el juego funciona en silencio
+            self.clips = {texto: (ruta, tamano) for texto, (ruta, tamano, _) in clips.items()}
+        return self.disponible and bool(self.clips)
+
+    def _decodificar(self, texto):
+        """Decodifica un clip pequeño y lo guarda en la caché; devuelve el Sound o None"""
+        clip = self.clips.get(texto)
+        if clip is None or clip[1] > self.limite_streaming:
+            return None
+        try:
+            sonido = pygame.mixer.Sound(clip[0])
+        except pygame.error:
+            return None
+        frecuencia, formato, canales = pygame.mixer.get_init()
+        tamano = int(sonido.get_length() * frecuencia) * canales * (abs(formato) // 8)
+        with self.lock:
+            if texto in self.sonidos:
+                return self.sonidos[texto][0]
+            self.sonidos[texto] = (sonido, tamano)
+            self.memoria += tamano
+            # Expulsar los clips usados hace más tiempo, pero nunca el recién decodificado
+            while self.memoria > self.memoria_maxima and len(self.sonidos) > 1:
+                _, (_, liberado) = self.sonidos.popitem(last=False)
+                self.memoria -= liberado
+        return sonido
+
+    def _cargar(self, textos):
+        if not self._preparar():
+            return
+        for texto in textos:
+            try:
+                with self.lock:
+                    if texto in self.sonidos:
+                        continue
+                self._decodificar(texto)
+            finally:
+                with self.lock:
+                    self.pendientes.discard(texto)
+
+    def _reproducir_desde_disco(self, texto):
+        if not self._preparar():
+            return
+        clip = self.clips.get(texto)
+        if clip is None:
+            return
+        if clip[1] > self.limite_streaming:
+            try:
+                pygame.mixer.music.load(clip[0])
+                pygame.mixer.music.play()
+            except pygame.error:
+                pass
+            return
+        with self.lock:
+            entrada = self.sonidos.get(texto)
+        sonido = entrada[0] if entrada is not None else self._decodificar(texto)
+        if sonido is not None:
+            sonido.play()
+
+    # Interfaz (no bloquea)
+    def precargar(self, textos):
+        """Decodifica en segundo plano los clips de estos textos que aún no están en la caché"""
+        if not self.activo:
+            return
+        with self.lock:
+            nuevos = [texto for texto in dict.fromkeys(map(normalizar, textos))
+                      if texto not in self.sonidos and texto not in self.pendientes]
+            self.pendientes.update(nuevos)
+        if nuevos:
+            self._ejecutor.submit(self._cargar, nuevos)
+
+    def reproducir(self, texto):
+        """Reproduce el clip del texto: al momento si está decodificado, si no desde el hilo de audio"""
+        if not self.activo:
+            return
+        texto = normalizar(texto)
+        with self.lock:
+            entrada = self.sonidos.get(texto)
+            if entrada is not None:
+                self.aciertos += 1
+                self.sonidos.move_to_end(texto)
+            else:
+                self.fallos += 1
+        if entrada is not None:
+            entrada[0].play()
+        else:
+            self._ejecutor.submit(self._reproducir_desde_disco, texto)
+
+    def esperar(self):
+        """Espera a que el hilo de audio termine lo encolado hasta ahora"""
+        if self.activo:
+            self._ejecutor.submit(lambda: None).result()
+
+    def estadisticas(self):
+        with self.lock:
+            total = self.aciertos + self.fallos
+            return {
+                "clips": len(self.clips) if self.clips is not None else None,
+                "decodificados": len(self.sonidos),
+                "memoria": self.memoria,
+                "memoria_maxima": self.memoria_maxima,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0
+            }
+
+    def cerrar(self):
+        if self.activo:
+            self._ejecutor.shutdown(wait=True, cancel_futures=True)
+            self.activo = False
@@ -0,0 +1,318 @@
+"""Banco de pruebas de rendimiento: generación de actividades, verificación, controles y cuadros.
+
+Cada caso se mide en ops/s (la mejor de muchas repeticiones cortas), memoria pico por
+operación (tracemalloc) y superficies de pygame creadas por operación. Los casos se miden
+intercalados, un poco en cada ronda, para que una fase lenta de la máquina no caiga entera
+sobre uno solo. Los casos con estado (el planificador de repaso de generar_actividad)
+empiezan cada repetición desde cero con la misma semilla, para que todas midan el mismo trabajo.
+
+Los resultados se pueden guardar como referencia JSON y compararse con una referencia
+anterior. La velocidad también varía de un proceso a otro (sobre todo en los casos de menos
+de un microsegundo), así que el banco se ejecuta en procesos nuevos y un caso que empeora más
+que el umbral se confirma con hasta REMEDICIONES ejecuciones más: basta una dentro del umbral
+para descartarlo. Si se confirma, el programa termina con código 1.
+
+Uso:
+    python benchmarks.py --guardar referencia.json
+    python benchmarks.py --comparar referencia.json --umbral 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+# El controlador de video "dummy" debe fijarse antes de que se importe pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from juego import (AplicacionAlfabetizacion, Actividad, AsociacionRima, RegistroMuestreo, SUPERFICIES,
+                   UnionLetras, UnionSilabas)
+
+ESTRATEGIAS = {"letras": UnionLetras, "silabas": UnionSilabas, "rimas": AsociacionRima}
+SEMILLA = 1234
+SEGUNDOS = 1.0  # Tiempo de medición por caso, repartido entre las rondas
+RONDAS = 10  # Vueltas al banco completo; cada caso se mide un poco en cada una
+REPETICION = 0.005  # Duración mínima de cada repetición medida
+PROCESOS = 1  # Procesos nuevos en los que se ejecuta el banco
+UMBRAL = 0.15
+REMEDICIONES = 3  # Ejecuciones nuevas con las que se confirma un caso que parece empeorar
+
+
+class Caso:
+    """Un caso del banco: una función sin argumentos y, si tiene estado, cómo reiniciarlo
+
+    Acumula la repetición más rápida de todas las rondas: en una máquina compartida la mayoría
+    salen frenadas y las fases lentas duran segundos, pero la mejor de cientos de repeticiones
+    repartidas por toda la ejecución apenas varía entre ejecuciones.
+    """
+
+    def __init__(self, nombre, funcion, reiniciar=None):
+        self.nombre = nombre
+        self.funcion = funcion
+        self.reiniciar = reiniciar or (lambda: None)
+        self.llamadas = None
+        self.mejor = float("inf")
+        self.llamadas_medidas = 0
+        self.superficies = 0
+
+    def _repetir(self):
+        # reiniciar queda fuera del tiempo medido, para que todas las repeticiones partan del mismo estado
+        self.reiniciar()
+        inicio = time.perf_counter()
+        for _ in range(self.llamadas):
+            self.funcion()
+        return time.perf_counter() - inicio
+
+    def calibrar(self, repeticion=REPETICION):
+        """Calienta cachés y fija cuántas llamadas caben en una repetición (la mejor de tres, por el ruido)"""
+        self.reiniciar()
+        self.funcion()
+        self.llamadas = 1
+        while min(self._repetir() for _ in range(3)) < repeticion and self.llamadas < 1 << 20:
+            self.llamadas *= 2
+
+    def medir(self, segundos):
+        """Repite durante los segundos dados (al menos una vez) y guarda la mejor repetición"""
+        superficies_antes = SUPERFICIES.total
+        fin = time.perf_counter() + segundos
+        while True:
+            self.mejor = min(self.mejor, self._repetir() / self.llamadas)
+            self.llamadas_medidas += self.llamadas
+            if time.perf_counter() >= fin:
+                break
+        self.superficies += SUPERFICIES.total - superficies_antes
+
+    def memoria(self, muestras=20):
+        """Memoria pico media por llamada, medida aparte porque tracemalloc frena la ejecución"""
+        self.reiniciar()
+        tracemalloc.start()
+        pico = 0
+        for _ in range(muestras):
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            self.funcion()
+            pico += tracemalloc.get_traced_memory()[1] - base
+        tracemalloc.stop()
+        return pico / muestras
+
+    def resultado(self, bytes_pico):
+        return {
+            "ops_por_segundo": 1.0 / self.mejor,
+            "us_por_op": self.mejor * 1e6,
+            "bytes_pico_por_op": bytes_pico,
+            "superficies_por_op": self.superficies / self.llamadas_medidas
+        }
+
+
+def casos(app):
+    """Genera (nombre, función, reiniciar o None) para cada caso del banco"""
+    for modo, clase in ESTRATEGIAS.items():
+        for nivel in (1, 2, 3):
+            # Estrategia nueva y sembrada en cada repetición: el planificador crece con cada palabra sacada
+            estrategia = [None]
+
+            def reiniciar(clase=clase, estrategia=estrategia):
+                random.seed(SEMILLA)
+                estrategia[0] = clase(RegistroMuestreo("benchmark", aleatorio=random.Random(SEMILLA)))
+
+            yield (f"generar_actividad/{modo}/nivel{nivel}",
+                   lambda e=estrategia, n=nivel: e[0].generar_actividad(n), reiniciar)
+
+    for modo, clase in ESTRATEGIAS.items():
+        actividad = Actividad(clase(RegistroMuestreo("benchmark")), 2)
+        solucion = actividad.datos["solucion"]
+        incorrecta = solucion[:1] if modo == "rimas" else solucion[::-1] + "x"
+
+        def verificar(actividad=actividad, respuesta=solucion):
+            actividad.intentos = 0
+            return actividad.verificar(respuesta)
+
+        def verificar_con_pista(actividad=actividad, respuesta=incorrecta):
+            actividad.intentos = 0
+            return actividad.verificar(respuesta)
+
+        yield f"verificar/{modo}/correcta", verificar, None
+        yield f"verificar/{modo}/incorrecta", verificar_con_pista, None
+
+    # Respuestas de la misma longitud en el modo letras: solo así se consulta el corpus de anagramas.
+    # "gato" y "gota" están en el corpus incluido; "toag" tiene sus letras pero no es una palabra
+    actividad = Actividad(UnionLetras(RegistroMuestreo("benchmark")), 2)
+    actividad.datos = {**actividad.datos, "solucion": "gato", "elementos": list("gato")}
+    for caso, respuesta in (("anagrama", "gota"), ("misma_longitud", "toag")):
+        def verificar_anagrama(respuesta=respuesta):
+            actividad.intentos = 0
+            return actividad.verificar(respuesta)
+
+        yield f"verificar/letras/{caso}", verificar_anagrama, None
+
+    # Los casos se miden intercalados: cada uno deja la aplicación como la necesita antes de medirse
+    for indice, modo in enumerate(ESTRATEGIAS):
+        app.seleccionar_modo(indice)
+        app.seleccionar_nivel(2)
+        app.iniciar_actividad()
+        # Cada caso devuelve a la reserva solo sus propios controles, nunca los guardados por otro caso
+        controles = [app.actividad_actual, [], []]
+        app.elementos_botones, app.checkboxes_rimas = [], []
+
+        def crear_botones(controles=controles):
+            app.actividad_actual, app.elementos_botones, app.checkboxes_rimas = controles
+            app.crear_botones_elementos()
+            controles[1:] = [app.elementos_botones, app.checkboxes_rimas]
+
+        yield f"crear_botones_elementos/{modo}", crear_botones, None
+
+    # Cuadros completos: dibujar_escena repinta toda la pantalla sin rectángulos sucios
+    def cuadro_menu():
+        app.estado = "menu"
+        app.mostrar_modal = False
+        app.dibujar_escena()
+
+    yield "cuadro/dibujar_menu", cuadro_menu, None
+
+    for indice, modo in enumerate(ESTRATEGIAS):
+        app.seleccionar_modo(indice)
+        app.seleccionar_nivel(2)
+        app.iniciar_actividad()
+        estado_juego = (app.actividad_actual, app.elementos_botones, app.checkboxes_rimas)
+        # Los controles guardados para el caso no deben volver a la reserva al preparar el siguiente modo
+        app.elementos_botones, app.checkboxes_rimas = [], []
+
+        def cuadro_juego(estado_juego=estado_juego, modal=False):
+            app.estado = "juego"
+            app.actividad_actual, app.elementos_botones, app.checkboxes_rimas = estado_juego
+            app.mostrar_modal = modal
+            app.mensaje_modal = "¡Felicidades! Has alcanzado 100 puntos."
+            app.dibujar_escena()
+
+        yield f"cuadro/dibujar_juego/{modo}", cuadro_juego, None
+        if modo == "letras":
+            yield "cuadro/dibujar_modal", lambda estado_juego=estado_juego: cuadro_juego(estado_juego, True), None
+
+
+def ejecutar(filtro=None, segundos=SEGUNDOS, rondas=RONDAS):
+    """Mide los casos en este proceso, intercalados en rondas"""
+    random.seed(SEMILLA)
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    try:
+        seleccion = [Caso(*caso) for caso in casos(app) if not filtro or filtro in caso[0]]
+        for caso in seleccion:
+            caso.calibrar()
+        for _ in range(rondas):
+            for caso in seleccion:
+                caso.medir(segundos / rondas)
+        return {caso.nombre: caso.resultado(caso.memoria()) for caso in seleccion}
+    finally:
+        app.cerrar()
+
+
+def ejecutar_en_procesos(filtro=None, segundos=SEGUNDOS, procesos=PROCESOS):
+    """Ejecuta el banco en procesos nuevos; devuelve {caso: [resultado de cada proceso]}"""
+    comando = [sys.executable, os.path.abspath(__file__), "--trabajador", "--segundos", str(segundos)]
+    if filtro:
+        comando += ["--filtro", filtro]
+    por_caso = {}
+    for _ in range(procesos):
+        salida = subprocess.run(comando, capture_output=True, text=True, check=True).stdout
+        # La última línea es el JSON; antes puede estar el saludo de pygame
+        for nombre, datos in json.loads(salida.splitlines()[-1]).items():
+            por_caso.setdefault(nombre, []).append(datos)
+    return por_caso
+
+
+def mediana(mediciones):
+    """Resultado del proceso con la mediana de ops/s (con un solo proceso, el suyo)"""
+    return sorted(mediciones, key=lambda datos: datos["ops_por_segundo"])[len(mediciones) // 2]
+
+
+def comparar(resultados, referencia, umbral):
+    """Devuelve {caso: motivo} de los casos que empeoran más que el umbral respecto a la referencia"""
+    regresiones = {}
+    for nombre, actual in resultados.items():
+        base = referencia.get(nombre)
+        if base is None:
+            continue
+        if actual["ops_por_segundo"] < base["ops_por_segundo"] * (1 - umbral):
+            regresiones[nombre] = (f"ops/s {base['ops_por_segundo']:.0f} -> {actual['ops_por_segundo']:.0f}")
+        elif actual["superficies_por_op"] > base["superficies_por_op"] * (1 + umbral) + 0.01:
+            regresiones[nombre] = (f"superficies/op {base['superficies_por_op']:.2f} -> "
+                                   f"{actual['superficies_por_op']:.2f}")
+    return regresiones
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Banco de pruebas de rendimiento del juego")
+    parser.add_argument("--filtro", default=None, help="solo los casos cuyo nombre contiene este texto")
+    parser.add_argument("--segundos", type=float, default=SEGUNDOS, help="tiempo de medición por caso y proceso, repartido entre las rondas")
+    parser.add_argument("--procesos", type=int, default=PROCESOS, help="procesos en los que se mide cada caso (se toma la mediana)")
+    parser.add_argument("--guardar", default=None, metavar="RUTA", help="guardar los resultados como referencia JSON")
+    parser.add_argument("--comparar", default=None, metavar="RUTA", help="comparar con una referencia JSON")
+    parser.add_argument("--umbral", type=float, default=UMBRAL,
+                        help="empeoramiento relativo tolerado antes de fallar (0.15 = 15%%)")
+    parser.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        print(json.dumps(ejecutar(args.filtro, args.segundos)))
+        return
+
+    referencia = {}
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as archivo:
+            referencia = json.load(archivo)["resultados"]
+
+    resultados = {nombre: mediana(mediciones)
+                  for nombre, mediciones in ejecutar_en_procesos(args.filtro, args.segundos, args.procesos).items()}
+
+    # Confirmar las regresiones aparentes: basta una ejecución nueva dentro del umbral para descartarlas.
+    # Se repite el banco con el mismo filtro porque un caso medido solo no rinde igual que en el banco
+    sospechosos = comparar(resultados, referencia, args.umbral)
+    for _ in range(REMEDICIONES if sospechosos else 0):
+        nuevos = ejecutar_en_procesos(args.filtro, args.segundos, 1)
+        for nombre in sospechosos:
+            if nuevos[nombre][0]["ops_por_segundo"] > resultados[nombre]["ops_por_segundo"]:
+                resultados[nombre] = nuevos[nombre][0]
+        sospechosos = comparar({nombre: resultados[nombre] for nombre in sospechosos}, referencia, args.umbral)
+        if not sospechosos:
+            break
+
+    print(f"{'caso':<40} {'ops/s':>12} {'µs/op':>10} {'KiB pico':>9} {'superf/op':>9}" +
+          (f" {'cambio':>8}" if referencia else ""))
+    for nombre, datos in resultados.items():
+        linea = (f"{nombre:<40} {datos['ops_por_segundo']:>12.0f} {datos['us_por_op']:>10.1f} "
+                 f"{datos['bytes_pico_por_op'] / 1024:>9.1f} {datos['superficies_por_op']:>9.2f}")
+        if nombre in referencia:
+            cambio = datos["ops_por_segundo"] / referencia[nombre]["ops_por_segundo"] - 1
+            linea += f" {cambio:>+8.1%}"
+        print(linea)
+
+    if args.guardar:
+        with open(args.guardar, "w", encoding="utf-8") as archivo:
+            json.dump({
+                "python": platform.python_version(),
+                "pygame": pygame.version.ver,
+                "maquina": platform.platform(),
+                "fecha": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "resultados": resultados
+            }, archivo, indent=2, ensure_ascii=False)
+        print(f"Referencia guardada en {args.guardar}")
+
+    if referencia:
+        regresiones = comparar(resultados, referencia, args.umbral)
+        if regresiones:
+            print(f"\nRegresiones (umbral {args.umbral:.0%}):")
+            for nombre, motivo in regresiones.items():
+                print(f"  {nombre}: {motivo}")
+            sys.exit(1)
+        print(f"\nSin regresiones (umbral {args.umbral:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,474 @@
+"""Corpus de palabras del juego.
+
+La fuente es un archivo TSV editable (datos/palabras.tsv) con una palabra por línea:
+
+    palabra <TAB> modos <TAB> sílabas <TAB> pista
+
+- modos: lista separada por comas de "modo:nivel" (letras, silabas, rimas) en los que la
+  palabra puede ser el objetivo de una actividad; vacío si solo se usa como opción o distractor.
+- sílabas: opcional, la palabra separada con guiones ("ma-ri-po-sa"); si se omite se calcula
+  con linguistica.silabear, así que solo hace falta para corregir casos excepcionales.
+- pista: texto opcional que completa "significa algo que puedes ...".
+
+La primera vez (o cuando cambia la fuente) se compila a un índice binario compacto que se
+carga con mmap. El índice agrupa las palabras en cubetas por nivel de cada modo, longitud,
+número de sílabas y núcleo de rima (ver linguistica.nucleo_rima), y guarda una tabla hash para
+buscar una palabra concreta, de modo que elegir o buscar una palabra, o encontrar sus rimas,
+cuesta O(1) sin importar el tamaño del corpus. Los anagramas (ver linguistica.firma_anagrama)
+tienen su propia tabla hash en el archivo: hay casi una firma por palabra, así que no se leen
+al abrir el índice como las cubetas, sino que se consultan en el mapa cuando se piden. Para
+encontrar palabras que suenan parecido (los distractores de las rimas) el índice incluye además
+un árbol BK sobre la clave fonética de cada palabra.
+"""
+import mmap
+import os
+import random
+import struct
+import threading
+import zlib
+from collections import namedtuple
+
+from linguistica import (SIN_TILDES, clave_fonetica, firma_anagrama, medidor_distancia, normalizar, nucleo_rima,
+                         silabear_corpus)
+
+RUTA_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "palabras.tsv")
+
+MAGIA = b"ALFC"
+VERSION = 6
+# magia, versión, registros, claves, postings, ranuras hash, tamaño y mtime de la fuente,
+# desplazamientos de las secciones (offsets, claves, postings, hash, textos, árbol BK),
+# ranuras de la tabla de anagramas y desplazamientos de sus secciones (postings y hash)
+CABECERA = struct.Struct("<4sHxxIIIIQQIIIIIIIII")
+ENTERO = struct.Struct("<I")
+CLAVE = struct.Struct("<IIH")
+RANURA_ANAGRAMA = struct.Struct("<III")  # crc32 de la firma, inicio en los postings, cantidad (0 = vacía)
+NODO_BK = struct.Struct("<III")  # primer hijo, siguiente hermano, distancia al padre
+SIN_NODO = 0xFFFFFFFF
+
+EntradaCorpus = namedtuple("EntradaCorpus", ["palabra", "silabas", "rima", "pista"])
+
+
+def clave(campo, valor):
+    """Nombre de una cubeta del índice, por ejemplo clave("letras", 2) -> "letras=2" """
+    return f"{campo}={valor}"
+
+
+def leer_fuente(ruta):
+    """Lee el TSV del corpus y devuelve las entradas con sus modos, sin duplicados"""
+    entradas = []
+    vistas = set()
+    with open(ruta, encoding="utf-8") as archivo:
+        for numero, linea in enumerate(archivo, 1):
+            linea = linea.rstrip("\n")
+            if not linea.strip() or linea.startswith("#"):
+                continue
+            campos = linea.split("\t") + ["", "", ""]
+            palabra = normalizar(campos[0])
+            if palabra in vistas:
+                continue
+            vistas.add(palabra)
+
+            modos = []
+            for modo in filter(None, (m.strip() for m in campos[1].split(","))):
+                nombre, _, nivel = modo.partition(":")
+                if not nivel.isdigit():
+                    raise ValueError(f"{ruta}:{numero}: modo mal formado '{modo}'")
+                modos.append((nombre, int(nivel)))
+
+            silabas = tuple(s for s in normalizar(campos[2]).split("-") if s)
+            if silabas and "".join(silabas) != palabra:
+                raise ValueError(f"{ruta}:{numero}: las sílabas '{campos[2]}' no forman '{palabra}'")
+            pista = campos[3].strip()
+            entradas.append((EntradaCorpus(palabra, silabas, nucleo_rima(palabra), pista), modos))
+
+    # Silabear de una vez todas las palabras que no traen la separación escrita
+    automaticas = silabear_corpus(entrada.palabra for entrada, _ in entradas if not entrada.silabas)
+    return [(entrada if entrada.silabas else entrada._replace(silabas=automaticas[entrada.palabra]), modos)
+            for entrada, modos in entradas]
+
+
+def _niveles_base_rima(entrada, modos, tamano_rimas):
+    """Niveles en los que la palabra puede ser la base de una actividad de rimas.
+
+    Además de los niveles marcados con "rimas:N" en la fuente, cualquier palabra objetivo
+    sirve como base en el nivel de su número de sílabas si tiene suficientes rimas
+    (el nivel N pide N + 1 palabras que rimen).
+    """
+    niveles = {nivel for nombre, nivel in modos if nombre == "rimas"}
+    nivel = min(3, len(entrada.silabas))
+    if tamano_rimas[entrada.rima] - 1 >= nivel + 1:
+        niveles.add(nivel)
+    return sorted(niveles)
+
+
+def _niveles_silabas(entrada, modos):
+    """Niveles del modo sílabas de una palabra objetivo: los marcados y el de su número de sílabas.
+
+    El nivel N usa palabras de N + 1 sílabas (cuatro o más en el nivel 3), de modo que el modo
+    sílabas aprovecha todo el corpus y no solo las palabras marcadas con "silabas:N".
+    """
+    niveles = {nivel for nombre, nivel in modos if nombre == "silabas"}
+    if len(entrada.silabas) >= 2:
+        niveles.add(min(3, len(entrada.silabas) - 1))
+    return sorted(niveles)
+
+
+def _arbol_bk(claves):
+    """Árbol BK sobre las claves fonéticas; el nodo i es la palabra i y la raíz es la 0.
+
+    Devuelve los nodos aplanados como (primer hijo, siguiente hermano, distancia al padre).
+    """
+    hijos = [{} for _ in claves]  # nodo -> {distancia: hijo}
+    for identificador in range(1, len(claves)):
+        distancia_a = medidor_distancia(claves[identificador])
+        nodo = 0
+        while True:
+            distancia = distancia_a(claves[nodo])
+            siguiente = hijos[nodo].get(distancia)
+            if siguiente is None:
+                hijos[nodo][distancia] = identificador
+                break
+            nodo = siguiente
+
+    nodos = [[SIN_NODO, SIN_NODO, 0] for _ in claves]
+    for nodo, por_distancia in enumerate(hijos):
+        anterior = None
+        for distancia, hijo in sorted(por_distancia.items()):
+            nodos[hijo][2] = distancia
+            if anterior is None:
+                nodos[nodo][0] = hijo
+            else:
+                nodos[anterior][1] = hijo
+            anterior = hijo
+    return nodos
+
+
+def _tabla_anagramas(entradas):
+    """Postings de las palabras agrupadas por firma de anagrama y tabla hash de las firmas.
+
+    La tabla usa direccionamiento abierto sobre el crc32 de la firma; cada ranura guarda
+    (crc32, inicio del grupo en los postings, cantidad), con cantidad 0 en las vacías.
+    """
+    grupos = {}
+    for identificador, (entrada, _) in enumerate(entradas):
+        grupos.setdefault(firma_anagrama(entrada.palabra), []).append(identificador)
+
+    ranuras = 1
+    while ranuras < len(grupos) * 2:
+        ranuras *= 2
+    tabla = [(0, 0, 0)] * ranuras
+    postings = []
+    for firma, ids in grupos.items():
+        codigo = zlib.crc32(firma.encode("utf-8"))
+        posicion = codigo & (ranuras - 1)
+        while tabla[posicion][2]:
+            posicion = (posicion + 1) & (ranuras - 1)
+        tabla[posicion] = (codigo, len(postings), len(ids))
+        postings.extend(ids)
+    return postings, tabla
+
+
+def compilar(ruta_fuente, ruta_indice):
+    """Compila el TSV del corpus al índice binario que luego se carga con mmap"""
+    entradas = leer_fuente(ruta_fuente)
+
+    # Índice hash de rimas: núcleo de rima -> palabras que lo comparten
+    tamano_rimas = {}
+    for entrada, _ in entradas:
+        tamano_rimas[entrada.rima] = tamano_rimas.get(entrada.rima, 0) + 1
+
+    cubetas = {}
+    for identificador, (entrada, modos) in enumerate(entradas):
+        claves = [clave(nombre, nivel) for nombre, nivel in modos if nombre != "silabas"]
+        claves.extend(clave("silabas", nivel) for nivel in _niveles_silabas(entrada, modos) if modos)
+        claves.append(clave("rima", entrada.rima))
+        if modos:
+            # Longitud y sílabas solo para palabras objetivo
+            claves.append(clave("longitud", len(entrada.palabra)))
+            claves.append(clave("nsilabas", len(entrada.silabas)))
+            claves.extend(clave("base_rima", nivel) for nivel in _niveles_base_rima(entrada, modos, tamano_rimas))
+        for nombre in claves:
+            cubetas.setdefault(nombre, []).append(identificador)
+
+    # Textos de cada registro: palabra, sílabas, rima, pista y clave fonética separados por tabuladores
+    foneticas = [clave_fonetica(entrada.palabra) for entrada, _ in entradas]
+    textos = bytearray()
+    offsets = []
+    for (entrada, _), fonetica in zip(entradas, foneticas):
+        offsets.append(len(textos))
+        textos += "\t".join((entrada.palabra, "-".join(entrada.silabas), entrada.rima, entrada.pista,
+                             fonetica)).encode("utf-8")
+    offsets.append(len(textos))
+    nodos_bk = _arbol_bk(foneticas)
+    postings_anagramas, tabla_anagramas = _tabla_anagramas(entradas)
+
+    claves_binarias = bytearray()
+    postings = []
+    for nombre in sorted(cubetas):
+        ids = cubetas[nombre]
+        nombre_bytes = nombre.encode("utf-8")
+        claves_binarias += CLAVE.pack(len(postings), len(ids), len(nombre_bytes)) + nombre_bytes
+        postings.extend(ids)
+
+    # Tabla hash de direccionamiento abierto: ranura = id + 1 (0 = vacía)
+    ranuras = 1
+    while ranuras < len(entradas) * 2:
+        ranuras *= 2
+    tabla = [0] * ranuras
+    for identificador, (entrada, _) in enumerate(entradas):
+        posicion = zlib.crc32(entrada.palabra.encode("utf-8")) & (ranuras - 1)
+        while tabla[posicion]:
+            posicion = (posicion + 1) & (ranuras - 1)
+        tabla[posicion] = identificador + 1
+
+    estado = os.stat(ruta_fuente)
+    inicio_offsets = CABECERA.size
+    inicio_claves = inicio_offsets + 4 * len(offsets)
+    inicio_postings = inicio_claves + len(claves_binarias)
+    inicio_postings += -inicio_postings % 4
+    inicio_hash = inicio_postings + 4 * len(postings)
+    inicio_bk = inicio_hash + 4 * ranuras
+    inicio_postings_anagramas = inicio_bk + NODO_BK.size * len(nodos_bk)
+    inicio_hash_anagramas = inicio_postings_anagramas + 4 * len(postings_anagramas)
+    inicio_textos = inicio_hash_anagramas + RANURA_ANAGRAMA.size * len(tabla_anagramas)
+
+    cabecera = CABECERA.pack(MAGIA, VERSION, len(entradas), len(cubetas), len(postings), ranuras,
+                             estado.st_size, estado.st_mtime_ns, inicio_offsets, inicio_claves,
+                             inicio_postings, inicio_hash, inicio_textos, inicio_bk,
+                             len(tabla_anagramas), inicio_postings_anagramas, inicio_hash_anagramas)
+    temporal = ruta_indice + ".tmp"
+    with open(temporal, "wb") as archivo:
+        archivo.write(cabecera)
+        archivo.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        archivo.write(claves_binarias)
+        archivo.write(b"\0" * (-(inicio_claves + len(claves_binarias)) % 4))
+        archivo.write(struct.pack(f"<{len(postings)}I", *postings))
+        archivo.write(struct.pack(f"<{ranuras}I", *tabla))
+        archivo.write(b"".join(NODO_BK.pack(*nodo) for nodo in nodos_bk))
+        archivo.write(struct.pack(f"<{len(postings_anagramas)}I", *postings_anagramas))
+        archivo.write(b"".join(RANURA_ANAGRAMA.pack(*ranura) for ranura in tabla_anagramas))
+        archivo.write(textos)
+    # Reemplazo atómico para que otro proceso nunca vea un índice a medio escribir
+    os.replace(temporal, ruta_indice)
+
+
+class Corpus:
+    """Índice compilado del corpus, leído directamente del archivo mapeado en memoria"""
+    def __init__(self, ruta_indice):
+        with open(ruta_indice, "rb") as archivo:
+            self.mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (magia, version, self.registros, num_claves, _, self.ranuras, self.tamano_fuente,
+         self.mtime_fuente, self._offsets, inicio_claves, self._postings, self._hash,
+         self._textos, self._bk, self.ranuras_anagramas, self._postings_anagramas,
+         self._hash_anagramas) = CABECERA.unpack_from(self.mapa, 0)
+        if magia != MAGIA or version != VERSION:
+            raise ValueError(f"{ruta_indice} no es un índice de corpus compatible")
+
+        # La tabla de cubetas es pequeña (una entrada por nivel de cada modo, longitud, número
+        # de sílabas o rima): se lee entera. Los anagramas se consultan en el mapa, sin leerlos
+        self.cubetas = {}
+        posicion = inicio_claves
+        for _ in range(num_claves):
+            inicio, cantidad, largo = CLAVE.unpack_from(self.mapa, posicion)
+            posicion += CLAVE.size
+            nombre = self.mapa[posicion:posicion + largo].decode("utf-8")
+            posicion += largo
+            self.cubetas[nombre] = (inicio, cantidad)
+
+    def __len__(self):
+        return self.registros
+
+    def _texto(self, identificador):
+        inicio, fin = struct.unpack_from("<II", self.mapa, self._offsets + 4 * identificador)
+        return self.mapa[self._textos + inicio:self._textos + fin].decode("utf-8")
+
+    def entrada(self, identificador):
+        """Decodifica el registro con el identificador dado"""
+        palabra, silabas, rima, pista, _ = self._texto(identificador).split("\t")
+        return EntradaCorpus(palabra, tuple(silabas.split("-")), rima, pista)
+
+    def tamano(self, nombre):
+        """Número de palabras en una cubeta (0 si no existe)"""
+        return self.cubetas.get(nombre, (0, 0))[1]
+
+    def identificador(self, nombre, posicion):
+        """Identificador de la palabra en la posición dada dentro de una cubeta"""
+        inicio, _ = self.cubetas[nombre]
+        return ENTERO.unpack_from(self.mapa, self._postings + 4 * (inicio + posicion))[0]
+
+    def elegir(self, nombre, aleatorio=random):
+        """Elige al azar una palabra de la cubeta en O(1)"""
+        cantidad = self.tamano(nombre)
+        if not cantidad:
+            raise KeyError(f"la cubeta '{nombre}' del corpus está vacía")
+        return self.entrada(self.identificador(nombre, aleatorio.randrange(cantidad)))
+
+    def muestra(self, nombre, cantidad, excluir=(), aleatorio=random):
+        """Elige hasta `cantidad` palabras distintas de la cubeta, sin incluir las de `excluir`"""
+        total = self.tamano(nombre)
+        vistas = set(excluir)
+        if total <= 2 * (cantidad + len(vistas)):
+            # Cubeta pequeña: se recorre entera en orden aleatorio
+            posiciones = aleatorio.sample(range(total), total)
+        else:
+            # Cubeta grande: muestreo con rechazo y un número acotado de intentos
+            posiciones = (aleatorio.randrange(total) for _ in range(4 * (cantidad + len(vistas))))
+
+        elegidas = []
+        for posicion in posiciones:
+            if len(elegidas) == cantidad:
+                break
+            entrada = self.entrada(self.identificador(nombre, posicion))
+            if entrada.palabra not in vistas:
+                vistas.add(entrada.palabra)
+                elegidas.append(entrada)
+        return elegidas
+
+    def rimas(self, entrada, cantidad, aleatorio=random):
+        """Hasta `cantidad` palabras que riman con la entrada, consultando su cubeta de rima"""
+        return self.muestra(clave("rima", entrada.rima), cantidad, excluir=(entrada.palabra,), aleatorio=aleatorio)
+
+    def no_riman(self, entrada, cantidad, nombre, excluir=(), aleatorio=random):
+        """Hasta `cantidad` palabras de la cubeta `nombre` que no riman con la entrada"""
+        candidatas = self.muestra(nombre, 2 * cantidad + 2, excluir=(entrada.palabra, *excluir), aleatorio=aleatorio)
+        return [candidata for candidata in candidatas if candidata.rima != entrada.rima][:cantidad]
+
+    def _palabra(self, identificador):
+        return self._texto(identificador).split("\t", 1)[0]
+
+    def _grupo_anagramas(self, firma):
+        """(inicio, cantidad) del grupo de palabras con esa firma en los postings de anagramas"""
+        codigo = zlib.crc32(firma.encode("utf-8"))
+        mascara = self.ranuras_anagramas - 1
+        posicion = codigo & mascara
+        while True:
+            codigo_ranura, inicio, cantidad = RANURA_ANAGRAMA.unpack_from(
+                self.mapa, self._hash_anagramas + RANURA_ANAGRAMA.size * posicion)
+            if not cantidad:
+                return 0, 0
+            if codigo_ranura == codigo:
+                # El crc32 puede coincidir por casualidad: se confirma con la primera palabra del grupo
+                if firma_anagrama(self._palabra(self._identificador_anagrama(inicio))) == firma:
+                    return inicio, cantidad
+            posicion = (posicion + 1) & mascara
+
+    def _identificador_anagrama(self, posicion):
+        return ENTERO.unpack_from(self.mapa, self._postings_anagramas + 4 * posicion)[0]
+
+    def cantidad_anagramas(self, palabra):
+        """Número de palabras del corpus con las mismas letras que `palabra`, incluida ella"""
+        return self._grupo_anagramas(firma_anagrama(palabra))[1]
+
+    def anagramas(self, palabra):
+        """Palabras del corpus con las mismas letras que `palabra` (sin contar tildes), incluida ella"""
+        inicio, cantidad = self._grupo_anagramas(firma_anagrama(palabra))
+        return [self.entrada(self._identificador_anagrama(posicion)) for posicion in range(inicio, inicio + cantidad)]
+
+    def forma_palabra(self, respuesta, letras):
+        """Indica si `respuesta` es una palabra del corpus que usa exactamente las letras dadas.
+
+        Las tildes no cuentan: con las letras de "mamá", "mama" es válida. `letras` puede ser
+        la solución de la actividad, ya que tiene las mismas letras que se ofrecieron.
+        """
+        respuesta = normalizar(respuesta)
+        firma = firma_anagrama(respuesta)
+        if firma != firma_anagrama(letras):
+            return False
+        sin_tildes = respuesta.translate(SIN_TILDES)
+        inicio, cantidad = self._grupo_anagramas(firma)
+        return any(self._palabra(self._identificador_anagrama(posicion)).translate(SIN_TILDES) == sin_tildes
+                   for posicion in range(inicio, inicio + cantidad))
+
+    def parecidas(self, palabra, minima, maxima, max_visitas=2000, aleatorio=random):
+        """Genera (identificador, distancia) de las palabras que suenan a una distancia de edición
+        entre `minima` y `maxima` de `palabra`, recorriendo el árbol BK en orden aleatorio.
+
+        La desigualdad triangular permite descartar cada rama cuya distancia al padre se aleja
+        más de `maxima` de la del padre a la palabra, así que solo se visita una fracción del
+        corpus; `max_visitas` acota además el coste de una consulta en corpus muy grandes.
+        """
+        if not self.registros:
+            return
+        distancia_a = medidor_distancia(clave_fonetica(palabra))
+        pendientes = [0]
+        while pendientes and max_visitas > 0:
+            max_visitas -= 1
+            nodo = pendientes.pop()
+            distancia = distancia_a(self._texto(nodo).rsplit("\t", 1)[1])
+            if minima <= distancia <= maxima:
+                yield nodo, distancia
+            hijos = []
+            hijo = NODO_BK.unpack_from(self.mapa, self._bk + NODO_BK.size * nodo)[0]
+            while hijo != SIN_NODO:
+                _, hermano, distancia_hijo = NODO_BK.unpack_from(self.mapa, self._bk + NODO_BK.size * hijo)
+                if distancia_hijo > distancia + maxima:
+                    break  # Los hermanos están ordenados por distancia
+                if distancia_hijo >= distancia - maxima:
+                    hijos.append(hijo)
+                hijo = hermano
+            if len(hijos) > 1:
+                aleatorio.shuffle(hijos)
+            pendientes.extend(hijos)
+
+    def distractores(self, entrada, cantidad, minima, maxima, excluir=(), aleatorio=random):
+        """Hasta `cantidad` palabras que suenan parecido a la entrada (distancia fonética entre
+        `minima` y `maxima`) pero no riman con ella"""
+        if cantidad <= 0:
+            return []
+        vistas = {entrada.palabra, *excluir}
+        candidatas = []
+        for identificador, _ in self.parecidas(entrada.palabra, minima, maxima, aleatorio=aleatorio):
+            candidata = self.entrada(identificador)
+            if candidata.palabra not in vistas and candidata.rima != entrada.rima:
+                vistas.add(candidata.palabra)
+                candidatas.append(candidata)
+                if len(candidatas) >= 4 * cantidad:
+                    break
+        return aleatorio.sample(candidatas, min(cantidad, len(candidatas)))
+
+    def buscar(self, palabra):
+        """Devuelve la entrada de una palabra o None si no está en el corpus"""
+        palabra = normalizar(palabra)
+        mascara = self.ranuras - 1
+        posicion = zlib.crc32(palabra.encode("utf-8")) & mascara
+        while True:
+            valor = ENTERO.unpack_from(self.mapa, self._hash + 4 * posicion)[0]
+            if not valor:
+                return None
+            entrada = self.entrada(valor - 1)
+            if entrada.palabra == palabra:
+                return entrada
+            posicion = (posicion + 1) & mascara
+
+    def cerrar(self):
+        self.mapa.close()
+
+
+def _indice_vigente(ruta_fuente, ruta_indice):
+    """Comprueba si el índice existe y fue compilado a partir de la fuente actual"""
+    try:
+        with open(ruta_indice, "rb") as archivo:
+            datos = archivo.read(CABECERA.size)
+        campos = CABECERA.unpack(datos)
+    except (OSError, struct.error):
+        return False
+    estado = os.stat(ruta_fuente)
+    return (campos[0] == MAGIA and campos[1] == VERSION
+            and campos[6] == estado.st_size and campos[7] == estado.st_mtime_ns)
+
+
+_corpus_cargados = {}
+_lock_carga = threading.Lock()
+
+
+def cargar_corpus(ruta_fuente=RUTA_CORPUS):
+    """Devuelve el corpus de la fuente dada, compilándolo solo si el índice no está al día"""
+    with _lock_carga:
+        corpus = _corpus_cargados.get(ruta_fuente)
+        if corpus is None:
+            ruta_indice = os.path.splitext(ruta_fuente)[0] + ".idx"
+            if not _indice_vigente(ruta_fuente, ruta_indice):
+                compilar(ruta_fuente, ruta_indice)
+            corpus = Corpus(ruta_indice)
+            _corpus_cargados[ruta_fuente] = corpus
+        return corpus
@@ -0,0 +1,119 @@
+"""Fuentes cargadas bajo demanda, sin recorrer las fuentes del sistema en cada arranque.
+
+pygame.font.SysFont examina todas las fuentes instaladas (fc-list en Linux) la primera vez
+que se llama, lo que cuesta cientos de milisegundos. Aquí la ruta de cada fuente se busca en
+este orden:
+
+1. Un TTF incluido en datos/fuentes/, con nombre "<Nombre>[-Bold|-Italic|-BoldItalic].ttf".
+2. La caché datos/fuentes.json, escrita la primera vez que se resolvió la fuente.
+3. pygame.font.match_font, cuyo resultado se guarda en la caché para el próximo arranque.
+
+Si no hay ninguna, se usa la fuente incluida en pygame, como hace SysFont.
+"""
+import json
+import os
+import threading
+
+import pygame
+
+DIRECTORIO_DATOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos")
+RUTA_FUENTES_INCLUIDAS = os.path.join(DIRECTORIO_DATOS, "fuentes")
+RUTA_CACHE_FUENTES = os.path.join(DIRECTORIO_DATOS, "fuentes.json")
+
+_lock = threading.Lock()
+_cache = None
+
+
+def _sufijo_estilo(negrita, cursiva):
+    return {(False, False): "", (True, False): "-Bold", (False, True): "-Italic", (True, True): "-BoldItalic"}[
+        (negrita, cursiva)]
+
+
+def _ruta_incluida(nombre, negrita, cursiva):
+    ruta = os.path.join(RUTA_FUENTES_INCLUIDAS, f"{nombre}{_sufijo_estilo(negrita, cursiva)}.ttf")
+    return ruta if os.path.exists(ruta) else None
+
+
+def _leer_cache():
+    global _cache
+    if _cache is None:
+        try:
+            with open(RUTA_CACHE_FUENTES, encoding="utf-8") as archivo:
+                _cache = json.load(archivo)
+        except (OSError, ValueError):
+            _cache = {}
+    return _cache
+
+
+def _guardar_cache():
+    temporal = RUTA_CACHE_FUENTES + ".tmp"
+    try:
+        with open(temporal, "w", encoding="utf-8") as archivo:
+            json.dump(_cache, archivo, indent=1)
+        os.replace(temporal, RUTA_CACHE_FUENTES)
+    except OSError:
+        pass  # Sin caché el próximo arranque vuelve a buscar, nada más
+
+
+def resolver(nombre, negrita=False, cursiva=False):
+    """Devuelve (ruta o None, negrita sintética, cursiva sintética) para una fuente"""
+    ruta = _ruta_incluida(nombre, negrita, cursiva)
+    if ruta is not None:
+        return ruta, False, False
+    ruta = _ruta_incluida(nombre, False, False)
+    if ruta is not None:
+        return ruta, negrita, cursiva
+
+    clave = f"{nombre}|{int(negrita)}|{int(cursiva)}"
+    with _lock:
+        cache = _leer_cache()
+        entrada = cache.get(clave)
+        if entrada is not None and (entrada[0] is None or os.path.exists(entrada[0])):
+            return tuple(entrada)
+
+        # Búsqueda lenta en las fuentes del sistema: solo la primera vez
+        ruta = pygame.font.match_font(nombre, negrita, cursiva)
+        if ruta is None:
+            entrada = [None, negrita, cursiva]
+        else:
+            # Si el estilo pedido no existe, match_font devuelve la variante normal
+            simulado = (negrita or cursiva) and ruta == pygame.font.match_font(nombre)
+            entrada = [ruta, negrita and simulado, cursiva and simulado]
+        cache[clave] = entrada
+        _guardar_cache()
+        return tuple(entrada)
+
+
+class FuenteDiferida:
+    """Se comporta como pygame.font.Font, pero no busca ni abre el archivo hasta el primer uso"""
+
+    def __init__(self, nombre, tamano, negrita=False, cursiva=False):
+        self.nombre = nombre
+        self.tamano = tamano
+        self.negrita = negrita
+        self.cursiva = cursiva
+        self._fuente = None
+        self._lock = threading.Lock()
+
+    def cargar(self):
+        if self._fuente is None:
+            with self._lock:
+                if self._fuente is None:
+                    if not pygame.font.get_init():
+                        pygame.font.init()
+                    ruta, negrita, cursiva = resolver(self.nombre, self.negrita, self.cursiva)
+                    fuente = pygame.font.Font(ruta, self.tamano)
+                    fuente.set_bold(negrita)
+                    fuente.set_italic(cursiva)
+                    self._fuente = fuente
+        return self._fuente
+
+    def render(self, texto, antialias, color, fondo=None):
+        return self.cargar().render(texto, antialias, color, fondo)
+
+    def size(self, texto):
+        return self.cargar().size(texto)
+
+    def __getattr__(self, atributo):
+        # Cualquier otro método de pygame.font.Font (get_height, get_linesize...)
+        return getattr(self.cargar(), atributo)
@@ -1,13 +1,37 @@
+import time
+INICIO_IMPORTACION = time.perf_counter()  # Referencia para medir el tiempo hasta el primer cuadro
+
 import pygame
+import argparse
+import logging
 import sys
 import threading
 import random
-import time
+import struct
+import heapq
 from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
 
-# Inicializar pygame
-pygame.init()
-pygame.font.init()
+from audio import SistemaAudio
+from corpus import cargar_corpus, clave as clave_corpus
+from fuentes import FuenteDiferida
+from linguistica import silabear
+from perfilador import BuferCircular, PerfiladorCuadros, resumir
+from persistencia import AlmacenProgreso, RUTA_PROGRESO
+
+log = logging.getLogger(__name__)
+
+# Inicializar pygame solo al crear la ventana: importar el módulo no toca SDL ni las fuentes
+def inicializar_pygame(video=True):
+    """Inicializa los subsistemas que usa el juego (video, eventos, reloj y fuentes); es idempotente"""
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if video and not pygame.display.get_init():
+        pygame.display.init()
+        # El temporizador de SDL (pygame.time.get_ticks) arranca con el primer tick de un reloj
+        pygame.time.Clock().tick()
 
 # Colores
 COLOR_FONDO = (240, 240, 255)
@@ -19,14 +43,364 @@ COLOR_CORRECTO = (100, 200, 100)
 COLOR_INCORRECTO = (255, 100, 100)
 COLOR_PISTA = (70, 130, 180)
 
-# Fuentes
-FUENTE_GRANDE = pygame.font.SysFont('Arial', 28, bold=True)
-FUENTE_MEDIA = pygame.font.SysFont('Arial', 22)
-FUENTE_PEQUEÑA = pygame.font.SysFont('Arial', 18)
-FUENTE_PISTA = pygame.font.SysFont('Arial', 18, italic=True)
+# Fuentes (se buscan y abren en su primer uso, ver fuentes.py)
+FUENTE_GRANDE = FuenteDiferida('Arial', 28, negrita=True)
+FUENTE_MEDIA = FuenteDiferida('Arial', 22)
+FUENTE_PEQUEÑA = FuenteDiferida('Arial', 18)
+FUENTE_PISTA = FuenteDiferida('Arial', 18, cursiva=True)
+FUENTE_PERFIL = FuenteDiferida('Arial', 14)
+
+# Contador de superficies creadas, en total y en el cuadro en curso
+class ContadorSuperficies:
+    def __init__(self):
+        self.total = 0
+        self.en_cuadro = 0
+        self.ultimo_cuadro = 0
+        self.maximo_cuadro = 0
+        self.cuadros = 0
+        self.lock = threading.Lock()  # El hilo de precarga también crea superficies
+    
+    def contar(self, cantidad=1):
+        with self.lock:
+            self.total += cantidad
+            self.en_cuadro += cantidad
+    
+    def cerrar_cuadro(self):
+        """Se llama al terminar cada cuadro para fijar cuántas superficies se crearon en él"""
+        with self.lock:
+            self.ultimo_cuadro = self.en_cuadro
+            self.maximo_cuadro = max(self.maximo_cuadro, self.en_cuadro)
+            self.en_cuadro = 0
+            self.cuadros += 1
+    
+    def estadisticas(self):
+        with self.lock:
+            return {
+                "total": self.total,
+                "cuadros": self.cuadros,
+                "ultimo_cuadro": self.ultimo_cuadro,
+                "maximo_cuadro": self.maximo_cuadro,
+                "media_por_cuadro": self.total / self.cuadros if self.cuadros else 0.0
+            }
+
+SUPERFICIES = ContadorSuperficies()
+
+# Caché LRU de superficies de texto: evita rasterizar las mismas etiquetas en cada cuadro
+class CacheTexto:
+    def __init__(self, capacidad=512):
+        self.capacidad = capacidad
+        self.superficies = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+        self.lock = threading.Lock()  # El hilo de precarga también renderiza
+    
+    def renderizar(self, fuente, texto, antialias, color):
+        """Devuelve la superficie del texto, rasterizándola solo si no está en caché"""
+        clave = (fuente, texto, antialias, tuple(color))
+        with self.lock:
+            superficie = self.superficies.get(clave)
+            if superficie is not None:
+                self.aciertos += 1
+                self.superficies.move_to_end(clave)
+                return superficie
+            
+            self.fallos += 1
+            superficie = fuente.render(texto, antialias, color)
+            SUPERFICIES.contar()
+            self.superficies[clave] = superficie
+            # Expulsar la entrada usada hace más tiempo si se supera la capacidad
+            if len(self.superficies) > self.capacidad:
+                self.superficies.popitem(last=False)
+            return superficie
+    
+    def limpiar(self):
+        with self.lock:
+            self.superficies.clear()
+            self.aciertos = 0
+            self.fallos = 0
+    
+    def estadisticas(self):
+        with self.lock:
+            total = self.aciertos + self.fallos
+            return {
+                "entradas": len(self.superficies),
+                "capacidad": self.capacidad,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / total if total else 0.0
+            }
+
+CACHE_TEXTO = CacheTexto()
+
+def renderizar_texto(fuente, texto, antialias, color):
+    """Renderiza un texto a través de la caché global de superficies"""
+    return CACHE_TEXTO.renderizar(fuente, texto, antialias, color)
+
+# Capas estáticas precompuestas (fondo, títulos, modal): se recomponen solo si cambia su clave
+class CacheCapas:
+    def __init__(self):
+        self.capas = {}  # nombre -> (clave, superficie)
+        self.composiciones = 0
+    
+    def obtener(self, nombre, clave, tamano, componer, alfa=False):
+        """Devuelve la capa `nombre`; si su clave cambió, llama a componer(superficie) para rehacerla.
+        
+        La superficie anterior se reutiliza cuando tiene el mismo tamaño, así que cambiar de
+        actividad recompone la capa sin crear una superficie nueva.
+        """
+        actual = self.capas.get(nombre)
+        if actual is not None and actual[0] == clave:
+            return actual[1]
+        
+        if actual is not None and actual[1].get_size() == tamano:
+            superficie = actual[1]
+        else:
+            superficie = pygame.Surface(tamano, pygame.SRCALPHA if alfa else 0)
+            SUPERFICIES.contar()
+        componer(superficie)
+        self.capas[nombre] = (clave, superficie)
+        self.composiciones += 1
+        return superficie
+    
+    def invalidar(self, nombre=None):
+        if nombre is None:
+            self.capas.clear()
+        else:
+            self.capas.pop(nombre, None)
+
+# Bolsa barajada sobre las posiciones de una cubeta del corpus
+class BolsaPalabras:
+    """Extrae posiciones 0..tamano-1 sin reemplazo en O(1) y sin repetir las últimas `ventana`.
+
+    Usa un Fisher-Yates perezoso: solo se guardan las posiciones intercambiadas, así que la
+    memoria crece con las extracciones y no con el tamaño de la cubeta.
+    """
+    def __init__(self, tamano, ventana=5, aleatorio=None):
+        self.tamano = tamano
+        self.ventana = max(0, min(ventana, tamano - 1))
+        self.aleatorio = aleatorio or random.Random()
+        self._intercambios = {}
+        self._restantes = tamano
+        self.recientes = deque()
+        self._conjunto_recientes = set()
+    
+    def siguiente(self):
+        """Siguiente posición de la bolsa, sin tener en cuenta la ventana de recientes"""
+        if self._restantes == 0:
+            # Bolsa vacía: se vuelve a llenar con todas las posiciones
+            self._intercambios.clear()
+            self._restantes = self.tamano
+        j = self.aleatorio.randrange(self._restantes)
+        ultimo = self._restantes - 1
+        valor = self._intercambios.get(j, j)
+        if j != ultimo:
+            self._intercambios[j] = self._intercambios.get(ultimo, ultimo)
+        self._intercambios.pop(ultimo, None)
+        self._restantes -= 1
+        return valor
+    
+    def sacar(self):
+        posicion = self.siguiente()
+        # Al rellenar la bolsa pueden salir posiciones recientes: se descartan en esta vuelta
+        while posicion in self._conjunto_recientes:
+            posicion = self.siguiente()
+        
+        self.marcar_reciente(posicion)
+        return posicion
+    
+    def es_reciente(self, posicion):
+        return posicion in self._conjunto_recientes
+    
+    def marcar_reciente(self, posicion):
+        """Añade la posición a la ventana de recientes, que no vuelven a salir hasta que se desplacen"""
+        self.recientes.append(posicion)
+        self._conjunto_recientes.add(posicion)
+        if len(self.recientes) > self.ventana:
+            self._conjunto_recientes.discard(self.recientes.popleft())
+
+# Repaso espaciado por cajas de Leitner: las palabras falladas vuelven pronto, las dominadas tarde
+class PlanificadorRepaso:
+    """Elige posiciones de una cubeta según cuándo toca repasar cada palabra.
+    
+    Cada palabra vista está en una caja; acertar a la primera la sube, fallar la devuelve a
+    la caja 0, y la caja fija dentro de cuántos turnos vuelve a salir. Las palabras vistas
+    esperan en un montículo ordenado por vencimiento, así que elegir cuesta O(log n); las
+    nuevas salen de una BolsaPalabras y solo ocupan memoria una vez vistas.
+    """
+    INTERVALOS = (3, 8, 20, 50, 120)  # Turnos hasta el siguiente repaso según la caja
+    REPASOS_SEGUIDOS = 3  # Tras tantos repasos seguidos se intercala una palabra nueva
+    
+    def __init__(self, tamano, ventana=5, historial=None, aleatorio=None):
+        self.tamano = tamano
+        self.bolsa = BolsaPalabras(tamano, ventana, aleatorio)
+        self.historial = historial or {}  # palabra -> aciertos y fallos guardados del jugador
+        self.turno = 0
+        self.estado = {}  # posicion -> [caja, vencimiento, orden]
+        self.monticulo = []  # (vencimiento, orden, posicion); las entradas obsoletas se saltan
+        self._orden = 0
+        self._repasos_seguidos = 0
+        self._propuestas = []  # Nuevas sacadas de la bolsa y aún sin confirmar
+    
+    def _programar(self, posicion, caja):
+        self._orden += 1
+        vencimiento = self.turno + self.INTERVALOS[caja]
+        self.estado[posicion] = [caja, vencimiento, self._orden]
+        heapq.heappush(self.monticulo, (vencimiento, self._orden, posicion))
+        if len(self.monticulo) > 2 * len(self.estado) + 64:
+            # Compactar: quitar las entradas que ya fueron reprogramadas
+            self.monticulo = [(v, o, p) for p, (_, v, o) in self.estado.items()]
+            heapq.heapify(self.monticulo)
+    
+    def _primera_vencida(self, turno, descartadas=()):
+        """Palabra vista con menor vencimiento (hasta el turno dado, si lo hay) que no sea reciente, o None
+        
+        Solo consulta el montículo: la palabra sigue en él hasta que se confirme.
+        """
+        apartadas = []
+        elegida = None
+        while self.monticulo:
+            vencimiento, orden, posicion = self.monticulo[0]
+            if self.estado[posicion][2] != orden:
+                heapq.heappop(self.monticulo)  # Entrada obsoleta
+                continue
+            if turno is not None and vencimiento > turno:
+                break
+            apartadas.append(heapq.heappop(self.monticulo))
+            if self.bolsa.es_reciente(posicion) or posicion in descartadas:
+                continue
+            elegida = posicion
+            break
+        for entrada in apartadas:
+            heapq.heappush(self.monticulo, entrada)
+        return elegida
+    
+    def _nueva(self, descartadas=()):
+        """Palabra nunca vista, o None si ya se vieron todas; las propuestas sin confirmar se ofrecen primero"""
+        for posicion in self._propuestas:
+            if posicion not in descartadas:
+                return posicion
+        libres = self.tamano - len(self.estado) - sum(1 for posicion in descartadas if posicion not in self.estado)
+        if libres <= 0:
+            return None
+        while True:
+            posicion = self.bolsa.siguiente()
+            if posicion not in self.estado and posicion not in descartadas and posicion not in self._propuestas:
+                # Sacada de la bolsa pero aún sin programar: se guarda para no perderla si se rechaza
+                self._propuestas.append(posicion)
+                return posicion
+    
+    def siguiente(self, descartadas=()):
+        """Propone la siguiente posición sin programarla: una vencida, si no una nueva, si no la más próxima a vencer
+        
+        Las posiciones de descartadas (propuestas ya rechazadas en este sorteo) no se vuelven a proponer
+        salvo que no quede otra. Solo confirmar() programa la elegida y la marca como reciente.
+        """
+        posicion = None
+        if self._repasos_seguidos < self.REPASOS_SEGUIDOS:
+            posicion = self._primera_vencida(self.turno + 1, descartadas)
+        if posicion is None:
+            posicion = self._nueva(descartadas)
+        if posicion is None:
+            posicion = self._primera_vencida(None, descartadas)
+        if posicion is None:
+            # Cubeta más pequeña que la ventana de recientes: se repite la más antigua
+            posicion = self.bolsa.recientes[0] if self.bolsa.recientes else next(iter(descartadas))
+        return posicion
+    
+    def confirmar(self, posicion, nombre_de=None):
+        """Programa la posición aceptada y la marca como reciente; cuenta como un turno"""
+        self.turno += 1
+        if posicion in self.estado:
+            caja, vencimiento, _ = self.estado[posicion]
+            self._repasos_seguidos = self._repasos_seguidos + 1 if vencimiento <= self.turno else 0
+        else:
+            # Una palabra nueva para esta cubeta puede venir con historial del jugador
+            caja = 0
+            registro = self.historial.get(nombre_de(posicion)) if nombre_de and self.historial else None
+            if registro:
+                caja = max(0, min(len(self.INTERVALOS) - 1, registro["aciertos"] - registro["fallos"]))
+            self._repasos_seguidos = 0
+        if posicion in self._propuestas:
+            self._propuestas.remove(posicion)
+        
+        # Hasta conocer el resultado, la palabra queda programada con su caja actual
+        self._programar(posicion, caja)
+        self.bolsa.marcar_reciente(posicion)
+    
+    def sacar(self, nombre_de=None):
+        """Propone y confirma en un solo paso, para quien no necesita rechazar palabras"""
+        posicion = self.siguiente()
+        self.confirmar(posicion, nombre_de)
+        return posicion
+    
+    def registrar(self, posicion, correcto, intentos=1):
+        """Mueve la palabra de caja según el resultado y la reprograma"""
+        caja = self.estado[posicion][0] if posicion in self.estado else 0
+        if not correcto:
+            caja = 0
+        elif intentos <= 1:
+            caja = min(caja + 1, len(self.INTERVALOS) - 1)
+        self._programar(posicion, caja)
+    
+    def caja(self, posicion):
+        return self.estado[posicion][0] if posicion in self.estado else None
+
+# Registro de planificadores por (estrategia, nivel, jugador): sin interferencias entre niveles ni jugadores
+class RegistroMuestreo:
+    def __init__(self, jugador="local", ventana=5, historial=None, aleatorio=None):
+        self.jugador = jugador
+        self.ventana = ventana
+        self.historial = historial  # Estadísticas por palabra guardadas (ver persistencia.py)
+        self.aleatorio = aleatorio  # Generador compartido por las bolsas; None: uno propio por planificador
+        self.planificadores = {}
+        self.posiciones = {}  # (estrategia, nivel) -> {palabra: posición en la cubeta}
+        self.lock = threading.Lock()
+    
+    def sacar(self, estrategia, nivel, nombre_cubeta, aceptable=None, propuestas=1):
+        """Devuelve la entrada del corpus que toca a este jugador en la cubeta de (estrategia, nivel)
+        
+        Con aceptable se proponen hasta tantas palabras como propuestas y se queda la primera que
+        lo cumpla (o la última); solo esa se programa en el repaso, las rechazadas no cuentan.
+        """
+        corpus = cargar_corpus()
+        tamano = corpus.tamano(nombre_cubeta)
+        clave = (estrategia, nivel, self.jugador)
+        nombre_de = None
+        if self.historial:
+            def nombre_de(posicion):
+                return corpus.entrada(corpus.identificador(nombre_cubeta, posicion)).palabra
+        
+        with self.lock:
+            planificador = self.planificadores.get(clave)
+            if planificador is None or planificador.tamano != tamano:
+                planificador = PlanificadorRepaso(tamano, self.ventana, self.historial, self.aleatorio)
+                self.planificadores[clave] = planificador
+                self.posiciones[(estrategia, nivel)] = {}
+            descartadas = []
+            for _ in range(propuestas):
+                posicion = planificador.siguiente(descartadas)
+                entrada = corpus.entrada(corpus.identificador(nombre_cubeta, posicion))
+                if aceptable is None or aceptable(entrada):
+                    break
+                descartadas.append(posicion)
+            planificador.confirmar(posicion, nombre_de)
+            self.posiciones[(estrategia, nivel)][entrada.palabra] = posicion
+            return entrada
+    
+    def registrar_resultado(self, estrategia, nivel, palabra, correcto, intentos=1):
+        """Informa del resultado de una actividad terminada para reprogramar su palabra"""
+        with self.lock:
+            planificador = self.planificadores.get((estrategia, nivel, self.jugador))
+            posicion = self.posiciones.get((estrategia, nivel), {}).get(palabra)
+            if planificador is not None and posicion is not None:
+                planificador.registrar(posicion, correcto, intentos)
 
 # Patrón Strategy: Define la familia de algoritmos para formación de palabras
 class EstrategiaFormacionPalabras(ABC):
+    def __init__(self, muestreo=None):
+        # Sin registro compartido, cada estrategia lleva el suyo propio
+        self.muestreo = muestreo if muestreo is not None else RegistroMuestreo()
+    
     @abstractmethod
     def generar_actividad(self, nivel):
         pass
@@ -38,37 +412,22 @@ class EstrategiaFormacionPalabras(ABC):
     @abstractmethod
     def obtener_pista(self, solucion):
         pass
+    
+    def _sortear(self, nombre_cubeta, nivel, aceptable=None, propuestas=1):
+        """Elige la palabra de la cubeta que toca repasar al jugador, sin repetir las recientes"""
+        return self.muestreo.sacar(type(self).__name__, nivel, nombre_cubeta, aceptable, propuestas)
 
 # Implementaciones concretas de Strategy
-# Agregar un atributo de clase para cada estrategia concreta
+# Cada estrategia extrae sus palabras del corpus compilado (ver corpus.py)
 class UnionLetras(EstrategiaFormacionPalabras):
-    palabras_usadas = set()  # Conjunto para rastrear palabras ya usadas
+    SORTEOS_SOLUCION_UNICA = 3  # Palabras que se prueban buscando letras con una sola solución
     
     def generar_actividad(self, nivel):
-        palabras = {
-            1: ["sol", "mar", "paz", "luz", "oso", "uno", "mes", "pez", "pie", "col"],
-            2: ["casa", "mesa", "lobo", "pato", "vela", "gato", "libro", "flor", "árbol", "reloj"],
-            3: ["escuela", "elefante", "mariposa", "biblioteca", "dinosaurio", "ventana", "montaña", "teléfono", "guitarra", "bicicleta"]
-        }
-        
-        # Filtrar las palabras que no se han usado recientemente
-        palabras_disponibles = [p for p in palabras[nivel] if p not in self.palabras_usadas]
-        
-        # Si todas las palabras ya se usaron, reiniciar
-        if not palabras_disponibles:
-            self.palabras_usadas.clear()
-            palabras_disponibles = palabras[nivel]
-        
-        # Elegir una palabra aleatoria no usada
-        palabra = random.choice(palabras_disponibles)
-        
-        # Marcar como usada
-        self.palabras_usadas.add(palabra)
-        
-        # Mantener el conjunto de palabras usadas en un tamaño razonable
-        if len(self.palabras_usadas) > 5:
-            # Eliminar la palabra más antigua
-            self.palabras_usadas.pop() if self.palabras_usadas else None
+        # Elegir una palabra no usada recientemente, mejor si sus letras no forman otra palabra
+        corpus = cargar_corpus()
+        palabra = self._sortear(clave_corpus("letras", nivel), nivel,
+                                lambda entrada: corpus.cantidad_anagramas(entrada.palabra) == 1,
+                                self.SORTEOS_SOLUCION_UNICA).palabra
         
         letras = list(palabra)
         random.shuffle(letras)
@@ -80,35 +439,23 @@ class UnionLetras(EstrategiaFormacionPalabras):
         }
     
     def verificar_respuesta(self, respuesta, solucion):
-        return respuesta.lower() == solucion.lower()
+        # Cualquier palabra real con exactamente las letras ofrecidas vale ("amor" con las de "roma")
+        if respuesta.lower() == solucion.lower():
+            return True
+        return len(respuesta) == len(solucion) and cargar_corpus().forma_palabra(respuesta, solucion)
     
     def obtener_pista(self, solucion):
         return f"La palabra tiene {len(solucion)} letras y comienza con '{solucion[0]}'."
 
 class UnionSilabas(EstrategiaFormacionPalabras):
-    palabras_usadas = set()
-
     def generar_actividad(self, nivel):
-        palabras_silabas = {
-            1: [("ca-sa", ["ca", "sa"]), ("pe-rro", ["pe", "rro"]), ("me-sa", ["me", "sa"])],
-            2: [("pe-lo-ta", ["pe", "lo", "ta"]), ("ma-ri-po-sa", ["ma", "ri", "po", "sa"]), ("co-me-ta", ["co", "me", "ta"])],
-            3: [("bi-ci-cle-ta", ["bi", "ci", "cle", "ta"]), ("te-le-vi-sión", ["te", "le", "vi", "sión"]), ("e-le-fan-te", ["e", "le", "fan", "te"])]
-        }
-        palabras_disponibles = [p for p in palabras_silabas[nivel] if p[0].replace("-", "") not in self.palabras_usadas]
-        if not palabras_disponibles:
-            self.palabras_usadas.clear()
-            palabras_disponibles = palabras_silabas[nivel]
-        palabra_info = random.choice(palabras_disponibles)
-        palabra = palabra_info[0].replace("-", "")
-        self.palabras_usadas.add(palabra)
-        if len(self.palabras_usadas) > 5:
-            self.palabras_usadas.pop() if self.palabras_usadas else None
-        silabas = palabra_info[1].copy()
+        entrada = self._sortear(clave_corpus("silabas", nivel), nivel)
+        silabas = list(entrada.silabas)
         random.shuffle(silabas)
         return {
             "instruccion": "Forma una palabra uniendo las sílabas:",
             "elementos": silabas,
-            "solucion": palabra,
+            "solucion": entrada.palabra,
             "tipo": "silabas"
         }
     
@@ -117,47 +464,34 @@ class UnionSilabas(EstrategiaFormacionPalabras):
         return respuesta.lower() == solucion.lower()
     
     def obtener_pista(self, solucion):
-        return f"La palabra tiene {len(solucion.split('-'))} sílabas y significa algo que puedes {self._get_hint_context(solucion)}."
+        return f"La palabra tiene {len(silabear(solucion))} sílabas y significa algo que puedes {self._get_hint_context(solucion)}."
     
     def _get_hint_context(self, palabra):
-        pistas = {
-            "casa": "donde vives",
-            "perro": "un animal que ladra",
-            "mesa": "usar para comer",
-            "pelota": "usar para jugar",
-            "mariposa": "un insecto con alas coloridas",
-            "cometa": "volar en el cielo",
-            "bicicleta": "usar para transportarte con dos ruedas",
-            "televisión": "ver programas",
-            "elefante": "un animal grande con trompa"
-        }
-        return pistas.get(palabra, "relacionado con objetos cotidianos")
+        entrada = cargar_corpus().buscar(palabra)
+        if entrada and entrada.pista:
+            return entrada.pista
+        return "relacionado con objetos cotidianos"
 
 class AsociacionRima(EstrategiaFormacionPalabras):
-    palabras_usadas = set()
+    # Distancia fonética (mínima, máxima) de los distractores a la palabra base: más cerca cuanto más nivel
+    BANDAS_DISTRACTORES = {1: (3, 4), 2: (2, 3), 3: (1, 2)}
+    
     def generar_actividad(self, nivel):
-        rimas = {
-            1: [("sol", ["col", "gol", "rol", "bol"]), ("mar", ["dar", "par", "bar", "lar"])],
-            2: [("casa", ["masa", "pasa", "tasa", "rasa"]), ("mesa", ["pesa", "fresa", "presa", "besa"])],
-            3: [("canción", ["pasión", "visión", "misión", "fusión"]), ("corazón", ["razón", "sazón", "buzón", "tesón"])]
-        }
-        palabras_disponibles = [p for p in rimas[nivel] if p[0] not in self.palabras_usadas]
-        if not palabras_disponibles:
-                self.palabras_usadas.clear()
-                palabras_disponibles = rimas[nivel]
-
-        palabra_info = random.choice(palabras_disponibles)
-        palabra_base = palabra_info[0]
-        self.palabras_usadas.add(palabra_base)
-        palabras_rima = palabra_info[1]
-        opciones = random.sample(palabras_rima, min(nivel + 1, len(palabras_rima)))
-
-        if len(self.palabras_usadas) > 5:
-            self.palabras_usadas.pop() if self.palabras_usadas else None
+        corpus = cargar_corpus()
+        base = self._sortear(clave_corpus("base_rima", nivel), nivel)
+        palabra_base = base.palabra
+        
+        # Palabras con el mismo núcleo de rima
+        opciones = [entrada.palabra for entrada in corpus.rimas(base, nivel + 1)]
         
-        # Añadir algunas palabras que no riman como distractores
-        no_riman = ["azul", "verde", "feliz", "papel", "árbol"]
-        distractores = random.sample(no_riman, min(3 - nivel, len(no_riman)))
+        # Distractores que suenan parecido a la base sin rimar; si no hay bastantes, cualquiera que no rime.
+        # Menos cuanto más nivel, pero siempre al menos uno: en el nivel 3 es el más cercano a la base
+        cantidad = max(1, 3 - nivel)
+        minima, maxima = self.BANDAS_DISTRACTORES[min(nivel, 3)]
+        distractores = [entrada.palabra for entrada in corpus.distractores(base, cantidad, minima, maxima, opciones)]
+        if len(distractores) < cantidad:
+            distractores += [entrada.palabra for entrada in corpus.no_riman(
+                base, cantidad - len(distractores), clave_corpus("letras", nivel), excluir=opciones + distractores)]
         
         todas_opciones = opciones + distractores
         random.shuffle(todas_opciones)
@@ -185,23 +519,27 @@ class AsociacionRima(EstrategiaFormacionPalabras):
 
 # Patrón Factory Method: Crea las actividades según el tipo y nivel
 class FabricaActividades(ABC):
+    def __init__(self, muestreo=None):
+        # Registro de muestreo del jugador, compartido por todas las actividades que se creen
+        self.muestreo = muestreo if muestreo is not None else RegistroMuestreo()
+    
     @abstractmethod
     def crear_actividad(self, nivel):
         pass
 
 class FabricaUnionLetras(FabricaActividades):
     def crear_actividad(self, nivel):
-        estrategia = UnionLetras()
+        estrategia = UnionLetras(self.muestreo)
         return Actividad(estrategia, nivel)
 
 class FabricaUnionSilabas(FabricaActividades):
     def crear_actividad(self, nivel):
-        estrategia = UnionSilabas()
+        estrategia = UnionSilabas(self.muestreo)
         return Actividad(estrategia, nivel)
 
 class FabricaAsociacionRima(FabricaActividades):
     def crear_actividad(self, nivel):
-        estrategia = AsociacionRima()
+        estrategia = AsociacionRima(self.muestreo)
         return Actividad(estrategia, nivel)
 
 # Clase Actividad que usa la estrategia asignada
@@ -237,45 +575,343 @@ class Actividad:
         if id_boton in self.botones_usados:
             del self.botones_usados[id_boton]
 
+# Historial de puntuación en columnas: un registro ocupa 16 bytes en lugar de una tupla
+class HistorialPuntuacion:
+    """Búfer circular de capacidad fija con columnas array('d')/array('i').
+    
+    Registrar es O(1). Al llenarse se sobrescribe el registro más antiguo, que antes se
+    vuelca al archivo `ruta_volcado` si se indicó uno (registros binarios "<dii").
+    """
+    FORMATO_VOLCADO = struct.Struct("<dii")
+    
+    def __init__(self, capacidad=4096, ruta_volcado=None):
+        self.capacidad = capacidad
+        self.tiempos = array("d", bytes(8 * capacidad))
+        self.puntos = array("i", bytes(4 * capacidad))
+        self.totales = array("i", bytes(4 * capacidad))
+        self.inicio = 0  # Posición física del registro más antiguo
+        self.cantidad = 0
+        self.ruta_volcado = ruta_volcado
+        self._archivo_volcado = None
+    
+    def __len__(self):
+        return self.cantidad
+    
+    def _posicion(self, indice):
+        return (self.inicio + indice) % self.capacidad
+    
+    def __getitem__(self, indice):
+        if indice < 0:
+            indice += self.cantidad
+        if not 0 <= indice < self.cantidad:
+            raise IndexError("índice fuera del historial")
+        posicion = self._posicion(indice)
+        return (self.tiempos[posicion], self.puntos[posicion], self.totales[posicion])
+    
+    def __iter__(self):
+        for indice in range(self.cantidad):
+            yield self[indice]
+    
+    def registrar(self, tiempo, puntos, total):
+        if self.cantidad == self.capacidad:
+            # Lleno: el más antiguo se vuelca (si procede) y su hueco se reutiliza
+            posicion = self.inicio
+            if self.ruta_volcado:
+                self._volcar(posicion)
+            self.inicio = (self.inicio + 1) % self.capacidad
+        else:
+            posicion = self._posicion(self.cantidad)
+            self.cantidad += 1
+        self.tiempos[posicion] = tiempo
+        self.puntos[posicion] = puntos
+        self.totales[posicion] = total
+    
+    def _volcar(self, posicion):
+        if self._archivo_volcado is None:
+            self._archivo_volcado = open(self.ruta_volcado, "ab")
+        self._archivo_volcado.write(self.FORMATO_VOLCADO.pack(
+            self.tiempos[posicion], self.puntos[posicion], self.totales[posicion]))
+    
+    def _primer_indice_desde(self, tiempo):
+        """Búsqueda binaria del primer registro con marca de tiempo >= tiempo"""
+        bajo, alto = 0, self.cantidad
+        while bajo < alto:
+            medio = (bajo + alto) // 2
+            if self.tiempos[self._posicion(medio)] < tiempo:
+                bajo = medio + 1
+            else:
+                alto = medio
+        return bajo
+    
+    def puntos_desde(self, tiempo):
+        """Puntos ganados desde `tiempo`, en O(log n) gracias a la columna de totales acumulados"""
+        indice = self._primer_indice_desde(tiempo)
+        if indice == self.cantidad:
+            return 0
+        primero = self._posicion(indice)
+        ultimo = self._posicion(self.cantidad - 1)
+        return self.totales[ultimo] - (self.totales[primero] - self.puntos[primero])
+    
+    def puntos_ultimos_minutos(self, minutos, ahora=None):
+        ahora = time.time() if ahora is None else ahora
+        return self.puntos_desde(ahora - minutos * 60)
+    
+    def rango(self, desde, hasta):
+        """Registros con marca de tiempo en [desde, hasta)"""
+        inicio = self._primer_indice_desde(desde)
+        fin = self._primer_indice_desde(hasta)
+        return [self[indice] for indice in range(inicio, fin)]
+    
+    def exportar(self):
+        """Copia en orden cronológico de las tres columnas: (tiempos, puntos, totales)"""
+        columnas = []
+        for columna in (self.tiempos, self.puntos, self.totales):
+            fin = self.inicio + self.cantidad
+            if fin <= self.capacidad:
+                columnas.append(columna[self.inicio:fin])
+            else:
+                columnas.append(columna[self.inicio:] + columna[:fin - self.capacidad])
+        return tuple(columnas)
+    
+    def exportar_csv(self, ruta):
+        tiempos, puntos, totales = self.exportar()
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write("tiempo,puntos,puntuacion\n")
+            for fila in zip(tiempos, puntos, totales):
+                archivo.write("%.3f,%d,%d\n" % fila)
+    
+    def cerrar(self):
+        if self._archivo_volcado is not None:
+            self._archivo_volcado.close()
+            self._archivo_volcado = None
+
+# Patrón Observer: interesados en los cambios de puntuación
+class ObservadorPuntuacion(ABC):
+    @abstractmethod
+    def actualizar(self, puntuacion):
+        pass
+    
+    def hito_alcanzado(self, hito):
+        """Se llama una vez por cada hito (múltiplo de 100) superado"""
+        pass
+
+# Observador que lleva los hitos a la interfaz como eventos de pygame (seguro entre hilos)
+class NotificadorHitos(ObservadorPuntuacion):
+    def actualizar(self, puntuacion):
+        pass
+    
+    def hito_alcanzado(self, hito):
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT + 2, {"puntuacion": hito}))
+
+# Observador que guarda cada nueva puntuación en el almacén de progreso (sin tocar el disco)
+class RegistroProgreso(ObservadorPuntuacion):
+    def __init__(self, almacen, jugador):
+        self.almacen = almacen
+        self.jugador = jugador
+    
+    def actualizar(self, puntuacion):
+        self.almacen.registrar_puntuacion(self.jugador, puntuacion)
+
+# Estado de la puntuación tal como se entrega a los observadores (inmutable)
+InstantaneaPuntuacion = namedtuple("InstantaneaPuntuacion", "puntuacion hitos instante")
+ESPERA_OBSERVADORES = 2.0  # Segundos que se espera a los observadores al cerrar una sesión o la aplicación
+
+# Entrega asíncrona a los observadores: quien puntúa nunca espera a un observador lento
+class DifusorPuntuacion:
+    """Cola acotada de instantáneas que un hilo propio del difusor entrega a los observadores.
+    
+    El hilo solo existe mientras hay instantáneas pendientes y hay como mucho uno por difusor,
+    así que llegan en orden; un observador bloqueado retiene su sesión, no las demás, y al ser
+    un hilo daemon tampoco impide salir del programa. Con la cola llena, la política "coalescer"
+    funde la nueva instantánea con la última encolada (conserva la puntuación más reciente y
+    todos los hitos) y "descartar" tira la más antigua, con sus hitos: sirve para telemetría,
+    no para la interfaz.
+    """
+    POLITICAS = ("coalescer", "descartar")
+    
+    def __init__(self, capacidad=64, politica="coalescer", muestras_latencia=256):
+        if politica not in self.POLITICAS:
+            raise ValueError(f"Política de difusión desconocida: {politica}")
+        self.capacidad = capacidad
+        self.politica = politica
+        self.muestras_latencia = muestras_latencia
+        self.observadores = ()  # Tupla: registrar la sustituye, entregar lee una copia sin lock
+        self.cola = deque()
+        self.condicion = threading.Condition()
+        self.programado = False  # Hay un hilo de entrega en marcha
+        self.cerrado = False
+        # Métricas
+        self.latencias = {}  # "espera" u observador -> BuferCircular de segundos
+        self.profundidad_maxima = 0
+        self.publicadas = 0
+        self.entregadas = 0
+        self.coalescidas = 0
+        self.descartadas = 0
+        self.errores = 0
+        self.ultimo_error = None
+    
+    def registrar(self, observador):
+        with self.condicion:
+            self.observadores = self.observadores + (observador,)
+    
+    def publicar(self, instantanea):
+        """Encola la instantánea sin llamar a ningún observador; nunca bloquea más que un append"""
+        if not self.observadores:
+            return
+        with self.condicion:
+            if self.cerrado:
+                return
+            self.publicadas += 1
+            if len(self.cola) >= self.capacidad:
+                if self.politica == "coalescer":
+                    # La cola no está vacía, así que la entrega ya está programada
+                    ultima = self.cola[-1]
+                    self.cola[-1] = instantanea._replace(hitos=ultima.hitos + instantanea.hitos,
+                                                         instante=ultima.instante)
+                    self.coalescidas += 1
+                    return
+                self.cola.popleft()
+                self.descartadas += 1
+            self.cola.append(instantanea)
+            self.profundidad_maxima = max(self.profundidad_maxima, len(self.cola))
+            if self.programado:
+                return
+            self.programado = True
+        threading.Thread(target=self._entregar, name="observadores", daemon=True).start()
+    
+    def _medir(self, nombre, segundos):
+        bufer = self.latencias.get(nombre)
+        if bufer is None:
+            bufer = self.latencias[nombre] = BuferCircular(self.muestras_latencia)
+        bufer.agregar(segundos)
+    
+    def _entregar(self):
+        # Solo un hilo entrega por difusor, así que contadores y búferes no necesitan el lock
+        while True:
+            with self.condicion:
+                if not self.cola:
+                    self.programado = False
+                    self.condicion.notify_all()
+                    return
+                instantanea = self.cola.popleft()
+                observadores = self.observadores
+            inicio = time.perf_counter()
+            self._medir("espera", inicio - instantanea.instante)
+            for observador in observadores:
+                # Cada llamada por separado: si actualizar falla, los hitos se notifican igual
+                self._llamar(observador, observador.actualizar, instantanea.puntuacion)
+                for hito in instantanea.hitos:
+                    self._llamar(observador, observador.hito_alcanzado, hito)
+                final = time.perf_counter()
+                self._medir(type(observador).__name__, final - inicio)
+                inicio = final
+            self.entregadas += 1
+    
+    def _llamar(self, observador, metodo, argumento):
+        try:
+            metodo(argumento)
+        except Exception as error:  # Un observador roto no detiene a los demás
+            nombre = type(observador).__name__
+            self.errores += 1
+            self.ultimo_error = f"{nombre}.{metodo.__name__}: {error!r}"
+            log.exception("El observador de puntuación %s falló en %s", nombre, metodo.__name__)
+    
+    def vaciar(self, timeout=None):
+        """Espera a que se entregue todo lo publicado hasta ahora; devuelve False si se agota el tiempo"""
+        with self.condicion:
+            return self.condicion.wait_for(lambda: not self.programado, timeout)
+    
+    def cerrar(self, timeout=None):
+        """Entrega lo pendiente y deja de aceptar instantáneas.
+        
+        Si un observador no termina en `timeout` segundos, lo que sigue en la cola se descarta
+        (con un aviso en el log) en lugar de esperarlo indefinidamente.
+        """
+        vaciado = self.vaciar(timeout)
+        with self.condicion:
+            self.cerrado = True
+            pendientes = len(self.cola)
+            self.cola.clear()
+            self.descartadas += pendientes
+        if not vaciado:
+            log.warning("Los observadores de puntuación no terminaron en %s s; se descartan %d instantáneas",
+                        timeout, pendientes)
+        return vaciado
+    
+    def metricas(self):
+        """Profundidad de la cola, contadores y latencias (p50/p90/p99 en ms) de espera y por observador"""
+        with self.condicion:
+            datos = {
+                "politica": self.politica,
+                "capacidad": self.capacidad,
+                "profundidad": len(self.cola),
+                "profundidad_maxima": self.profundidad_maxima,
+                "observadores": len(self.observadores),
+                "publicadas": self.publicadas,
+                "entregadas": self.entregadas,
+                "coalescidas": self.coalescidas,
+                "descartadas": self.descartadas,
+                "errores": self.errores,
+                "ultimo_error": self.ultimo_error
+            }
+        datos["latencias"] = {nombre: resumir(bufer.muestras()) for nombre, bufer in list(self.latencias.items())}
+        return datos
+
 # Gestor de puntuación con elementos de concurrencia
 class GestorPuntuacion:
-    def __init__(self):
+    def __init__(self, capacidad_difusion=64, politica_difusion="coalescer"):
         self.puntuacion = 0
         self.lock = threading.Lock()  # Primitiva de sincronización
-        self.historial = []
-        self.observadores = []
+        self.historial = HistorialPuntuacion()
+        self.difusor = DifusorPuntuacion(capacidad_difusion, politica_difusion)
         self.hitos_notificados = set()  # Conjunto para rastrear hitos ya notificados
+        self.puntos_por_hito = 100  # Cada múltiplo es un hito que se celebra
         self.puntos_para_nivel = 50  # Puntos necesarios para cambiar de nivel
     
     def aumentar_puntuacion(self, puntos):
+        """Suma los puntos y detecta en el acto los hitos y cambios de nivel que se cruzaron.
+        
+        Se comparan la puntuación anterior y la nueva, así que ningún umbral se pierde
+        aunque un solo aumento salte por encima de él.
+        """
         with self.lock:  # Asegura acceso exclusivo
+            anterior = self.puntuacion
             self.puntuacion += puntos
-            self.historial.append((time.time(), puntos, self.puntuacion))
-            self._notificar_observadores()
+            self.historial.registrar(time.time(), puntos, self.puntuacion)
+            
+            hitos = []
+            for multiplo in range(anterior // self.puntos_por_hito + 1, self.puntuacion // self.puntos_por_hito + 1):
+                hito = multiplo * self.puntos_por_hito
+                if hito not in self.hitos_notificados:
+                    self.hitos_notificados.add(hito)
+                    hitos.append(hito)
+            cambio_nivel = self.puntuacion // self.puntos_para_nivel > anterior // self.puntos_para_nivel
+            
+            # Encolar dentro del lock mantiene el orden entre hilos; los observadores corren fuera
+            self.difusor.publicar(InstantaneaPuntuacion(self.puntuacion, tuple(hitos), time.perf_counter()))
+            return {
+                "puntuacion": self.puntuacion,
+                "hitos": hitos,
+                "cambio_nivel": cambio_nivel
+            }
     
     def obtener_puntuacion(self):
         with self.lock:
             return self.puntuacion
     
+    def restaurar(self, puntuacion):
+        """Retoma una puntuación guardada sin volver a celebrar los hitos ya alcanzados"""
+        with self.lock:
+            self.puntuacion = puntuacion
+            self.hitos_notificados = set(range(self.puntos_por_hito, puntuacion + 1, self.puntos_por_hito))
+    
     def registrar_observador(self, observador):
-        self.observadores.append(observador)
-    
-    def _notificar_observadores(self):
-        for observador in self.observadores:
-            observador.actualizar(self.puntuacion)
-    
-    def verificar_cambio_nivel(self):
-        """Verifica si se ha alcanzado la puntuación necesaria para cambiar de nivel"""
-        return self.puntuacion > 0 and self.puntuacion % self.puntos_para_nivel == 0
-    
-    def verificar_hito(self, puntuacion):
-        """Verifica si se alcanzó un nuevo hito de puntuación y lo marca como notificado"""
-        if puntuacion > 0 and puntuacion % 100 == 0:
-            # Verificar si este hito ya fue notificado
-            if puntuacion not in self.hitos_notificados:
-                self.hitos_notificados.add(puntuacion)
-                return True
-        return False
+        self.difusor.registrar(observador)
+    
+    def cerrar(self, timeout=None):
+        """Entrega a los observadores lo pendiente (esperando como mucho `timeout` segundos) y cierra el historial"""
+        self.difusor.cerrar(timeout)
+        self.historial.cerrar()
 
 # Generador de retroalimentación
 class GeneradorRetroalimentacion:
@@ -306,10 +942,185 @@ class GeneradorRetroalimentacion:
         else:
             return random.choice(self.retroalimentacion_negativa)
 
-# Clase Botón para Pygame
+# Lógica de una partida, sin interfaz: la usan la ventana y el servidor de sesiones
+class SesionJuego:
+    MODOS = ["letras", "silabas", "rimas"]
+    NIVEL_MAXIMO = 3
+    
+    def __init__(self, jugador="local", almacen=None, progreso=None):
+        self.jugador = jugador
+        self.almacen = almacen
+        self.gestor_puntuacion = GestorPuntuacion()
+        self.generador_feedback = GeneradorRetroalimentacion()
+        
+        # Progreso guardado del jugador: puntuación y estadísticas por palabra. Quien no puede
+        # esperar al disco (el servidor asyncio) lo lee antes en otro hilo y lo pasa ya cargado
+        if progreso is None and almacen is not None:
+            progreso = almacen.cargar(jugador)
+        self.progreso = progreso
+        
+        # Crear fábricas, que comparten el repaso espaciado de palabras del jugador
+        self.muestreo = RegistroMuestreo(jugador, historial=self.progreso["palabras"] if self.progreso else None)
+        self.fabricas = {
+            "letras": FabricaUnionLetras(self.muestreo),
+            "silabas": FabricaUnionSilabas(self.muestreo),
+            "rimas": FabricaAsociacionRima(self.muestreo)
+        }
+        
+        self.modo_actual = None
+        self.nivel_actual = 1
+        self.actividad_actual = None
+        # "siguiente" de la actividad en curso una vez resuelta (acertada o sin intentos); None mientras se juega
+        self.actividad_resuelta = None
+        
+        # Retomar el progreso guardado del jugador y registrar el nuevo
+        if almacen is not None:
+            self.gestor_puntuacion.restaurar(self.progreso["puntuacion"])
+            self.gestor_puntuacion.registrar_observador(RegistroProgreso(almacen, jugador))
+    
+    def iniciar(self, modo, nivel):
+        """Empieza a jugar un modo y nivel con una actividad nueva"""
+        if modo not in self.fabricas:
+            raise ValueError(f"Modo desconocido: {modo}")
+        if not 1 <= nivel <= self.NIVEL_MAXIMO:
+            raise ValueError(f"Nivel fuera de rango: {nivel}")
+        self.modo_actual = modo
+        self.nivel_actual = nivel
+        if self.almacen is not None:
+            self.almacen.registrar_cambio_nivel(self.jugador, modo, nivel)
+        return self.nueva_actividad()
+    
+    def nueva_actividad(self):
+        self.actividad_resuelta = None
+        self.actividad_actual = self.fabricas[self.modo_actual].crear_actividad(self.nivel_actual)
+        return self.actividad_actual
+    
+    def avanzar_nivel(self):
+        """Sube un nivel manteniendo el modo; devuelve False si ya estaba en el máximo"""
+        if self.nivel_actual < self.NIVEL_MAXIMO:
+            self.nivel_actual += 1
+            if self.almacen is not None:
+                self.almacen.registrar_cambio_nivel(self.jugador, self.modo_actual, self.nivel_actual)
+            return True
+        return False
+    
+    def verificar(self, respuesta):
+        return self.procesar_resultado(self.actividad_actual.verificar(respuesta))
+    
+    def procesar_resultado(self, resultado):
+        """Puntúa el resultado de una verificación y decide qué mensajes mostrar y qué sigue.
+        
+        "siguiente" vale "actividad" (nueva actividad del mismo nivel), "nivel" (cambio de
+        nivel) o None si el jugador sigue intentando la actividad actual.
+        """
+        correcto = resultado["correcto"]
+        evaluacion = {
+            "correcto": correcto,
+            "mensaje_feedback": self.generador_feedback.obtener_retroalimentacion(correcto, self.nivel_actual),
+            "mensaje_pista": "",
+            "intentos_restantes": resultado["intentos_restantes"],
+            "puntos": 0,
+            "hitos": [],
+            "siguiente": None
+        }
+        
+        # Actualizar puntuación si es correcto
+        if correcto:
+            puntos = self.nivel_actual * 10
+            cambio = self.gestor_puntuacion.aumentar_puntuacion(puntos)
+            evaluacion["puntos"] = puntos
+            evaluacion["hitos"] = cambio["hitos"]
+            evaluacion["siguiente"] = "nivel" if cambio["cambio_nivel"] else "actividad"
+        elif resultado["pista"]:
+            # Mostrar pista si hay intentos restantes
+            evaluacion["mensaje_pista"] = f"Pista: {resultado['pista']}"
+        else:
+            # Si se agotaron los intentos, mostrar la respuesta correcta
+            if isinstance(self.actividad_actual.datos["solucion"], list):
+                solucion = ", ".join(self.actividad_actual.datos["solucion"])
+            else:
+                solucion = self.actividad_actual.datos["solucion"]
+            evaluacion["mensaje_pista"] = f"La respuesta correcta era: {solucion}"
+            evaluacion["siguiente"] = "actividad"
+        
+        evaluacion["puntuacion"] = self.gestor_puntuacion.obtener_puntuacion()
+        if evaluacion["siguiente"]:
+            self.actividad_resuelta = evaluacion["siguiente"]
+            # Actividad terminada: su palabra se reprograma según cómo le fue al jugador
+            actividad = self.actividad_actual
+            self.muestreo.registrar_resultado(type(actividad.estrategia).__name__, actividad.nivel,
+                                              self.palabra_actividad(), correcto, actividad.intentos)
+        if self.almacen is not None:
+            self._registrar_progreso(evaluacion)
+        return evaluacion
+    
+    def palabra_actividad(self):
+        """Palabra que se practica en la actividad en curso (la que se oye y se repasa)"""
+        datos = self.actividad_actual.datos
+        return datos.get("palabra_base") or datos["solucion"]
+    
+    def _registrar_progreso(self, evaluacion):
+        """Encola el intento terminado o la pista mostrada en el almacén de progreso"""
+        palabra = self.palabra_actividad()
+        if evaluacion["siguiente"]:
+            self.almacen.registrar_intento(self.jugador, self.modo_actual, self.nivel_actual, palabra,
+                                           self.actividad_actual.intentos, evaluacion["correcto"])
+        if evaluacion["mensaje_pista"]:
+            self.almacen.registrar_pista(self.jugador, palabra, evaluacion["mensaje_pista"])
+    
+    def estado(self):
+        """Resumen serializable de la sesión (sin la solución de la actividad en curso)"""
+        actividad = None
+        if self.actividad_actual is not None:
+            datos = self.actividad_actual.datos
+            actividad = {
+                "instruccion": datos["instruccion"],
+                "elementos": datos["elementos"],
+                "tipo": datos["tipo"],
+                "palabra_base": datos.get("palabra_base"),
+                "intentos_restantes": max(0, self.actividad_actual.max_intentos - self.actividad_actual.intentos)
+            }
+        return {
+            "jugador": self.jugador,
+            "modo": self.modo_actual,
+            "nivel": self.nivel_actual,
+            "puntuacion": self.gestor_puntuacion.obtener_puntuacion(),
+            "actividad": actividad
+        }
+
+# Estado de la entrada leído una vez por cuadro: los widgets lo consultan en lugar de preguntar a pygame
+class InstantaneaEntrada:
+    def __init__(self):
+        self.posicion_raton = (-1, -1)
+        self.raton_en_ventana = False
+        self.cuadro = 0
+    
+    def capturar(self):
+        """Lee el ratón al empezar el cuadro"""
+        self.posicion_raton = pygame.mouse.get_pos()
+        self.raton_en_ventana = bool(pygame.mouse.get_focused())
+        self.cuadro += 1
+    
+    def mover(self, evento):
+        """Un MOUSEMOTION dentro del cuadro actualiza la posición sin otra consulta"""
+        self.posicion_raton = evento.pos
+
+ENTRADA = InstantaneaEntrada()
+
+# Clase Botón para Pygame (con __slots__: sin __dict__ por instancia, y reutilizable con configurar)
 class Boton:
+    __slots__ = ("rect", "texto", "color", "color_hover", "color_actual", "accion", "param", "activo",
+                 "_texto_renderizado", "_superficie_texto")
+    
     def __init__(self, x, y, ancho, alto, texto, color=COLOR_BOTON, color_hover=COLOR_BOTON_HOVER, accion=None, param=None):
         self.rect = pygame.Rect(x, y, ancho, alto)
+        self._texto_renderizado = None
+        self._superficie_texto = None
+        self.configurar(x, y, ancho, alto, texto, color, color_hover, accion, param)
+    
+    def configurar(self, x, y, ancho, alto, texto, color=COLOR_BOTON, color_hover=COLOR_BOTON_HOVER, accion=None, param=None):
+        """Deja el botón como recién creado; el rectángulo y el texto renderizado se conservan si sirven"""
+        self.rect.update(x, y, ancho, alto)
         self.texto = texto
         self.color = color
         self.color_hover = color_hover
@@ -318,20 +1129,28 @@ class Boton:
         self.param = param
         self.activo = True
     
-    def dibujar(self, pantalla):
+    def _calcular_color(self):
         if not self.activo:
-            self.color_actual = (180, 180, 180)  # Gris para botones inactivos
-        elif self.rect.collidepoint(pygame.mouse.get_pos()):
-            self.color_actual = self.color_hover
-        else:
-            self.color_actual = self.color
+            return (180, 180, 180)  # Gris para botones inactivos
+        elif self.rect.collidepoint(ENTRADA.posicion_raton):
+            return self.color_hover
+        return self.color
+    
+    def estado_visual(self):
+        """Firma de todo lo que afecta al aspecto del botón, para detectar cambios"""
+        return (tuple(self.rect), self.texto, self._calcular_color())
+    
+    def dibujar(self, pantalla):
+        self.color_actual = self._calcular_color()
             
         pygame.draw.rect(pantalla, self.color_actual, self.rect, border_radius=8)
         pygame.draw.rect(pantalla, (50, 50, 50), self.rect, 2, border_radius=8)
         
-        texto_superficie = FUENTE_MEDIA.render(self.texto, True, (255, 255, 255))
-        texto_rect = texto_superficie.get_rect(center=self.rect.center)
-        pantalla.blit(texto_superficie, texto_rect)
+        if self._texto_renderizado != self.texto:
+            self._superficie_texto = renderizar_texto(FUENTE_MEDIA, self.texto, True, (255, 255, 255))
+            self._texto_renderizado = self.texto
+        texto_rect = self._superficie_texto.get_rect(center=self.rect.center)
+        pantalla.blit(self._superficie_texto, texto_rect)
     
     def manejar_evento(self, evento):
         if not self.activo:
@@ -349,12 +1168,26 @@ class Boton:
 
 # Checkbox para selección de rimas
 class Checkbox:
+    __slots__ = ("rect", "check_rect", "texto", "valor", "_texto_renderizado", "_superficie_texto")
+    
     def __init__(self, x, y, ancho, alto, texto, valor=False):
         self.rect = pygame.Rect(x, y, ancho, alto)
         self.check_rect = pygame.Rect(x, y, alto, alto)
+        self._texto_renderizado = None
+        self._superficie_texto = None
+        self.configurar(x, y, ancho, alto, texto, valor)
+    
+    def configurar(self, x, y, ancho, alto, texto, valor=False):
+        """Deja el checkbox como recién creado; los rectángulos y el texto renderizado se conservan si sirven"""
+        self.rect.update(x, y, ancho, alto)
+        self.check_rect.update(x, y, alto, alto)
         self.texto = texto
         self.valor = valor
     
+    def estado_visual(self):
+        """Firma de todo lo que afecta al aspecto del checkbox, para detectar cambios"""
+        return (tuple(self.rect), self.texto, self.valor)
+    
     def dibujar(self, pantalla):
         pygame.draw.rect(pantalla, (255, 255, 255), self.check_rect, border_radius=4)
         pygame.draw.rect(pantalla, (50, 50, 50), self.check_rect, 2, border_radius=4)
@@ -364,9 +1197,11 @@ class Checkbox:
                                    self.check_rect.width - 8, self.check_rect.height - 8)
             pygame.draw.rect(pantalla, COLOR_BOTON, interior, border_radius=2)
         
-        texto_superficie = FUENTE_PEQUEÑA.render(self.texto, True, COLOR_TEXTO)
-        texto_rect = texto_superficie.get_rect(midleft=(self.check_rect.right + 10, self.check_rect.centery))
-        pantalla.blit(texto_superficie, texto_rect)
+        if self._texto_renderizado != self.texto:
+            self._superficie_texto = renderizar_texto(FUENTE_PEQUEÑA, self.texto, True, COLOR_TEXTO)
+            self._texto_renderizado = self.texto
+        texto_rect = self._superficie_texto.get_rect(midleft=(self.check_rect.right + 10, self.check_rect.centery))
+        pantalla.blit(self._superficie_texto, texto_rect)
     
     def manejar_evento(self, evento):
         if evento.type == pygame.MOUSEBUTTONDOWN and evento.button == 1:
@@ -375,21 +1210,113 @@ class Checkbox:
                 return True
         return False
 
+# Reserva de widgets: los controles de una actividad terminada se reutilizan en las siguientes
+class ReservaWidgets:
+    def __init__(self, maximo=64):
+        self.maximo = maximo  # Widgets libres que se guardan por clase
+        self.libres = {}  # clase -> widgets libres
+        self.creados = 0
+        self.reutilizados = 0
+        self.lock = threading.Lock()  # Los controles se construyen también en el hilo de precarga
+    
+    def tomar(self, clase, cantidad):
+        """Saca hasta `cantidad` widgets libres de la clase; quien los toma debe llamar a su configurar"""
+        with self.lock:
+            libres = self.libres.get(clase)
+            tomados = libres[-cantidad:] if libres and cantidad else []
+            if tomados:
+                del libres[-len(tomados):]
+            self.reutilizados += len(tomados)
+            self.creados += cantidad - len(tomados)
+        return tomados
+    
+    def devolver(self, clase, widgets):
+        """Recibe widgets de la clase que ya no están en pantalla ni se volverán a usar donde estaban"""
+        if not widgets:
+            return
+        with self.lock:
+            libres = self.libres.setdefault(clase, [])
+            libres.extend(widgets[:self.maximo - len(libres)])
+
+# Rejilla uniforme para encontrar el widget bajo el puntero sin recorrerlos todos
+class IndiceEspacial:
+    def __init__(self, tamano_celda=64):
+        self.tamano_celda = tamano_celda
+        self.celdas = {}  # (columna, fila) -> widgets que tocan la celda
+    
+    def limpiar(self):
+        self.celdas.clear()
+    
+    def insertar(self, widget):
+        rect = widget.rect
+        celda = self.tamano_celda
+        for columna in range(rect.left // celda, (rect.right - 1) // celda + 1):
+            for fila in range(rect.top // celda, (rect.bottom - 1) // celda + 1):
+                self.celdas.setdefault((columna, fila), []).append(widget)
+    
+    def en_punto(self, posicion):
+        """Widget que contiene el punto, o None; solo se prueban los de una celda"""
+        x, y = posicion
+        for widget in self.celdas.get((x // self.tamano_celda, y // self.tamano_celda), ()):
+            if widget.rect.collidepoint(posicion):
+                return widget
+        return None
+
+# Despachador de eventos: cada tipo va solo a sus suscriptores y los clics al widget bajo el puntero
+class DespachadorEventos:
+    def __init__(self, tamano_celda=64):
+        self.manejadores = {}  # tipo de evento -> funciones suscritas
+        self.indice = IndiceEspacial(tamano_celda)
+        self.firma_widgets = None
+    
+    def suscribir(self, tipo, manejador):
+        self.manejadores.setdefault(tipo, []).append(manejador)
+    
+    def indexar(self, widgets, firma=None):
+        """Sustituye los widgets que reciben clics; la firma identifica el conjunto indexado"""
+        self.indice.limpiar()
+        for widget in widgets:
+            self.indice.insertar(widget)
+        self.firma_widgets = firma
+    
+    def widget_en(self, posicion):
+        return self.indice.en_punto(posicion)
+    
+    def despachar(self, evento):
+        """Entrega el evento; devuelve True si algún widget lo atendió"""
+        for manejador in self.manejadores.get(evento.type, ()):
+            manejador(evento)
+        if evento.type == pygame.MOUSEBUTTONDOWN:
+            widget = self.indice.en_punto(evento.pos)
+            if widget is not None:
+                return widget.manejar_evento(evento)
+        return False
+
 # Aplicación principal con interfaz gráfica
 class AplicacionAlfabetizacion:
-    def __init__(self):
+    def __init__(self, rectangulos_sucios=True, reposo=True, sin_ventana=False, jugador="local", almacen=None,
+                 perfil=False, volcado_perfil=None, audio=True):
+        inicio = time.perf_counter()
+        inicializar_pygame()
+        
         # Configurar ventana
         self.ancho, self.alto = 800, 600
-        self.pantalla = pygame.display.set_mode((self.ancho, self.alto))
-        pygame.display.set_caption("Aprende Jugando - Alfabetización")
+        self.sin_ventana = sin_ventana
+        if sin_ventana:
+            # Modo sin ventana: se dibuja sobre una superficie en memoria
+            self.pantalla = pygame.Surface((self.ancho, self.alto))
+        else:
+            self.pantalla = pygame.display.set_mode((self.ancho, self.alto))
+            pygame.display.set_caption("Aprende Jugando - Alfabetización")
         
-        # Inicializar componentes
-        self.gestor_puntuacion = GestorPuntuacion()
-        self.generador_feedback = GeneradorRetroalimentacion()
+        # Inicializar componentes: la lógica de la partida vive en la sesión
+        self.sesion = SesionJuego(jugador, almacen)
+        self.almacen = almacen
+        self.gestor_puntuacion = self.sesion.gestor_puntuacion
+        self.generador_feedback = self.sesion.generador_feedback
+        self.muestreo = self.sesion.muestreo
+        self.fabricas = self.sesion.fabricas
         self.semaforo_actividades = threading.Semaphore(1)
-        self.modo_actual = None
-        self.nivel_actual = 1
-        self.actividad_actual = None
         self.respuesta_actual = ""
         self.mensaje_feedback = ""
         self.color_feedback = COLOR_CORRECTO
@@ -404,13 +1331,6 @@ class AplicacionAlfabetizacion:
         self.btn_cambiar_modo = Boton(self.ancho // 2 - 90, 520, 180, 50, "Cambiar Modo", accion=self.volver_menu)
         self.mostrar_btn_cambiar_modo = True
         
-        # Crear fábricas
-        self.fabricas = {
-            "letras": FabricaUnionLetras(),
-            "silabas": FabricaUnionSilabas(),
-            "rimas": FabricaAsociacionRima()
-        }
-        
         # Estado
         self.estado = "menu"  # "menu", "juego"
         self.mostrar_modal = False
@@ -419,17 +1339,91 @@ class AplicacionAlfabetizacion:
         # Tiempo para mensajes
         self.timer_feedback = 0
         
-        # Iniciar monitor en segundo plano
-        self.evento_terminar = threading.Event()
-        self.hilo_progreso = threading.Thread(target=self._monitorear_progreso)
-        self.hilo_progreso.daemon = True
-        self.hilo_progreso.start()
+        # Renderizado por rectángulos sucios: solo se redibuja lo que cambió
+        self.rectangulos_sucios = rectangulos_sucios
+        self._regiones_previas = {}
+        self._firma_pantalla = None
+        self._redibujo_completo = True
+        
+        # Modo reposo: sin animaciones ni hover, el bucle espera eventos en lugar de girar a 60 FPS
+        self.reposo = reposo
+        self.temporizadores = {}  # tipo de evento -> instante (ms) en que debe dispararse
+        
+        # Pronunciación de letras, sílabas y palabras (ver audio.py); sin ventana no se oye nada
+        self.audio = SistemaAudio(activo=audio and not sin_ventana)
+        
+        # Controles de las actividades: reutilizados entre actividades, con la disposición memorizada
+        self.reserva_widgets = ReservaWidgets()
+        self.disposiciones = {}  # (tipo de actividad, cantidad de elementos) -> rectángulos
+        self.generacion_controles = 0  # Cambia con cada conjunto de controles, para el índice de clics
+        self.generacion_actividad = 0  # Cambia con cada actividad, para la capa estática y el índice de clics
+        
+        # Hilo que prepara la siguiente actividad durante la pausa de 2 segundos
+        self.ejecutor_precarga = ThreadPoolExecutor(max_workers=1, thread_name_prefix="precarga")
+        self._precarga = None
+        
+        # Los hitos se notifican al sumar puntos, como eventos que despiertan el bucle principal
+        self.gestor_puntuacion.registrar_observador(NotificadorHitos())
+        
+        # Partes estáticas de cada pantalla, compuestas una vez y reutilizadas en cada cuadro
+        self.capas = CacheCapas()
+        
+        # Cada tipo de evento llega solo a quien lo atiende
+        self.despachador = DespachadorEventos()
+        self.despachador.suscribir(pygame.MOUSEMOTION, ENTRADA.mover)
+        self.despachador.suscribir(pygame.VIDEOEXPOSE, self._al_exponer_ventana)
+        self.despachador.suscribir(pygame.WINDOWEXPOSED, self._al_exponer_ventana)
+        self.despachador.suscribir(pygame.USEREVENT, self._al_vencer_actividad)
+        self.despachador.suscribir(pygame.USEREVENT + 1, self._al_vencer_nivel)
+        self.despachador.suscribir(pygame.USEREVENT + 2, self._al_alcanzar_hito)
+        self.despachador.suscribir(pygame.KEYDOWN, self._al_pulsar_tecla)
+        
+        # Perfilador de cuadros por fase; F3 muestra u oculta sus percentiles en pantalla
+        self.perfilador = PerfiladorCuadros(activo=perfil or volcado_perfil is not None)
+        self.volcado_perfil = volcado_perfil
+        self.mostrar_perfil = False
+        self.lineas_perfil = ()
+        
+        # Tiempos de arranque en ms desde que empezó a importarse el módulo
+        self.tiempos_arranque = {
+            "importacion_ms": (inicio - INICIO_IMPORTACION) * 1000,
+            "aplicacion_ms": (time.perf_counter() - inicio) * 1000
+        }
 
+    # El modo, el nivel y la actividad pertenecen a la sesión; la ventana solo los presenta
+    @property
+    def modo_actual(self):
+        return self.sesion.modo_actual
+    
+    @modo_actual.setter
+    def modo_actual(self, modo):
+        self.sesion.modo_actual = modo
+    
+    @property
+    def nivel_actual(self):
+        return self.sesion.nivel_actual
+    
+    @nivel_actual.setter
+    def nivel_actual(self, nivel):
+        self.sesion.nivel_actual = nivel
+    
+    @property
+    def actividad_actual(self):
+        return self.sesion.actividad_actual
+    
+    @actividad_actual.setter
+    def actividad_actual(self, actividad):
+        # La generación identifica la actividad en las cachés; id() se reutiliza al liberar objetos
+        if actividad is not self.sesion.actividad_actual:
+            self.generacion_actividad += 1
+        self.sesion.actividad_actual = actividad
+    
     def volver_menu(self):
         """Vuelve al menú principal para seleccionar un nuevo modo"""
         self.estado = "menu"
         self.mensaje_feedback = ""
         self.mensaje_pista = ""
+        self._descartar_precarga()
 
     def inicializar_controles(self):
         # Selector de modo
@@ -482,31 +1476,27 @@ class AplicacionAlfabetizacion:
                 self.mostrar_modal = True
                 return
         
-            # Mapear selección a modo
-            modos = ["letras", "silabas", "rimas"]
-            self.modo_actual = modos[self.modo_seleccionado]
-            self.nivel_actual = self.nivel_seleccionado
-            
-            # Crear actividad
-            fabrica = self.fabricas[self.modo_actual]
-            self.actividad_actual = fabrica.crear_actividad(self.nivel_actual)
-            
-            # Cambiar estado
-            self.estado = "juego"
-            self.respuesta_actual = ""
-            self.mensaje_feedback = ""
-            self.mensaje_pista = ""
-            
-            # Crear botones para elementos
-            self.crear_botones_elementos()
+            with self.perfilador.fase("actualizacion"):
+                # Mapear selección a modo y crear actividad
+                self.sesion.iniciar(SesionJuego.MODOS[self.modo_seleccionado], self.nivel_seleccionado)
+                self.generacion_actividad += 1  # La sesión cambió la actividad sin pasar por el setter
+                
+                # Cambiar estado
+                self.estado = "juego"
+                self.respuesta_actual = ""
+                self.mensaje_feedback = ""
+                self.mensaje_pista = ""
+                
+                # Crear botones para elementos
+                self.crear_botones_elementos()
+                self.audio.precargar(self._textos_audio(self.actividad_actual))
+                self.audio.reproducir(self.sesion.palabra_actividad())
         finally:
             self.semaforo_actividades.release()
     
     def avanzar_nivel(self):
         """Avanza al siguiente nivel manteniendo el mismo modo de juego"""
-        if self.nivel_actual < 3:
-            # Avanzar al siguiente nivel
-            self.nivel_actual += 1
+        if self.sesion.avanzar_nivel():
             # Actualizar nivel seleccionado en la interfaz
             self.nivel_seleccionado = self.nivel_actual
             # Actualizar los botones de nivel para reflejar el cambio
@@ -522,52 +1512,161 @@ class AplicacionAlfabetizacion:
             self.mostrar_modal = True
         
         # Crear nueva actividad con el nivel actualizado
-        fabrica = self.fabricas[self.modo_actual]
-        self.actividad_actual = fabrica.crear_actividad(self.nivel_actual)
+        self.siguiente_actividad()
+    
+    def siguiente_actividad(self):
+        """Pasa a la siguiente actividad del modo y nivel actuales, usando la precargada si existe"""
+        with self.perfilador.fase("actualizacion"):
+            preparada = self._tomar_precarga(self.modo_actual, self.nivel_actual)
+            if preparada is None:
+                preparada = self._preparar_actividad(self.modo_actual, self.nivel_actual)
+        
+        # Intercambio de una sola vez: la actividad y sus controles cambian juntos
+        anteriores = (self.elementos_botones, self.checkboxes_rimas)
+        self.actividad_actual, self.elementos_botones, self.checkboxes_rimas = preparada
+        self._devolver_controles(*anteriores)
+        self.audio.reproducir(self.sesion.palabra_actividad())
         self.respuesta_actual = ""
         self.mensaje_feedback = ""
         self.mensaje_pista = ""
-        self.crear_botones_elementos()
+    
+    def _preparar_actividad(self, modo, nivel):
+        """Genera una actividad con sus controles y deja renderizados sus textos en la caché"""
+        actividad = self.fabricas[modo].crear_actividad(nivel)
+        elementos_botones, checkboxes = self._construir_controles(actividad)
+        
+        renderizar_texto(FUENTE_GRANDE, actividad.datos["instruccion"], True, COLOR_TEXTO)
+        if "palabra_base" in actividad.datos:
+            renderizar_texto(FUENTE_GRANDE, f"Palabra: {actividad.datos['palabra_base']}", True, COLOR_TEXTO)
+        for btn in elementos_botones:
+            renderizar_texto(FUENTE_MEDIA, btn.texto, True, (255, 255, 255))
+        for checkbox in checkboxes:
+            renderizar_texto(FUENTE_PEQUEÑA, checkbox.texto, True, COLOR_TEXTO)
+        # Los clips de la palabra y de cada ficha se decodifican antes de que se pidan
+        self.audio.precargar(self._textos_audio(actividad))
+        return actividad, elementos_botones, checkboxes
+    
+    def _textos_audio(self, actividad):
+        """Textos que se pueden oír en una actividad: su palabra y cada ficha"""
+        return [actividad.datos.get("palabra_base") or actividad.datos["solucion"]] + list(actividad.datos["elementos"])
+    
+    def _precargar(self, nivel):
+        """Empieza a preparar en segundo plano la actividad que se mostrará al vencer el temporizador.
+        
+        Si ya hay una en marcha para el mismo modo y nivel se aprovecha; si es de otro, se cancela.
+        """
+        if self._precarga is not None:
+            modo_precarga, nivel_precarga, futuro = self._precarga
+            if (modo_precarga, nivel_precarga) == (self.modo_actual, nivel) and not futuro.cancelled():
+                return
+            self._descartar_precarga()
+        futuro = self.ejecutor_precarga.submit(self._preparar_actividad, self.modo_actual, nivel)
+        self._precarga = (self.modo_actual, nivel, futuro)
+    
+    def _descartar_precarga(self):
+        if self._precarga is not None:
+            self._cancelar_precarga(self._precarga[2])
+            self._precarga = None
+    
+    def _cancelar_precarga(self, futuro):
+        """Cancela una precarga; si ya había construido sus controles, vuelven a la reserva"""
+        futuro.cancel()
+        
+        def devolver(futuro):
+            if not futuro.cancelled() and futuro.exception() is None:
+                _, elementos_botones, checkboxes = futuro.result()
+                self.reserva_widgets.devolver(Boton, elementos_botones)
+                self.reserva_widgets.devolver(Checkbox, checkboxes)
+        
+        futuro.add_done_callback(devolver)
+    
+    def _tomar_precarga(self, modo, nivel):
+        """Devuelve la actividad precargada si corresponde al modo y nivel pedidos"""
+        precarga, self._precarga = self._precarga, None
+        if precarga is None:
+            return None
+        modo_precarga, nivel_precarga, futuro = precarga
+        if (modo_precarga, nivel_precarga) != (modo, nivel):
+            self._cancelar_precarga(futuro)
+            return None
+        # Si el hilo aún no terminó se espera: normalmente acabó hace tiempo
+        try:
+            return futuro.result()
+        except Exception:
+            # Quien llama la prepara de nuevo en este hilo; si vuelve a fallar, el error ya no se oculta
+            log.exception("Falló la precarga de una actividad (%s, nivel %s)", modo, nivel)
+            return None
     
     def crear_botones_elementos(self):
-        self.elementos_botones = []
-        self.checkboxes_rimas = []
+        anteriores = (self.elementos_botones, self.checkboxes_rimas)
+        self.elementos_botones, self.checkboxes_rimas = self._construir_controles(self.actividad_actual)
+        self._devolver_controles(*anteriores)
+    
+    def _devolver_controles(self, elementos_botones, checkboxes):
+        """Pasa a la reserva los controles que acaban de salir de pantalla"""
+        self.generacion_controles += 1
+        self.reserva_widgets.devolver(Boton, elementos_botones)
+        self.reserva_widgets.devolver(Checkbox, checkboxes)
+    
+    def _disposicion(self, tipo, cantidad):
+        """Rectángulos (x, y, ancho, alto) de los controles de una actividad, calculados una vez por tipo y cantidad"""
+        clave = (tipo, cantidad)
+        disposicion = self.disposiciones.get(clave)
+        if disposicion is not None:
+            return disposicion
         
-        if self.actividad_actual.datos["tipo"] == "rimas":
-            # Crear checkboxes para rimas
-            palabras = self.actividad_actual.datos["elementos"]
-            
+        rectangulos = []
+        if tipo == "rimas":
             # Modificar la posición base para evitar superponerse con la retroalimentación
             y_base = 180  # Cambiado de 300 a 180 para mover los checkboxes hacia arriba
             
             # Calcular el espacio disponible y distribuir los checkboxes de manera más organizada
-            altura_total = min(30 * len(palabras), 180)  # Limitar la altura total
-            espacio_vertical = altura_total / len(palabras)
+            altura_total = min(30 * cantidad, 180)  # Limitar la altura total
+            espacio_vertical = altura_total / cantidad
             
-            for i, palabra in enumerate(palabras):
+            for i in range(cantidad):
                 # Usar dos columnas si hay muchas palabras
-                if len(palabras) > 4 and i >= len(palabras) // 2:
+                if cantidad > 4 and i >= cantidad // 2:
                     # Segunda columna
                     x_pos = 420
-                    y_pos = y_base + (i - len(palabras) // 2) * espacio_vertical
+                    y_pos = y_base + (i - cantidad // 2) * espacio_vertical
                 else:
                     # Primera columna
                     x_pos = 200
                     y_pos = y_base + i * espacio_vertical
-                    
-                checkbox = Checkbox(x_pos, y_pos, 200, 30, palabra)
-                self.checkboxes_rimas.append(checkbox)
+                rectangulos.append((x_pos, int(y_pos), 200, 30))
         else:
-            # El código original para letras o sílabas se mantiene igual
-            elementos = self.actividad_actual.datos["elementos"]
-            ancho_boton = min(60, (self.ancho - 200) // len(elementos))
-            for i, elemento in enumerate(elementos):
-                x = (self.ancho - (ancho_boton * len(elementos))) // 2 + i * ancho_boton
-                btn = Boton(x, 300, ancho_boton-5, 50, elemento, accion=self.agregar_elemento, param=(i, elemento))
-                self.elementos_botones.append(btn)
+            # Letras o sílabas: una fila centrada
+            ancho_boton = min(60, (self.ancho - 200) // cantidad)
+            for i in range(cantidad):
+                x = (self.ancho - (ancho_boton * cantidad)) // 2 + i * ancho_boton
+                rectangulos.append((x, 300, ancho_boton - 5, 50))
+        disposicion = self.disposiciones[clave] = tuple(rectangulos)
+        return disposicion
+    
+    def _construir_controles(self, actividad):
+        """Coloca los botones o checkboxes de una actividad, tomándolos de la reserva de widgets"""
+        elementos = actividad.datos["elementos"]
+        cantidad = len(elementos)
+        disposicion = self._disposicion(actividad.datos["tipo"], cantidad)
+        
+        if actividad.datos["tipo"] == "rimas":
+            checkboxes = self.reserva_widgets.tomar(Checkbox, cantidad)
+            for checkbox, rectangulo, palabra in zip(checkboxes, disposicion, elementos):
+                checkbox.configurar(*rectangulo, palabra)
+            checkboxes += [Checkbox(*disposicion[i], elementos[i]) for i in range(len(checkboxes), cantidad)]
+            return [], checkboxes
+        
+        botones = self.reserva_widgets.tomar(Boton, cantidad)
+        for i, (boton, rectangulo, elemento) in enumerate(zip(botones, disposicion, elementos)):
+            boton.configurar(*rectangulo, elemento, accion=self.agregar_elemento, param=(i, elemento))
+        botones += [Boton(*disposicion[i], elementos[i], accion=self.agregar_elemento, param=(i, elementos[i]))
+                    for i in range(len(botones), cantidad)]
+        return botones, []
         
     def agregar_elemento(self, param):
         id_boton, elemento = param  # Desempaquetar los parámetros
+        self.audio.reproducir(elemento)
         # Verificar si el botón específico ya ha sido usado
         if self.actividad_actual.usar_elemento(id_boton, elemento):
             self.respuesta_actual += elemento
@@ -591,152 +1690,379 @@ class AplicacionAlfabetizacion:
         if not self.actividad_actual:
             return
         
-        if self.actividad_actual.datos["tipo"] == "rimas":
-            # Verificar respuesta de rimas
-            seleccionadas = [checkbox.texto for checkbox in self.checkboxes_rimas if checkbox.valor]
-            resultado = self.actividad_actual.verificar(seleccionadas)
-        else:
-            # Verificar respuesta de letras o sílabas
-            resultado = self.actividad_actual.verificar(self.respuesta_actual)
-        
-        self.procesar_resultado(resultado)
+        with self.perfilador.fase("actualizacion"):
+            if self.actividad_actual.datos["tipo"] == "rimas":
+                # Verificar respuesta de rimas
+                seleccionadas = [checkbox.texto for checkbox in self.checkboxes_rimas if checkbox.valor]
+                resultado = self.actividad_actual.verificar(seleccionadas)
+            else:
+                # Verificar respuesta de letras o sílabas
+                resultado = self.actividad_actual.verificar(self.respuesta_actual)
+            
+            self.procesar_resultado(resultado)
     
     def procesar_resultado(self, resultado):
-        correcto = resultado["correcto"]
+        evaluacion = self.sesion.procesar_resultado(resultado)
         
         # Mostrar retroalimentación
-        self.mensaje_feedback = self.generador_feedback.obtener_retroalimentacion(correcto, self.nivel_actual)
-        self.color_feedback = COLOR_CORRECTO if correcto else COLOR_INCORRECTO
+        self.mensaje_feedback = evaluacion["mensaje_feedback"]
+        self.color_feedback = COLOR_CORRECTO if evaluacion["correcto"] else COLOR_INCORRECTO
         self.timer_feedback = pygame.time.get_ticks()
+        if evaluacion["mensaje_pista"]:
+            self.mensaje_pista = evaluacion["mensaje_pista"]
         
-        # Actualizar puntuación si es correcto
-        if correcto:
-            puntos = self.nivel_actual * 10
-            self.gestor_puntuacion.aumentar_puntuacion(puntos)
-            
-            # Verificar si debe avanzar al siguiente nivel
-            if self.gestor_puntuacion.verificar_cambio_nivel():
-                # Programar cambio de nivel después de un breve retraso
-                pygame.time.set_timer(pygame.USEREVENT + 1, 2000, True)  # Evento único para cambiar nivel
-            else:
-                # Programar nueva actividad después de un breve retraso
-                pygame.time.set_timer(pygame.USEREVENT, 2000, True)  # Evento único para nueva actividad
+        if evaluacion["siguiente"] == "nivel":
+            # Programar cambio de nivel después de un breve retraso
+            self._precargar(min(self.nivel_actual + 1, SesionJuego.NIVEL_MAXIMO))
+            self.programar_evento(pygame.USEREVENT + 1, 2000)  # Evento único para cambiar nivel
+        elif evaluacion["siguiente"] == "actividad":
+            # Programar nueva actividad después de un breve retraso
+            self._precargar(self.nivel_actual)
+            self.programar_evento(pygame.USEREVENT, 2000)  # Evento único para nueva actividad
+    
+    def programar_evento(self, tipo, retraso_ms):
+        """Programa un evento único; sustituye a pygame.time.set_timer para conocer los plazos pendientes"""
+        self.temporizadores[tipo] = pygame.time.get_ticks() + retraso_ms
+    
+    def disparar_temporizadores(self, todos=False):
+        """Devuelve los eventos cuyos temporizadores ya vencieron (o todos los pendientes)"""
+        ahora = pygame.time.get_ticks()
+        vencidos = [tipo for tipo, instante in self.temporizadores.items() if todos or instante <= ahora]
+        eventos = []
+        for tipo in vencidos:
+            del self.temporizadores[tipo]
+            eventos.append(pygame.event.Event(tipo))
+        return eventos
+    
+    def _proximo_plazo(self):
+        """Milisegundos hasta el siguiente cambio programado, o None si no hay ninguno"""
+        plazos = list(self.temporizadores.values())
+        if self.mensaje_feedback and self.estado == "juego":
+            # El mensaje de retroalimentación desaparece a los 5 segundos
+            expiracion = self.timer_feedback + 5000
+            if expiracion > pygame.time.get_ticks():
+                plazos.append(expiracion)
+        if not plazos:
+            return None
+        return max(1, min(plazos) - pygame.time.get_ticks())
+    
+    def _requiere_cuadros_continuos(self):
+        """Indica si hay algo en pantalla (hover) que justifique renderizar a velocidad completa"""
+        if not ENTRADA.raton_en_ventana:
+            return False
+        self._sincronizar_indice()
+        widget = self.despachador.widget_en(ENTRADA.posicion_raton)
+        return isinstance(widget, Boton) and widget.activo
+    
+    def _obtener_eventos(self):
+        """Obtiene los eventos del cuadro, bloqueando hasta el siguiente si la aplicación está en reposo"""
+        if self.reposo and not self._requiere_cuadros_continuos():
+            plazo = self._proximo_plazo()
+            evento = pygame.event.wait() if plazo is None else pygame.event.wait(plazo)
+            eventos = [] if evento.type == pygame.NOEVENT else [evento]
+            eventos.extend(pygame.event.get())
         else:
-            # Mostrar pista si hay intentos restantes
-            if resultado["pista"]:
-                self.mensaje_pista = f"Pista: {resultado['pista']}"
+            eventos = pygame.event.get()
+        eventos.extend(self.disparar_temporizadores())
+        return eventos
+    
+    def procesar_evento(self, evento):
+        """Atiende un evento de la aplicación; devuelve False si se pidió salir"""
+        if evento.type == pygame.QUIT:
+            return False
+        with self.perfilador.fase("eventos"):
+            if evento.type == pygame.MOUSEBUTTONDOWN:
+                self._sincronizar_indice()
+            self.despachador.despachar(evento)
+        
+        # Cerrar modal con clic
+        if self.mostrar_modal and evento.type == pygame.MOUSEBUTTONDOWN:
+            self.mostrar_modal = False
+        return True
+    
+    def _al_exponer_ventana(self, evento):
+        # La ventana se volvió a mostrar: el contenido previo no es fiable
+        self.invalidar_pantalla()
+    
+    def _al_vencer_actividad(self, evento):
+        # Evento para nueva actividad en el mismo nivel
+        if self.estado == "juego":
+            self.siguiente_actividad()
+    
+    def _al_vencer_nivel(self, evento):
+        # Evento para avanzar de nivel
+        if self.estado == "juego":
+            self.avanzar_nivel()
+    
+    def _al_alcanzar_hito(self, evento):
+        # Evento para mostrar mensaje de hito
+        puntuacion = evento.dict["puntuacion"]
+        self.mensaje_modal = f"¡Felicidades! Has alcanzado {puntuacion} puntos."
+        self.mostrar_modal = True
+    
+    def _al_pulsar_tecla(self, evento):
+        if evento.key == pygame.K_F3:
+            # Mostrar el perfil lo activa aunque no se haya pedido al arrancar
+            self.mostrar_perfil = not self.mostrar_perfil
+            self.perfilador.activo = self.perfilador.activo or self.mostrar_perfil
+            self.lineas_perfil = tuple(self.perfilador.lineas_resumen())
+    
+    def _widgets_activos(self):
+        """Widgets que responden a clics en la pantalla actual"""
+        if self.estado == "menu":
+            return self.btn_modos + self.btn_niveles + [self.btn_iniciar]
+        if self.estado == "juego":
+            if self.actividad_actual.datos["tipo"] == "rimas":
+                widgets = list(self.checkboxes_rimas)
             else:
-                # Si se agotaron los intentos, mostrar la respuesta correcta
-                if isinstance(self.actividad_actual.datos["solucion"], list):
-                    solucion = ", ".join(self.actividad_actual.datos["solucion"])
-                else:
-                    solucion = self.actividad_actual.datos["solucion"]
-                self.mensaje_pista = f"La respuesta correcta era: {solucion}"
-                # Programar nueva actividad después de un breve retraso
-                pygame.time.set_timer(pygame.USEREVENT, 2000, True)
-    
-    def _monitorear_progreso(self):
-        """Función que corre en un hilo separado para monitorear el progreso del jugador"""
-        while not self.evento_terminar.is_set():
-            puntuacion = self.gestor_puntuacion.obtener_puntuacion()
-            
-            # Verificar si se alcanzó un hito
-            if self.gestor_puntuacion.verificar_hito(puntuacion):
-                # No podemos interactuar directamente con Pygame desde otro hilo
-                # Enviar un evento personalizado para mostrar mensaje
-                evento_hito = pygame.event.Event(pygame.USEREVENT + 2, {"puntuacion": puntuacion})
-                pygame.event.post(evento_hito)
-            
-            # Esperar un tiempo antes de la siguiente verificación
-            time.sleep(1)
+                widgets = list(self.elementos_botones)
+            widgets += [self.btn_verificar, self.btn_borrar]
+            if self.mostrar_btn_cambiar_modo:
+                widgets.append(self.btn_cambiar_modo)
+            return widgets
+        return []
     
-    def ejecutar(self):
+    def _sincronizar_indice(self):
+        """Reconstruye el índice de clics solo si cambió el conjunto de widgets en pantalla"""
+        firma = (self.estado, self.generacion_actividad if self.estado == "juego" else None, self.generacion_controles,
+                 id(self.elementos_botones), id(self.checkboxes_rimas), self.mostrar_btn_cambiar_modo)
+        if firma != self.despachador.firma_widgets:
+            self.despachador.indexar(self._widgets_activos(), firma)
+    
+    def ejecutar(self, medir_arranque=False):
         reloj = pygame.time.Clock()
-        ejecutando = True
+        
+        # Primer cuadro antes de esperar eventos, para medir cuánto tarda en aparecer
+        ENTRADA.capturar()
+        self.dibujar_cuadro()
+        self.tiempos_arranque["primer_cuadro_ms"] = (time.perf_counter() - INICIO_IMPORTACION) * 1000
+        ejecutando = not medir_arranque
+        if medir_arranque:
+            print("  ".join(f"{nombre}: {ms:.1f}" for nombre, ms in self.tiempos_arranque.items()))
         
         while ejecutando:
-            for evento in pygame.event.get():
-                if evento.type == pygame.QUIT:
+            ENTRADA.capturar()  # Una sola lectura del ratón por cuadro
+            for evento in self._obtener_eventos():
+                if not self.procesar_evento(evento):
                     ejecutando = False
-                elif evento.type == pygame.USEREVENT:
-                    # Evento para nueva actividad en el mismo nivel
-                    if self.estado == "juego":
-                        fabrica = self.fabricas[self.modo_actual]
-                        self.actividad_actual = fabrica.crear_actividad(self.nivel_actual)
-                        self.respuesta_actual = ""
-                        self.mensaje_feedback = ""
-                        self.mensaje_pista = ""
-                        self.crear_botones_elementos()
-                elif evento.type == pygame.USEREVENT + 1:
-                    # Evento para avanzar de nivel
-                    if self.estado == "juego":
-                        self.avanzar_nivel()
-                elif evento.type == pygame.USEREVENT + 2:
-                    # Evento para mostrar mensaje de hito
-                    puntuacion = evento.dict["puntuacion"]
-                    self.mensaje_modal = f"¡Felicidades! Has alcanzado {puntuacion} puntos."
-                    self.mostrar_modal = True
-                
-                # Manejar clics en botones según el estado actual
-                if self.estado == "menu":
-                    for btn in self.btn_modos:
-                        btn.manejar_evento(evento)
-                    for btn in self.btn_niveles:
-                        btn.manejar_evento(evento)
-                    self.btn_iniciar.manejar_evento(evento)
-                    
-                elif self.estado == "juego":
-                    if self.actividad_actual.datos["tipo"] == "rimas":
-                        for checkbox in self.checkboxes_rimas:
-                            checkbox.manejar_evento(evento)
-                    else:
-                        for btn in self.elementos_botones:
-                            btn.manejar_evento(evento)
-                    
-                    self.btn_verificar.manejar_evento(evento)
-                    self.btn_borrar.manejar_evento(evento)
-                    
-                    if self.mostrar_btn_cambiar_modo:
-                        self.btn_cambiar_modo.manejar_evento(evento)
-                
-                # Cerrar modal con clic
-                if self.mostrar_modal and evento.type == pygame.MOUSEBUTTONDOWN:
-                    self.mostrar_modal = False
             
             # Dibujar interfaz
-            self.pantalla.fill(COLOR_FONDO)
-            
-            # Dibujar elementos según el estado actual
+            self.dibujar_cuadro()
+            if self.reposo and not self._requiere_cuadros_continuos():
+                # En reposo el ritmo lo marca la espera de eventos, no el reloj
+                reloj.tick()
+            else:
+                reloj.tick(60)
+        
+        self.cerrar()
+        pygame.quit()
+        sys.exit()
+    
+    def cerrar(self):
+        """Detiene los hilos en segundo plano de la aplicación"""
+        # Terminar el hilo de precarga al salir
+        self.ejecutor_precarga.shutdown(wait=True, cancel_futures=True)
+        self.audio.cerrar()
+        self.gestor_puntuacion.cerrar(ESPERA_OBSERVADORES)  # Antes del almacén: lo pendiente aún debe llegar a él
+        if self.almacen is not None:
+            self.almacen.cerrar()
+        if self.volcado_perfil is not None:
+            self.perfilador.volcar(self.volcado_perfil)
+    
+    def dibujar_escena(self):
+        """Dibuja la pantalla completa (respetando el área de recorte activa)"""
+        perfilador = self.perfilador
+        with perfilador.fase("dibujo"):
+            # Dibujar elementos según el estado actual, sobre su capa estática
             if self.estado == "menu":
-                self.dibujar_menu()
+                with perfilador.fase("dibujar_menu"):
+                    self.pantalla.blit(self._capa_menu(), (0, 0))
+                    self.dibujar_menu()
             elif self.estado == "juego":
-                self.dibujar_juego()
+                with perfilador.fase("dibujar_juego"):
+                    self.pantalla.blit(self._capa_juego(), (0, 0))
+                    self.dibujar_juego()
+            else:
+                self.pantalla.fill(COLOR_FONDO)
             
             # Dibujar modal si es necesario
             if self.mostrar_modal:
-                self.dibujar_modal()
+                with perfilador.fase("dibujar_modal"):
+                    self.dibujar_modal()
             
-            pygame.display.flip()
-            reloj.tick(60)
+            if self.mostrar_perfil:
+                self.dibujar_perfil()
+    
+    def dibujar_cuadro(self):
+        """Dibuja un cuadro y lo envía a la pantalla, completo o por rectángulos sucios"""
+        if not self.rectangulos_sucios:
+            self.dibujar_escena()
+            self._presentar()
+            self._cerrar_cuadro()
+            return
         
-        # Terminar hilo de monitoreo al salir
-        self.evento_terminar.set()
-        self.hilo_progreso.join()
-        pygame.quit()
-        sys.exit()
+        regiones = self._regiones_visibles()
+        firma_pantalla = (self.estado, self.mostrar_modal, self.mensaje_modal)
+        
+        if self._redibujo_completo or firma_pantalla != self._firma_pantalla:
+            # Cambio de pantalla o de modal: se redibuja todo
+            self.dibujar_escena()
+            self._presentar()
+        else:
+            sucios = self._calcular_rectangulos_sucios(regiones)
+            if sucios:
+                # Una sola pasada de dibujo recortada a la envolvente; se presentan solo los rectángulos sucios
+                self.pantalla.set_clip(sucios[0].unionall(sucios[1:]))
+                self.dibujar_escena()
+                self.pantalla.set_clip(None)
+                self._presentar(sucios)
+        
+        self._regiones_previas = regiones
+        self._firma_pantalla = firma_pantalla
+        self._redibujo_completo = False
+        self._cerrar_cuadro()
     
-    def dibujar_menu(self):
-        # Dibujar título
-        titulo = FUENTE_GRANDE.render("Aprende Jugando - Actividades de Alfabetización", True, COLOR_TEXTO)
-        self.pantalla.blit(titulo, (self.ancho // 2 - titulo.get_width() // 2, 50))
+    def _cerrar_cuadro(self):
+        """Registra las métricas del cuadro y refresca la superposición del perfil cada 30 cuadros"""
+        SUPERFICIES.cerrar_cuadro()
+        self.perfilador.cerrar_cuadro()
+        if self.mostrar_perfil and self.perfilador.cuadros % 30 == 0:
+            self.lineas_perfil = tuple(self.perfilador.lineas_resumen())
+    
+    def _presentar(self, rectangulos=None):
+        """Envía lo dibujado a la pantalla; sin ventana no hay nada que presentar"""
+        if self.sin_ventana:
+            return
+        with self.perfilador.fase("flip"):
+            if rectangulos is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rectangulos)
+    
+    def invalidar_pantalla(self):
+        """Fuerza un redibujo completo en el siguiente cuadro"""
+        self._redibujo_completo = True
+    
+    def _regiones_visibles(self):
+        """Devuelve {clave: (rect, firma)} de cada región que puede cambiar de aspecto"""
+        regiones = {}
+        if self.estado == "menu":
+            for i, btn in enumerate(self.btn_modos):
+                regiones[("modo", i)] = (btn.rect.copy(), btn.estado_visual())
+            for i, btn in enumerate(self.btn_niveles):
+                regiones[("nivel", i)] = (btn.rect.copy(), btn.estado_visual())
+            regiones["iniciar"] = (self.btn_iniciar.rect.copy(), self.btn_iniciar.estado_visual())
+            regiones["puntuacion"] = (pygame.Rect(self.ancho // 2, 10, self.ancho // 2, 40),
+                                      self.gestor_puntuacion.obtener_puntuacion())
+        elif self.estado == "juego":
+            datos = self.actividad_actual.datos
+            regiones["instruccion"] = (pygame.Rect(0, 45, self.ancho, 45), datos["instruccion"])
+            regiones["respuesta"] = (pygame.Rect(195, 115, 410, 70),
+                                     (datos.get("palabra_base"), self.respuesta_actual))
+            for i, checkbox in enumerate(self.checkboxes_rimas):
+                regiones[("checkbox", i)] = (checkbox.rect.copy(), checkbox.estado_visual())
+            for i, btn in enumerate(self.elementos_botones):
+                regiones[("elemento", i)] = (btn.rect.copy(), btn.estado_visual())
+            regiones["verificar"] = (self.btn_verificar.rect.copy(), self.btn_verificar.estado_visual())
+            regiones["borrar"] = (self.btn_borrar.rect.copy(), self.btn_borrar.estado_visual())
+            if self.mostrar_btn_cambiar_modo:
+                regiones["cambiar_modo"] = (self.btn_cambiar_modo.rect.copy(), self.btn_cambiar_modo.estado_visual())
+            feedback_visible = bool(self.mensaje_feedback) and pygame.time.get_ticks() - self.timer_feedback < 5000
+            regiones["feedback"] = (pygame.Rect(0, 375, self.ancho, 35),
+                                    (self.mensaje_feedback if feedback_visible else "", self.color_feedback))
+            regiones["pista"] = (pygame.Rect(0, 405, self.ancho, 30), self.mensaje_pista)
+            regiones["encabezado"] = (pygame.Rect(0, 10, 300, 70), (self.nivel_actual, self.modo_seleccionado))
+            regiones["puntuacion"] = (pygame.Rect(self.ancho // 2, 10, self.ancho // 2, 40),
+                                      self.gestor_puntuacion.obtener_puntuacion())
+        regiones["perfil"] = (self._rect_perfil(), self.lineas_perfil if self.mostrar_perfil else None)
+        return regiones
+    
+    def _calcular_rectangulos_sucios(self, regiones):
+        """Compara las regiones con las del cuadro anterior y devuelve las que cambiaron"""
+        sucios = []
+        for clave in self._regiones_previas.keys() | regiones.keys():
+            previa = self._regiones_previas.get(clave)
+            actual = regiones.get(clave)
+            if previa is not None and actual is not None and previa[1] == actual[1] and previa[0] == actual[0]:
+                continue
+            # Incluir la posición anterior para borrar lo que quedó allí
+            if previa is not None:
+                sucios.append(pygame.Rect(previa[0]))
+            if actual is not None and (previa is None or previa[0] != actual[0]):
+                sucios.append(pygame.Rect(actual[0]))
         
-        # Dibujar subtítulos
-        subtitulo1 = FUENTE_MEDIA.render("Selecciona un modo de juego:", True, COLOR_TEXTO)
-        self.pantalla.blit(subtitulo1, (100, 120))
+        # Con muchos cambios resulta más barato un solo rectángulo envolvente
+        if len(sucios) > 8:
+            sucios = [sucios[0].unionall(sucios[1:])]
+        return sucios
+    
+    def _capa_menu(self):
+        """Fondo, título y subtítulos del menú"""
+        textos = ("Aprende Jugando - Actividades de Alfabetización", "Selecciona un modo de juego:", "Selecciona un nivel:")
+        
+        def componer(capa):
+            capa.fill(COLOR_FONDO)
+            titulo = renderizar_texto(FUENTE_GRANDE, textos[0], True, COLOR_TEXTO)
+            capa.blit(titulo, (self.ancho // 2 - titulo.get_width() // 2, 50))
+            capa.blit(renderizar_texto(FUENTE_MEDIA, textos[1], True, COLOR_TEXTO), (100, 120))
+            capa.blit(renderizar_texto(FUENTE_MEDIA, textos[2], True, COLOR_TEXTO), (100, 220))
         
-        subtitulo2 = FUENTE_MEDIA.render("Selecciona un nivel:", True, COLOR_TEXTO)
-        self.pantalla.blit(subtitulo2, (100, 220))
+        return self.capas.obtener("menu", (self.ancho, self.alto, textos), (self.ancho, self.alto), componer)
+    
+    def _capa_juego(self):
+        """Fondo, instrucción, caja de respuesta (o palabra base), nivel y modo de la actividad en curso"""
+        datos = self.actividad_actual.datos
         
+        def componer(capa):
+            capa.fill(COLOR_FONDO)
+            # Dibujar instrucción
+            instruccion = renderizar_texto(FUENTE_GRANDE, datos["instruccion"], True, COLOR_TEXTO)
+            capa.blit(instruccion, (self.ancho // 2 - instruccion.get_width() // 2, 50))
+            
+            if datos["tipo"] != "rimas":
+                # Área de respuesta vacía; el texto de la respuesta se dibuja encima en cada cuadro
+                pygame.draw.rect(capa, (255, 255, 255), (200, 120, 400, 60), border_radius=10)
+                pygame.draw.rect(capa, (100, 100, 100), (200, 120, 400, 60), 2, border_radius=10)
+            else:
+                # Para rimas, mostrar la palabra base
+                palabra_base = renderizar_texto(FUENTE_GRANDE, f"Palabra: {datos['palabra_base']}", True, COLOR_TEXTO)
+                capa.blit(palabra_base, (self.ancho // 2 - palabra_base.get_width() // 2, 120))
+            
+            # Mostrar nivel e información sobre modo de juego
+            capa.blit(renderizar_texto(FUENTE_PEQUEÑA, f"Nivel: {self.nivel_actual}", True, COLOR_TEXTO), (20, 20))
+            modo_texto = self.modos[self.modo_seleccionado]
+            capa.blit(renderizar_texto(FUENTE_PEQUEÑA, f"Modo: {modo_texto}", True, COLOR_TEXTO), (20, 50))
+        
+        clave = (self.ancho, self.alto, self.generacion_actividad, self.nivel_actual, self.modo_seleccionado)
+        return self.capas.obtener("juego", clave, (self.ancho, self.alto), componer)
+    
+    def _capa_modal(self):
+        """Velo semitransparente y ventana del modal con su mensaje"""
+        def componer(capa):
+            # Fondo semitransparente
+            capa.fill((0, 0, 0, 128))
+            
+            # Ventana modal
+            modal_width, modal_height = 500, 200
+            modal_x = self.ancho // 2 - modal_width // 2
+            modal_y = self.alto // 2 - modal_height // 2
+            pygame.draw.rect(capa, (255, 255, 255), (modal_x, modal_y, modal_width, modal_height), border_radius=15)
+            pygame.draw.rect(capa, (100, 100, 100), (modal_x, modal_y, modal_width, modal_height), 2, border_radius=15)
+            
+            # Mensaje
+            mensaje_lineas = self._dividir_texto(self.mensaje_modal, 60)
+            for i, linea in enumerate(mensaje_lineas):
+                texto = renderizar_texto(FUENTE_MEDIA, linea, True, COLOR_TEXTO)
+                capa.blit(texto, (self.ancho // 2 - texto.get_width() // 2, modal_y + 60 + i * 30))
+            
+            # Instrucción
+            instruccion = renderizar_texto(FUENTE_PEQUEÑA, "Haz clic en cualquier lugar para continuar", True, COLOR_TEXTO)
+            capa.blit(instruccion, (self.ancho // 2 - instruccion.get_width() // 2, modal_y + modal_height - 40))
+        
+        return self.capas.obtener("modal", (self.ancho, self.alto, self.mensaje_modal), (self.ancho, self.alto),
+                                  componer, alfa=True)
+    
+    def dibujar_menu(self):
         # Dibujar botones
         for btn in self.btn_modos:
             btn.dibujar(self.pantalla)
@@ -747,26 +2073,14 @@ class AplicacionAlfabetizacion:
         self.btn_iniciar.dibujar(self.pantalla)
         
         # Dibujar puntuación actual
-        puntuacion = FUENTE_MEDIA.render(f"Puntuación: {self.gestor_puntuacion.obtener_puntuacion()}", True, COLOR_TEXTO)
+        puntuacion = renderizar_texto(FUENTE_MEDIA, f"Puntuación: {self.gestor_puntuacion.obtener_puntuacion()}", True, COLOR_TEXTO)
         self.pantalla.blit(puntuacion, (self.ancho - puntuacion.get_width() - 20, 20))
     
     def dibujar_juego(self):
-        # Dibujar instrucción
-        instruccion = FUENTE_GRANDE.render(self.actividad_actual.datos["instruccion"], True, COLOR_TEXTO)
-        self.pantalla.blit(instruccion, (self.ancho // 2 - instruccion.get_width() // 2, 50))
-        
-        # Dibujar área de respuesta si no son rimas
-        if self.actividad_actual.datos["tipo"] != "rimas":
-            pygame.draw.rect(self.pantalla, (255, 255, 255), (200, 120, 400, 60), border_radius=10)
-            pygame.draw.rect(self.pantalla, (100, 100, 100), (200, 120, 400, 60), 2, border_radius=10)
-            
-            if self.respuesta_actual:
-                respuesta = FUENTE_GRANDE.render(self.respuesta_actual, True, COLOR_TEXTO)
-                self.pantalla.blit(respuesta, (self.ancho // 2 - respuesta.get_width() // 2, 140))
-        else:
-            # Para rimas, mostrar la palabra base
-            palabra_base = FUENTE_GRANDE.render(f"Palabra: {self.actividad_actual.datos['palabra_base']}", True, COLOR_TEXTO)
-            self.pantalla.blit(palabra_base, (self.ancho // 2 - palabra_base.get_width() // 2, 120))
+        # Dibujar la respuesta dentro del área de la capa estática
+        if self.actividad_actual.datos["tipo"] != "rimas" and self.respuesta_actual:
+            respuesta = renderizar_texto(FUENTE_GRANDE, self.respuesta_actual, True, COLOR_TEXTO)
+            self.pantalla.blit(respuesta, (self.ancho // 2 - respuesta.get_width() // 2, 140))
         
         # Dibujar elementos según el tipo
         if self.actividad_actual.datos["tipo"] == "rimas":
@@ -787,48 +2101,32 @@ class AplicacionAlfabetizacion:
         if self.mensaje_feedback:
             tiempo_actual = pygame.time.get_ticks()
             if tiempo_actual - self.timer_feedback < 5000:  # Mostrar por 5 segundos
-                feedback = FUENTE_MEDIA.render(self.mensaje_feedback, True, self.color_feedback)
+                feedback = renderizar_texto(FUENTE_MEDIA, self.mensaje_feedback, True, self.color_feedback)
                 self.pantalla.blit(feedback, (self.ancho // 2 - feedback.get_width() // 2, 380))
         
         # Dibujar pista
         if self.mensaje_pista:
-            pista = FUENTE_PISTA.render(self.mensaje_pista, True, COLOR_PISTA)
+            pista = renderizar_texto(FUENTE_PISTA, self.mensaje_pista, True, COLOR_PISTA)
             self.pantalla.blit(pista, (self.ancho // 2 - pista.get_width() // 2, 410))
         
-        # Dibujar nivel y puntuación
-        nivel = FUENTE_PEQUEÑA.render(f"Nivel: {self.nivel_actual}", True, COLOR_TEXTO)
-        self.pantalla.blit(nivel, (20, 20))
-        
-        puntuacion = FUENTE_PEQUEÑA.render(f"Puntuación: {self.gestor_puntuacion.obtener_puntuacion()}", True, COLOR_TEXTO)
+        # Dibujar puntuación (nivel y modo están en la capa estática)
+        puntuacion = renderizar_texto(FUENTE_PEQUEÑA, f"Puntuación: {self.gestor_puntuacion.obtener_puntuacion()}", True, COLOR_TEXTO)
         self.pantalla.blit(puntuacion, (self.ancho - puntuacion.get_width() - 20, 20))
-        
-        # Mostrar información sobre modo de juego
-        modo_texto = self.modos[self.modo_seleccionado]
-        modo = FUENTE_PEQUEÑA.render(f"Modo: {modo_texto}", True, COLOR_TEXTO)
-        self.pantalla.blit(modo, (20, 50))
     
     def dibujar_modal(self):
-        # Dibujar fondo semitransparente
-        s = pygame.Surface((self.ancho, self.alto), pygame.SRCALPHA)
-        s.fill((0, 0, 0, 128))
-        self.pantalla.blit(s, (0, 0))
-        
-        # Dibujar ventana modal
-        modal_width, modal_height = 500, 200
-        modal_x = self.ancho // 2 - modal_width // 2
-        modal_y = self.alto // 2 - modal_height // 2
-        pygame.draw.rect(self.pantalla, (255, 255, 255), (modal_x, modal_y, modal_width, modal_height), border_radius=15)
-        pygame.draw.rect(self.pantalla, (100, 100, 100), (modal_x, modal_y, modal_width, modal_height), 2, border_radius=15)
-        
-        # Dibujar mensaje
-        mensaje_lineas = self._dividir_texto(self.mensaje_modal, 60)
-        for i, linea in enumerate(mensaje_lineas):
-            texto = FUENTE_MEDIA.render(linea, True, COLOR_TEXTO)
-            self.pantalla.blit(texto, (self.ancho // 2 - texto.get_width() // 2, modal_y + 60 + i * 30))
-        
-        # Dibujar instrucción
-        instruccion = FUENTE_PEQUEÑA.render("Haz clic en cualquier lugar para continuar", True, COLOR_TEXTO)
-        self.pantalla.blit(instruccion, (self.ancho // 2 - instruccion.get_width() // 2, modal_y + modal_height - 40))
+        # Velo, ventana y mensaje vienen precompuestos en una sola capa
+        self.pantalla.blit(self._capa_modal(), (0, 0))
+    
+    def _rect_perfil(self):
+        return pygame.Rect(5, self.alto - 175, 260, 170)
+    
+    def dibujar_perfil(self):
+        """Superposición con los percentiles de cada fase del cuadro"""
+        rect = self._rect_perfil()
+        pygame.draw.rect(self.pantalla, (30, 30, 30), rect, border_radius=6)
+        for i, linea in enumerate(self.lineas_perfil[:9]):
+            texto = renderizar_texto(FUENTE_PERFIL, linea, True, (230, 230, 230))
+            self.pantalla.blit(texto, (rect.x + 8, rect.y + 6 + i * 18))
     
     def _dividir_texto(self, texto, max_caracteres):
         """Divide un texto largo en líneas para mostrar en el modal"""
@@ -850,8 +2148,20 @@ class AplicacionAlfabetizacion:
 
 # Función principal
 def main():
-    app = AplicacionAlfabetizacion()
-    app.ejecutar()
+    parser = argparse.ArgumentParser(description="Aprende Jugando - Alfabetización")
+    parser.add_argument("--jugador", default="local", help="nombre con el que se guarda el progreso")
+    parser.add_argument("--progreso", default=RUTA_PROGRESO, help="base SQLite del progreso")
+    parser.add_argument("--perfil", action="store_true", help="medir el tiempo de cada fase del cuadro (F3 lo muestra)")
+    parser.add_argument("--volcar-perfil", default=None, metavar="RUTA",
+                        help="al salir, guardar los percentiles en CSV o NDJSON (.ndjson)")
+    parser.add_argument("--medir-arranque", action="store_true",
+                        help="mostrar los tiempos de arranque y salir tras el primer cuadro")
+    parser.add_argument("--sin-audio", action="store_true", help="no reproducir la pronunciación de las fichas")
+    args = parser.parse_args()
+    
+    app = AplicacionAlfabetizacion(jugador=args.jugador, almacen=AlmacenProgreso(args.progreso),
+                                   perfil=args.perfil, volcado_perfil=args.volcar_perfil, audio=not args.sin_audio)
+    app.ejecutar(medir_arranque=args.medir_arranque)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,243 @@
+"""Reglas fonológicas del español usadas por el corpus: núcleos vocálicos, sílabas y rima."""
+import re
+import unicodedata
+from functools import lru_cache
+
+VOCALES_FUERTES = "aeoáéó"
+VOCALES_DEBILES = "iuü"
+DEBILES_TONICAS = "íú"  # Una débil con tilde se comporta como fuerte (hiato: "dí-a", "ba-úl")
+VOCALES = VOCALES_FUERTES + VOCALES_DEBILES + DEBILES_TONICAS
+TILDES = "áéíóú"
+SIN_TILDES = str.maketrans("áéíóúü", "aeiouu")
+# Grupos consonánticos que no se separan y forman el ataque de la sílaba siguiente
+GRUPOS_INSEPARABLES = {"pl", "bl", "fl", "cl", "gl", "kl", "pr", "br", "fr", "cr", "gr", "kr", "tr", "dr", "tl"}
+DIGRAFOS = {"ch", "ll", "rr"}
+
+
+def normalizar(palabra):
+    """Minúsculas en forma NFC, para comparar palabras escritas de distintas maneras"""
+    return unicodedata.normalize("NFC", palabra.strip().lower())
+
+
+def _es_vocal(palabra, i):
+    """Indica si el carácter i funciona como vocal (la u de "que"/"gui" es muda; la y final suena i)"""
+    letra = palabra[i]
+    if letra == "u" and i > 0 and i + 1 < len(palabra) and palabra[i + 1] in "eéií":
+        if palabra[i - 1] == "q" or palabra[i - 1] == "g":
+            return False
+    if letra == "y":
+        # "rey", "hoy": la y final tras vocal forma diptongo
+        return i == len(palabra) - 1 and i > 0 and palabra[i - 1] in VOCALES
+    return letra in VOCALES
+
+
+def _forman_diptongo(anterior, siguiente):
+    """Dos vocales contiguas van en la misma sílaba salvo que ambas sean fuertes"""
+    if anterior == "y" or siguiente == "y":
+        return True
+    fuerte_anterior = anterior in VOCALES_FUERTES or anterior in DEBILES_TONICAS
+    fuerte_siguiente = siguiente in VOCALES_FUERTES or siguiente in DEBILES_TONICAS
+    if fuerte_anterior and fuerte_siguiente:
+        return False
+    if anterior == siguiente:
+        return False  # "chiita", "duunviro"
+    return True
+
+
+def nucleos_vocalicos(palabra):
+    """Devuelve los núcleos silábicos como pares (inicio, fin) sobre la palabra normalizada.
+
+    Cada núcleo agrupa las vocales que forman diptongo o triptongo; dos vocales fuertes
+    o una débil con tilde junto a otra vocal quedan en núcleos distintos (hiato).
+    """
+    nucleos = []
+    i = 0
+    while i < len(palabra):
+        if not _es_vocal(palabra, i):
+            i += 1
+            continue
+        inicio = i
+        i += 1
+        while i < len(palabra) and _es_vocal(palabra, i) and _forman_diptongo(palabra[i - 1], palabra[i]):
+            i += 1
+        nucleos.append((inicio, i))
+    return nucleos
+
+
+def _unidades_consonanticas(texto):
+    """Divide una secuencia de consonantes en unidades: dígrafos y "qu"/"gu" cuentan como una"""
+    unidades = []
+    i = 0
+    while i < len(texto):
+        par = texto[i:i + 2]
+        if par in DIGRAFOS or par in ("qu", "gu"):
+            unidades.append(par)
+            i += 2
+        else:
+            unidades.append(texto[i])
+            i += 1
+    return unidades
+
+
+def _corte_consonantes(unidades):
+    """Cuántas unidades de consonantes entre dos núcleos se quedan en la sílaba anterior"""
+    cantidad = len(unidades)
+    if cantidad <= 1:
+        return 0
+    if "".join(unidades[-2:]) in GRUPOS_INSEPARABLES:
+        # "ha-blar", "ins-truir"
+        return cantidad - 2
+    # "can-to", "ins-tan-te", "pers-pi-caz"
+    return cantidad - 1
+
+
+@lru_cache(maxsize=65536)
+def silabear(palabra):
+    """Separa una palabra en sílabas: silabear("mariposa") -> ("ma", "ri", "po", "sa").
+
+    Aplica las reglas de diptongo e hiato de nucleos_vocalicos y reparte las consonantes
+    entre núcleos: una pasa a la sílaba siguiente; de dos, se separan salvo los grupos
+    inseparables ("bl", "cl", "tr"...); dígrafos como "ch", "ll" y "rr" nunca se separan.
+    El resultado se memoriza, así que silabear dos veces la misma palabra es gratis.
+    """
+    palabra = normalizar(palabra)
+    nucleos = nucleos_vocalicos(palabra)
+    if len(nucleos) <= 1:
+        return (palabra,)
+
+    silabas = []
+    inicio_silaba = 0
+    for (_, fin), (siguiente, _) in zip(nucleos, nucleos[1:]):
+        unidades = _unidades_consonanticas(palabra[fin:siguiente])
+        corte = fin + sum(len(unidad) for unidad in unidades[:_corte_consonantes(unidades)])
+        silabas.append(palabra[inicio_silaba:corte])
+        inicio_silaba = corte
+    silabas.append(palabra[inicio_silaba:])
+    return tuple(silabas)
+
+
+def silabear_corpus(palabras):
+    """Silabea un corpus completo en una sola pasada; devuelve {palabra: sílabas}"""
+    resultado = {}
+    for palabra in palabras:
+        normalizada = normalizar(palabra)
+        if normalizada not in resultado:
+            resultado[normalizada] = silabear(normalizada)
+    return resultado
+
+
+def nucleo_tonico(palabra, nucleos=None):
+    """Posición de la vocal tónica de la palabra normalizada, o None si no tiene vocales"""
+    if nucleos is None:
+        nucleos = nucleos_vocalicos(palabra)
+    if not nucleos:
+        return None
+
+    for inicio, fin in nucleos:
+        for j in range(inicio, fin):
+            if palabra[j] in TILDES:
+                return j
+
+    # Sin tilde: llanas si terminan en vocal, n o s; agudas en otro caso
+    if len(nucleos) > 1 and (palabra[-1] in "aeiouns"):
+        inicio, fin = nucleos[-2]
+    else:
+        inicio, fin = nucleos[-1]
+    # Dentro de un diptongo el acento cae en la fuerte, o en la segunda de dos débiles
+    for j in range(inicio, fin):
+        if palabra[j] in VOCALES_FUERTES:
+            return j
+    return fin - 1 if palabra[fin - 1] != "y" else inicio
+
+
+def nucleo_rima(palabra):
+    """Núcleo de rima consonante: desde la vocal tónica hasta el final, sin tildes.
+
+    "canción" y "corazón" -> "on"; "casa" -> "asa"; "escuela" -> "ela".
+    """
+    palabra = normalizar(palabra)
+    tonica = nucleo_tonico(palabra)
+    if tonica is None:
+        return palabra
+    return palabra[tonica:].translate(SIN_TILDES)
+
+
+def firma_anagrama(palabra):
+    """Letras de la palabra ordenadas y sin tildes: dos palabras son anagramas si comparten firma.
+
+    "roma" y "amor" -> "amor"; "mamá" y "mama" -> "aamm".
+    """
+    return "".join(sorted(normalizar(palabra).translate(SIN_TILDES)))
+
+
+# Grafías que suenan igual en español (seseo y yeísmo incluidos): (patrón, sonido), en el orden en
+# que se prueban. "gue" y "ce" solo sustituyen la consonante; la vocal se lee después. Se aplican
+# antes de quitar las tildes, porque "güe" y "gue" no suenan igual.
+EQUIVALENCIAS_FONETICAS = (
+    ("ch", "C"), ("ll", "y"), ("rr", "R"), ("qu", "k"), ("gü", "gu"), ("gu(?=[eiéí])", "g"),
+    ("c(?=[eiéí])", "s"), ("g(?=[eiéí])", "j"), ("c", "k"), ("z", "s"), ("v", "b"), ("x", "ks"),
+    ("w", "u"), ("h", "")
+)
+PATRON_FONETICO = re.compile("|".join(f"({patron})" for patron, _ in EQUIVALENCIAS_FONETICAS))
+
+
+def _sonido(coincidencia):
+    return EQUIVALENCIAS_FONETICAS[coincidencia.lastindex - 1][1]
+
+
+@lru_cache(maxsize=65536)
+def clave_fonetica(palabra):
+    """Cómo suena la palabra, sin tildes y con una letra por sonido.
+
+    "vaca" y "baca" -> "baka"; "queso" -> "keso"; "llave" -> "yabe"; "hielo" -> "ielo".
+    """
+    clave = PATRON_FONETICO.sub(_sonido, normalizar(palabra)).translate(SIN_TILDES)
+    if clave.endswith("y"):
+        clave = clave[:-1] + "i"  # "rey", "hoy"
+    return clave
+
+
+def medidor_distancia(palabra):
+    """Devuelve una función que da la distancia de Levenshtein de `palabra` a otra.
+
+    Usa el algoritmo de vectores de bits de Myers: cada columna de la tabla de programación
+    dinámica es un entero, así que cada medición es lineal en la longitud de la otra palabra.
+    Las máscaras de `palabra` se preparan una sola vez, para comparar contra muchas.
+    """
+    mascaras = {}
+    for posicion, letra in enumerate(palabra):
+        mascaras[letra] = mascaras.get(letra, 0) | (1 << posicion)
+    todos = (1 << len(palabra)) - 1
+    ultimo = 1 << (len(palabra) - 1) if palabra else 0
+
+    def medir(otra):
+        if not palabra or not otra:
+            return len(palabra) + len(otra)
+        positivos, negativos, distancia = todos, 0, len(palabra)
+        for letra in otra:
+            iguales = mascaras.get(letra, 0)
+            verticales = iguales | negativos
+            horizontales = (((iguales & positivos) + positivos) ^ positivos) | iguales
+            suben = negativos | ~(horizontales | positivos)
+            bajan = positivos & horizontales
+            if suben & ultimo:
+                distancia += 1
+            elif bajan & ultimo:
+                distancia -= 1
+            suben = (suben << 1) | 1
+            bajan <<= 1
+            positivos = (bajan | ~(verticales | suben)) & todos
+            negativos = suben & verticales & todos
+        return distancia
+
+    return medir
+
+
+def distancia_edicion(palabra, otra):
+    """Distancia de Levenshtein: inserciones, borrados y sustituciones para pasar de una a otra"""
+    return medidor_distancia(palabra)(otra)
+
+
+def riman(palabra, otra):
+    """Indica si dos palabras distintas riman en consonante"""
+    return normalizar(palabra) != normalizar(otra) and nucleo_rima(palabra) == nucleo_rima(otra)
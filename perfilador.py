@@ -0,0 +1,140 @@
+"""Perfilador de cuadros: mide cuánto tarda cada fase de un cuadro y guarda percentiles móviles.
+
+Cada fase se mide con `with perfilador.fase("nombre"):`; las mediciones de una misma fase
+dentro de un cuadro se suman, y al cerrar el cuadro el total de cada fase que se ejecutó
+entra en un búfer circular de tamaño fijo. Los percentiles se calculan sobre los últimos
+`capacidad` cuadros. Desactivado, `fase` devuelve un gestor de contexto vacío compartido,
+así que el coste es una llamada sin medir nada.
+"""
+import csv
+import json
+import time
+from array import array
+
+# Fases que no se solapan: su suma es el tiempo de trabajo del cuadro
+FASES_PRINCIPALES = ("eventos", "dibujo", "flip")
+PERCENTILES = (50, 90, 99)
+
+
+class _FaseNula:
+    """Gestor de contexto que no hace nada, usado cuando el perfilador está desactivado"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+FASE_NULA = _FaseNula()
+
+
+class _Fase:
+    __slots__ = ("perfilador", "nombre", "inicio")
+
+    def __init__(self, perfilador, nombre):
+        self.perfilador = perfilador
+        self.nombre = nombre
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *excepcion):
+        self.perfilador.acumular(self.nombre, time.perf_counter() - self.inicio)
+        return False
+
+
+class BuferCircular:
+    """Últimas `capacidad` muestras de una fase, en segundos"""
+
+    def __init__(self, capacidad):
+        self.valores = array("d", bytes(8 * capacidad))
+        self.capacidad = capacidad
+        self.cantidad = 0
+        self.siguiente = 0
+
+    def agregar(self, valor):
+        self.valores[self.siguiente] = valor
+        self.siguiente = (self.siguiente + 1) % self.capacidad
+        self.cantidad = min(self.cantidad + 1, self.capacidad)
+
+    def muestras(self):
+        return self.valores[:self.cantidad]
+
+
+def resumir(muestras):
+    """Media, percentiles y máximo en ms de unas muestras en segundos; None si no hay muestras"""
+    ordenadas = sorted(muestras)
+    if not ordenadas:
+        return None
+    estadisticas = {
+        "muestras": len(ordenadas),
+        "media_ms": sum(ordenadas) / len(ordenadas) * 1000
+    }
+    for percentil in PERCENTILES:
+        posicion = min(len(ordenadas) - 1, len(ordenadas) * percentil // 100)
+        estadisticas[f"p{percentil}_ms"] = ordenadas[posicion] * 1000
+    estadisticas["max_ms"] = ordenadas[-1] * 1000
+    return estadisticas
+
+
+class PerfiladorCuadros:
+    def __init__(self, capacidad=600, activo=True):
+        self.capacidad = capacidad
+        self.activo = activo
+        self.buferes = {}  # fase -> BuferCircular
+        self.en_cuadro = {}  # fase -> segundos acumulados en el cuadro actual
+        self.cuadros = 0
+
+    def fase(self, nombre):
+        if not self.activo:
+            return FASE_NULA
+        return _Fase(self, nombre)
+
+    def acumular(self, nombre, segundos):
+        self.en_cuadro[nombre] = self.en_cuadro.get(nombre, 0.0) + segundos
+
+    def cerrar_cuadro(self):
+        """Pasa los totales del cuadro a los búferes; el total del cuadro es la suma de las fases principales"""
+        if not self.activo or not self.en_cuadro:
+            return
+        self.en_cuadro["cuadro"] = sum(self.en_cuadro.get(fase, 0.0) for fase in FASES_PRINCIPALES)
+        for nombre, segundos in self.en_cuadro.items():
+            bufer = self.buferes.get(nombre)
+            if bufer is None:
+                bufer = self.buferes[nombre] = BuferCircular(self.capacidad)
+            bufer.agregar(segundos)
+        self.en_cuadro = {}
+        self.cuadros += 1
+
+    def resumen(self):
+        """{fase: {"muestras", "media_ms", "p50_ms", "p90_ms", "p99_ms", "max_ms"}} de los últimos cuadros"""
+        resultado = {}
+        for nombre, bufer in self.buferes.items():
+            estadisticas = resumir(bufer.muestras())
+            if estadisticas is not None:
+                resultado[nombre] = estadisticas
+        return resultado
+
+    def lineas_resumen(self):
+        """Texto breve por fase (p50/p90/p99 en ms), para la superposición en pantalla"""
+        lineas = ["fase  p50 / p90 / p99 ms"]
+        for nombre, datos in sorted(self.resumen().items()):
+            lineas.append(f"{nombre}  {datos['p50_ms']:.2f} / {datos['p90_ms']:.2f} / {datos['p99_ms']:.2f}")
+        return lineas
+
+    def volcar(self, ruta):
+        """Escribe el resumen en CSV, o en NDJSON (una fase por línea) si la ruta termina en .ndjson/.jsonl"""
+        resumen = self.resumen()
+        if ruta.endswith((".ndjson", ".jsonl")):
+            with open(ruta, "w", encoding="utf-8") as archivo:
+                for nombre, datos in sorted(resumen.items()):
+                    archivo.write(json.dumps({"fase": nombre, **datos}) + "\n")
+            return
+        campos = ["fase", "muestras", "media_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+        with open(ruta, "w", newline="", encoding="utf-8") as archivo:
+            escritor = csv.DictWriter(archivo, fieldnames=campos)
+            escritor.writeheader()
+            for nombre, datos in sorted(resumen.items()):
+                escritor.writerow({"fase": nombre, **datos})
@@ -0,0 +1,247 @@
+"""Progreso persistente de los jugadores en SQLite.
+
+Se guardan la puntuación, los intentos de cada palabra (Actividad.intentos), las pistas
+mostradas y los cambios de nivel. El bucle del juego nunca toca el disco: cada registro
+se encola y un hilo escritor los agrupa en lotes, una transacción por lote, sobre una base
+en modo WAL. Un lote se confirma como mucho `intervalo` segundos después de encolar su
+primer registro, así que un cierre inesperado pierde a lo sumo ese intervalo de progreso.
+
+Además del historial (tablas de solo inserción) se mantienen dos resúmenes actualizados en
+la misma transacción: `jugadores` (puntuación, modo y nivel) y `palabras` (intentos,
+aciertos y fallos por palabra). Cargar a un jugador solo lee esos resúmenes, de modo que
+el arranque tarda milisegundos aunque el historial acumule meses de partidas.
+
+Si SQLite falla (base bloqueada, disco lleno, un registro inválido) el lote se reintenta
+`reintentos` veces; si sigue fallando se escribe registro a registro y se descartan, con un
+aviso en el log, solo los que fallan. El hilo escritor nunca muere por un error de escritura.
+"""
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+log = logging.getLogger(__name__)
+
+RUTA_PROGRESO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "datos", "progreso.sqlite3")
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS puntuaciones (
+    jugador TEXT NOT NULL, instante REAL NOT NULL, total INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS intentos (
+    jugador TEXT NOT NULL, instante REAL NOT NULL, modo TEXT, nivel INTEGER,
+    palabra TEXT NOT NULL, intentos INTEGER NOT NULL, correcto INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS pistas (
+    jugador TEXT NOT NULL, instante REAL NOT NULL, palabra TEXT NOT NULL, pista TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS cambios_nivel (
+    jugador TEXT NOT NULL, instante REAL NOT NULL, modo TEXT, nivel INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS jugadores (
+    jugador TEXT PRIMARY KEY, puntuacion INTEGER NOT NULL DEFAULT 0,
+    modo TEXT, nivel INTEGER NOT NULL DEFAULT 1, actualizado REAL);
+CREATE TABLE IF NOT EXISTS palabras (
+    jugador TEXT NOT NULL, palabra TEXT NOT NULL,
+    intentos INTEGER NOT NULL, aciertos INTEGER NOT NULL, fallos INTEGER NOT NULL, ultimo REAL,
+    PRIMARY KEY (jugador, palabra)) WITHOUT ROWID;
+"""
+
+# Sentencias por tipo de registro: inserción en el historial y, si aplica, en el resumen
+INSERCIONES = {
+    "puntuacion": "INSERT INTO puntuaciones VALUES (?, ?, ?)",
+    "intento": "INSERT INTO intentos VALUES (?, ?, ?, ?, ?, ?, ?)",
+    "pista": "INSERT INTO pistas VALUES (?, ?, ?, ?)",
+    "nivel": "INSERT INTO cambios_nivel VALUES (?, ?, ?, ?)"
+}
+RESUMEN_PUNTUACION = """
+INSERT INTO jugadores (jugador, puntuacion, actualizado) VALUES (?, ?, ?)
+ON CONFLICT (jugador) DO UPDATE SET puntuacion = excluded.puntuacion, actualizado = excluded.actualizado
+"""
+RESUMEN_NIVEL = """
+INSERT INTO jugadores (jugador, modo, nivel, actualizado) VALUES (?, ?, ?, ?)
+ON CONFLICT (jugador) DO UPDATE SET modo = excluded.modo, nivel = excluded.nivel,
+                                    actualizado = excluded.actualizado
+"""
+RESUMEN_PALABRA = """
+INSERT INTO palabras VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (jugador, palabra) DO UPDATE SET intentos = intentos + excluded.intentos,
+    aciertos = aciertos + excluded.aciertos, fallos = fallos + excluded.fallos, ultimo = excluded.ultimo
+"""
+
+
+def conectar(ruta):
+    """Abre la base en modo WAL; synchronous=NORMAL basta para sobrevivir a un cierre del proceso"""
+    conexion = sqlite3.connect(ruta, timeout=10)
+    conexion.execute("PRAGMA journal_mode=WAL")
+    conexion.execute("PRAGMA synchronous=NORMAL")
+    return conexion
+
+
+class AlmacenProgreso:
+    """Registra el progreso con escritura diferida en un hilo propio"""
+
+    def __init__(self, ruta=RUTA_PROGRESO, intervalo=0.5, max_lote=1000, reintentos=3):
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.max_lote = max_lote
+        self.reintentos = reintentos
+        self.lotes_escritos = 0
+        self.registros_escritos = 0
+        self.registros_descartados = 0
+
+        directorio = os.path.dirname(ruta)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        conexion = conectar(ruta)
+        with conexion:
+            conexion.executescript(ESQUEMA)
+        conexion.close()
+
+        self._cola = queue.SimpleQueue()
+        self._cerrado = False
+        self._lock_cierre = threading.Lock()
+        self._avisado_cerrado = False
+        self._hilo = threading.Thread(target=self._escribir, name="progreso", daemon=True)
+        self._hilo.start()
+
+    # Registro (no bloquea: solo encola)
+    def registrar_puntuacion(self, jugador, total):
+        self._encolar("puntuacion", (jugador, time.time(), total))
+
+    def registrar_intento(self, jugador, modo, nivel, palabra, intentos, correcto):
+        self._encolar("intento", (jugador, time.time(), modo, nivel, palabra, intentos, int(correcto)))
+
+    def registrar_pista(self, jugador, palabra, pista):
+        self._encolar("pista", (jugador, time.time(), palabra, pista))
+
+    def registrar_cambio_nivel(self, jugador, modo, nivel):
+        self._encolar("nivel", (jugador, time.time(), modo, nivel))
+
+    def _encolar(self, tipo, datos):
+        # Tras cerrar nadie lee la cola: el registro se cuenta como descartado y se avisa una vez
+        with self._lock_cierre:
+            if not self._cerrado:
+                self._cola.put((tipo, datos))
+                return
+            self.registros_descartados += 1
+            avisar, self._avisado_cerrado = not self._avisado_cerrado, True
+        if avisar:
+            log.warning("Se registró progreso con el almacén ya cerrado; se descarta")
+
+    def cargar(self, jugador):
+        """Estado guardado de un jugador: puntuación, último modo y nivel, y estadísticas por palabra"""
+        conexion = sqlite3.connect(self.ruta, timeout=10)
+        try:
+            fila = conexion.execute(
+                "SELECT puntuacion, modo, nivel FROM jugadores WHERE jugador = ?", (jugador,)).fetchone()
+            palabras = {
+                palabra: {"intentos": intentos, "aciertos": aciertos, "fallos": fallos, "ultimo": ultimo}
+                for palabra, intentos, aciertos, fallos, ultimo in conexion.execute(
+                    "SELECT palabra, intentos, aciertos, fallos, ultimo FROM palabras WHERE jugador = ?",
+                    (jugador,))
+            }
+        finally:
+            conexion.close()
+        puntuacion, modo, nivel = fila if fila else (0, None, 1)
+        return {"jugador": jugador, "puntuacion": puntuacion, "modo": modo, "nivel": nivel, "palabras": palabras}
+
+    def vaciar(self, timeout=None):
+        """Espera a que todo lo encolado hasta ahora esté confirmado en disco"""
+        if not self._hilo.is_alive():
+            return False
+        confirmado = threading.Event()
+        self._cola.put(("vaciar", confirmado))
+        return confirmado.wait(timeout)
+
+    def cerrar(self):
+        """Escribe los registros pendientes y detiene el hilo escritor"""
+        with self._lock_cierre:
+            if self._cerrado:
+                return
+            self._cerrado = True
+            self._cola.put(("fin", None))
+        self._hilo.join()
+
+    # Hilo escritor
+    def _escribir(self):
+        conexion = conectar(self.ruta)
+        try:
+            terminar = False
+            while not terminar:
+                lote = [self._cola.get()]
+                plazo = time.monotonic() + self.intervalo
+                # Acumular hasta llenar el lote o agotar el plazo del primer registro
+                while len(lote) < self.max_lote and lote[-1][0] not in ("vaciar", "fin"):
+                    restante = plazo - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        lote.append(self._cola.get(timeout=restante))
+                    except queue.Empty:
+                        break
+                terminar = lote[-1][0] == "fin"
+                try:
+                    self._escribir_lote(conexion, lote)
+                except Exception:
+                    # Un error inesperado pierde el lote, no el hilo: lo que venga después se sigue escribiendo
+                    self.registros_descartados += len(lote)
+                    log.exception("Se descartó un lote de %d registros de progreso", len(lote))
+        finally:
+            conexion.close()
+
+    def _escribir_lote(self, conexion, lote):
+        filas = {tipo: [] for tipo in INSERCIONES}
+        avisos = []
+        try:
+            for tipo, datos in lote:
+                if tipo in filas:
+                    filas[tipo].append(datos)
+                elif tipo == "vaciar":
+                    avisos.append(datos)
+            if any(filas.values()):
+                self._escribir_con_reintentos(conexion, filas)
+        finally:
+            # Quien espera en vaciar() no puede quedarse colgado aunque el lote falle
+            for aviso in avisos:
+                aviso.set()
+
+    def _escribir_con_reintentos(self, conexion, filas):
+        cantidad = sum(len(grupo) for grupo in filas.values())
+        for intento in range(self.reintentos + 1):
+            try:
+                self._confirmar(conexion, filas)
+            except sqlite3.Error as error:
+                log.warning("No se pudo escribir un lote de progreso (intento %d): %s", intento + 1, error)
+                if intento < self.reintentos:
+                    time.sleep(self.intervalo * (intento + 1))
+                continue
+            self.lotes_escritos += 1
+            self.registros_escritos += cantidad
+            return
+
+        # El lote sigue fallando: registro a registro, para perder solo los que fallan
+        descartados = 0
+        for tipo, grupo in filas.items():
+            for datos in grupo:
+                try:
+                    self._confirmar(conexion, {**dict.fromkeys(INSERCIONES, ()), tipo: [datos]})
+                except sqlite3.Error:
+                    descartados += 1
+        self.lotes_escritos += 1
+        self.registros_escritos += cantidad - descartados
+        self.registros_descartados += descartados
+        if descartados:
+            log.error("Se descartaron %d de %d registros de progreso", descartados, cantidad)
+
+    def _confirmar(self, conexion, filas):
+        """Escribe las filas y sus resúmenes en una sola transacción"""
+        with conexion:
+            for tipo, sentencia in INSERCIONES.items():
+                if filas[tipo]:
+                    conexion.executemany(sentencia, filas[tipo])
+            conexion.executemany(RESUMEN_PUNTUACION, [
+                (jugador, total, instante) for jugador, instante, total in filas["puntuacion"]])
+            conexion.executemany(RESUMEN_NIVEL, [
+                (jugador, modo, nivel, instante) for jugador, instante, modo, nivel in filas["nivel"]])
+            conexion.executemany(RESUMEN_PALABRA, [
+                (jugador, palabra, intentos, correcto, intentos - correcto, instante)
+                for jugador, instante, _, _, palabra, intentos, correcto in filas["intento"]])
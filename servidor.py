@@ -0,0 +1,362 @@
+"""Servidor de sesiones para un aula: muchas partidas sin interfaz en un solo proceso asyncio.
+
+Protocolo: líneas JSON sobre TCP local (o un socket Unix). Cada petición es un objeto con
+"op" y un "id" opcional que se devuelve en la respuesta:
+
+    {"id": 1, "op": "crear", "jugador": "ana"}           -> {"id": 1, "ok": true, "sesion": "s1", ...}
+    {"op": "iniciar", "sesion": "s1", "modo": "letras", "nivel": 1}
+    {"op": "verificar", "sesion": "s1", "respuesta": "sol"}   (lista de palabras en modo rimas)
+    {"op": "siguiente", "sesion": "s1", "cambio_nivel": false}   (nueva actividad; sube de nivel
+                                                          si "siguiente" de verificar fue "nivel")
+
+Una actividad resuelta (acertada o sin intentos) no admite más "verificar" hasta "siguiente".
+    {"op": "estado", "sesion": "s1"}
+    {"op": "cerrar", "sesion": "s1"}
+    {"op": "metricas"}
+
+Los errores se responden con {"ok": false, "error": "..."}. La solución nunca se envía
+hasta que el jugador agota los intentos (llega en "mensaje_pista").
+
+Uso:
+    python servidor.py servir --puerto 8765
+    python servidor.py carga --lanzar-servidor --clientes 200 --actividades 20
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+# Sin ventana: ninguna sesión dibuja nada
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+# SDL convierte SIGTERM/SIGINT en eventos QUIT que nadie atiende aquí
+os.environ.setdefault("SDL_NO_SIGNAL_HANDLERS", "1")
+
+from juego import ESPERA_OBSERVADORES, SesionJuego
+from persistencia import AlmacenProgreso
+
+log = logging.getLogger(__name__)
+
+PUERTO_POR_DEFECTO = 8765
+
+
+class ServidorSesiones:
+    """Mantiene las sesiones de juego y atiende el protocolo de líneas JSON"""
+
+    def __init__(self, max_sesiones=1000, almacen=None):
+        self.max_sesiones = max_sesiones
+        self.almacen = almacen
+        self.sesiones = {}
+        self._contador = itertools.count(1)
+        self.sesiones_creadas = 0
+        self.peticiones = 0
+
+    def _nueva_identidad(self, peticion):
+        """(identificador de sesión, jugador) para una petición "crear"; el jugador por omisión es la sesión"""
+        if len(self.sesiones) >= self.max_sesiones:
+            raise ValueError("Se alcanzó el máximo de sesiones")
+        identificador = f"s{next(self._contador)}"
+        return identificador, str(peticion.get("jugador", identificador))
+
+    def _crear(self, identificador, jugador, progreso=None):
+        # Se vuelve a comprobar: otras sesiones pudieron crearse mientras se leía el progreso
+        if len(self.sesiones) >= self.max_sesiones:
+            raise ValueError("Se alcanzó el máximo de sesiones")
+        sesion = SesionJuego(jugador, self.almacen, progreso)
+        self.sesiones[identificador] = sesion
+        self.sesiones_creadas += 1
+        return {"sesion": identificador, "estado": sesion.estado()}
+
+    async def atender_sin_bloquear(self, peticion):
+        """Como atender, pero lo que lee del disco o espera a otros hilos se ejecuta fuera del bucle asyncio"""
+        op = peticion.get("op")
+        if op == "crear" and self.almacen is not None:
+            identificador, jugador = self._nueva_identidad(peticion)
+            progreso = await asyncio.get_running_loop().run_in_executor(None, self.almacen.cargar, jugador)
+            return self._crear(identificador, jugador, progreso)
+        if op == "cerrar":
+            # Entregar lo pendiente a los observadores puede esperar a uno lento: nunca en el bucle
+            gestor = self._quitar(peticion).gestor_puntuacion
+            await asyncio.get_running_loop().run_in_executor(None, gestor.cerrar, ESPERA_OBSERVADORES)
+            return {"puntuacion": gestor.obtener_puntuacion()}
+        return self.atender(peticion)
+
+    def _quitar(self, peticion):
+        sesion = self._sesion(peticion)
+        del self.sesiones[peticion["sesion"]]
+        return sesion
+
+    def _sesion(self, peticion):
+        try:
+            return self.sesiones[peticion["sesion"]]
+        except KeyError:
+            raise ValueError(f"Sesión desconocida: {peticion.get('sesion')}") from None
+
+    def atender(self, peticion):
+        """Ejecuta una petición y devuelve el diccionario de respuesta (sin "id" ni "ok")"""
+        op = peticion.get("op")
+        if op == "crear":
+            return self._crear(*self._nueva_identidad(peticion))
+        if op == "iniciar":
+            sesion = self._sesion(peticion)
+            sesion.iniciar(peticion.get("modo"), int(peticion.get("nivel", 1)))
+            return {"estado": sesion.estado()}
+        if op == "verificar":
+            sesion = self._sesion(peticion)
+            if sesion.actividad_actual is None:
+                raise ValueError("La sesión no tiene una actividad en curso")
+            if sesion.actividad_resuelta:
+                # Repetir la respuesta acertada sumaría puntos sin jugar
+                raise ValueError("La actividad ya terminó; pide la siguiente")
+            return {"resultado": sesion.verificar(peticion.get("respuesta", ""))}
+        if op == "siguiente":
+            sesion = self._sesion(peticion)
+            if sesion.modo_actual is None:
+                raise ValueError("La sesión no ha iniciado ningún modo")
+            if peticion.get("cambio_nivel") and sesion.actividad_resuelta == "nivel":
+                sesion.avanzar_nivel()
+            sesion.nueva_actividad()
+            return {"estado": sesion.estado()}
+        if op == "estado":
+            return {"estado": self._sesion(peticion).estado()}
+        if op == "cerrar":
+            sesion = self._quitar(peticion)
+            sesion.gestor_puntuacion.cerrar(ESPERA_OBSERVADORES)
+            return {"puntuacion": sesion.gestor_puntuacion.obtener_puntuacion()}
+        if op == "metricas":
+            return {
+                "sesiones_activas": len(self.sesiones),
+                "sesiones_creadas": self.sesiones_creadas,
+                "peticiones": self.peticiones,
+                "cpu_segundos": time.process_time(),
+                "difusion": self.metricas_difusion()
+            }
+        raise ValueError(f"Operación desconocida: {op}")
+
+    def metricas_difusion(self):
+        """Colas de observadores de las sesiones activas: profundidad total y pérdidas por contrapresión"""
+        difusores = [sesion.gestor_puntuacion.difusor for sesion in self.sesiones.values()]
+        return {
+            "profundidad": sum(len(difusor.cola) for difusor in difusores),
+            "profundidad_maxima": max((difusor.profundidad_maxima for difusor in difusores), default=0),
+            "coalescidas": sum(difusor.coalescidas for difusor in difusores),
+            "descartadas": sum(difusor.descartadas for difusor in difusores),
+            "errores": sum(difusor.errores for difusor in difusores)
+        }
+
+    def cerrar(self):
+        """Entrega lo pendiente de las sesiones abiertas; se llama antes de cerrar el almacén.
+
+        Todas las sesiones comparten un mismo plazo, así que un observador atascado no
+        multiplica la espera por el número de sesiones.
+        """
+        fin = time.monotonic() + ESPERA_OBSERVADORES
+        for sesion in self.sesiones.values():
+            sesion.gestor_puntuacion.cerrar(max(0.0, fin - time.monotonic()))
+
+    async def _cliente(self, lector, escritor):
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                self.peticiones += 1
+                identificador = None
+                try:
+                    peticion = json.loads(linea)
+                    identificador = peticion.get("id")
+                    respuesta = {"ok": True, **(await self.atender_sin_bloquear(peticion))}
+                except (ValueError, TypeError, KeyError, AttributeError) as error:
+                    respuesta = {"ok": False, "error": str(error)}
+                except Exception as error:
+                    # Un fallo inesperado en una petición no corta la conexión del alumno
+                    log.exception("Error atendiendo la petición %r", identificador)
+                    respuesta = {"ok": False, "error": f"Error interno: {type(error).__name__}"}
+                if identificador is not None:
+                    respuesta["id"] = identificador
+                escritor.write(json.dumps(respuesta, ensure_ascii=False).encode("utf-8") + b"\n")
+                await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host="127.0.0.1", puerto=PUERTO_POR_DEFECTO, ruta_socket=None):
+        if ruta_socket:
+            servidor = await asyncio.start_unix_server(self._cliente, path=ruta_socket)
+        else:
+            servidor = await asyncio.start_server(self._cliente, host, puerto)
+        async with servidor:
+            await servidor.serve_forever()
+
+
+class ClienteSesion:
+    """Cliente mínimo del protocolo, usado por el generador de carga"""
+
+    def __init__(self, lector, escritor):
+        self.lector = lector
+        self.escritor = escritor
+        self._contador = itertools.count(1)
+        self.latencias = []
+
+    @classmethod
+    async def conectar(cls, host, puerto, ruta_socket=None):
+        if ruta_socket:
+            lector, escritor = await asyncio.open_unix_connection(ruta_socket)
+        else:
+            lector, escritor = await asyncio.open_connection(host, puerto)
+        return cls(lector, escritor)
+
+    async def pedir(self, op, **campos):
+        peticion = {"id": next(self._contador), "op": op, **campos}
+        inicio = time.perf_counter()
+        self.escritor.write(json.dumps(peticion).encode("utf-8") + b"\n")
+        await self.escritor.drain()
+        respuesta = json.loads(await self.lector.readline())
+        self.latencias.append(time.perf_counter() - inicio)
+        if not respuesta.get("ok"):
+            raise RuntimeError(respuesta.get("error"))
+        return respuesta
+
+    async def cerrar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+
+
+async def _jugar_cliente(numero, args, aleatorio):
+    """Un cliente ligero: crea una sesión y juega respondiendo a veces bien y a veces mal"""
+    cliente = await ClienteSesion.conectar(args.host, args.puerto, args.socket)
+    try:
+        respuesta = await cliente.pedir("crear", jugador=f"alumno{numero}")
+        sesion = respuesta["sesion"]
+        modo = SesionJuego.MODOS[numero % len(SesionJuego.MODOS)]
+        estado = (await cliente.pedir("iniciar", sesion=sesion, modo=modo, nivel=1 + numero % 3))["estado"]
+        for _ in range(args.actividades):
+            while True:
+                actividad = estado["actividad"]
+                elementos = list(actividad["elementos"])
+                aleatorio.shuffle(elementos)
+                if actividad["tipo"] == "rimas":
+                    respuesta = elementos[:aleatorio.randint(1, len(elementos))]
+                else:
+                    respuesta = "".join(elementos)
+                resultado = (await cliente.pedir("verificar", sesion=sesion, respuesta=respuesta))["resultado"]
+                if resultado["siguiente"]:
+                    break
+            estado = (await cliente.pedir("siguiente", sesion=sesion,
+                                          cambio_nivel=resultado["siguiente"] == "nivel"))["estado"]
+        await cliente.pedir("cerrar", sesion=sesion)
+    finally:
+        await cliente.cerrar()
+    return cliente.latencias
+
+
+def _percentil(valores, fraccion):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(fraccion * len(ordenados)))]
+
+
+async def generar_carga(args):
+    aleatorio = random.Random(args.semilla)
+    control = await ClienteSesion.conectar(args.host, args.puerto, args.socket)
+    antes = await control.pedir("metricas")
+
+    inicio = time.perf_counter()
+    latencias = []
+    pendientes = list(range(args.clientes))
+    # Se juegan los clientes por tandas de `concurrencia` conexiones simultáneas
+    for tanda in range(0, len(pendientes), args.concurrencia):
+        resultados = await asyncio.gather(*(_jugar_cliente(numero, args, aleatorio)
+                                            for numero in pendientes[tanda:tanda + args.concurrencia]))
+        for lista in resultados:
+            latencias.extend(lista)
+    duracion = time.perf_counter() - inicio
+
+    despues = await control.pedir("metricas")
+    await control.cerrar()
+
+    sesiones = despues["sesiones_creadas"] - antes["sesiones_creadas"]
+    cpu = despues["cpu_segundos"] - antes["cpu_segundos"]
+    print(f"Sesiones: {sesiones}  Peticiones: {len(latencias)}  Tiempo: {duracion:.2f} s")
+    print(f"Latencia p50: {_percentil(latencias, 0.50) * 1000:.2f} ms  "
+          f"p99: {_percentil(latencias, 0.99) * 1000:.2f} ms")
+    print(f"Peticiones/s: {len(latencias) / duracion:.0f}  Sesiones/s: {sesiones / duracion:.1f}")
+    # El servidor es un solo hilo asyncio: su tiempo de CPU equivale a núcleos ocupados
+    if cpu > 0:
+        print(f"Sesiones por núcleo-segundo: {sesiones / cpu:.1f}  (CPU del servidor: {cpu:.2f} s)")
+
+
+def _esperar_puerto(host, puerto, limite=10.0):
+    fin = time.monotonic() + limite
+    while time.monotonic() < fin:
+        try:
+            with socket.create_connection((host, puerto), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"El servidor no respondió en {host}:{puerto}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de sesiones de juego sin interfaz")
+    subcomandos = parser.add_subparsers(dest="comando", required=True)
+
+    servir = subcomandos.add_parser("servir", help="atender sesiones")
+    carga = subcomandos.add_parser("carga", help="generar carga contra un servidor")
+    for sub in (servir, carga):
+        sub.add_argument("--host", default="127.0.0.1")
+        sub.add_argument("--puerto", type=int, default=PUERTO_POR_DEFECTO)
+        sub.add_argument("--socket", default=None, help="ruta de un socket Unix en lugar de TCP")
+    servir.add_argument("--max-sesiones", type=int, default=1000)
+    servir.add_argument("--progreso", default=None, help="base SQLite donde guardar el progreso de cada jugador")
+    carga.add_argument("--clientes", type=int, default=200, help="sesiones a jugar en total")
+    carga.add_argument("--concurrencia", type=int, default=200, help="sesiones simultáneas")
+    carga.add_argument("--actividades", type=int, default=20, help="actividades por sesión")
+    carga.add_argument("--semilla", type=int, default=None)
+    carga.add_argument("--lanzar-servidor", action="store_true",
+                       help="arrancar un servidor en un subproceso para la prueba")
+    args = parser.parse_args()
+
+    if args.comando == "servir":
+        almacen = AlmacenProgreso(args.progreso) if args.progreso else None
+        servidor = ServidorSesiones(max_sesiones=args.max_sesiones, almacen=almacen)
+        try:
+            asyncio.run(servidor.servir(args.host, args.puerto, args.socket))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.cerrar()
+            if almacen is not None:
+                almacen.cerrar()
+        return
+
+    proceso = None
+    if args.lanzar_servidor:
+        comando = [sys.executable, os.path.abspath(__file__), "servir", "--host", args.host,
+                   "--puerto", str(args.puerto), "--max-sesiones", str(max(1000, args.concurrencia + 1))]
+        if args.socket:
+            comando += ["--socket", args.socket]
+        proceso = subprocess.Popen(comando, stdout=subprocess.DEVNULL)
+        if args.socket:
+            fin = time.monotonic() + 10
+            while not os.path.exists(args.socket) and time.monotonic() < fin:
+                time.sleep(0.05)
+        else:
+            _esperar_puerto(args.host, args.puerto)
+    try:
+        asyncio.run(generar_carga(args))
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""Arnés de simulación sin ventana: un jugador automático recorre sesiones completas
+de todos los modos y niveles, sin límite de cuadros por segundo, y mide el rendimiento."""
+import argparse
+import itertools
+import os
+import random
+import time
+
+# El controlador de video "dummy" debe fijarse antes de que se importe pygame
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+from juego import AplicacionAlfabetizacion, SUPERFICIES
+
+# Punto de la pantalla sin ningún control, usado para cerrar el modal
+PUNTO_NEUTRO = (5, 595)
+
+
+class JugadorBot:
+    """Juega sesiones enviando clics sintéticos al bucle de eventos de la aplicación"""
+    def __init__(self, app, tasa_error=0.2, dibujar=True, semilla=None):
+        self.app = app
+        self.tasa_error = tasa_error
+        self.dibujar = dibujar
+        self.aleatorio = random.Random(semilla)
+        self.actividades = 0
+        self.sesiones = 0
+        self.eventos = 0
+
+    def _procesar(self, evento):
+        self.eventos += 1
+        self.app.procesar_evento(evento)
+
+    def _cuadro(self):
+        """Atiende los eventos encolados por otros hilos y dibuja un cuadro"""
+        for evento in pygame.event.get():
+            self._procesar(evento)
+        if self.dibujar:
+            self.app.dibujar_cuadro()
+
+    def clic(self, posicion):
+        self._procesar(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=posicion, button=1))
+        self._procesar(pygame.event.Event(pygame.MOUSEBUTTONUP, pos=posicion, button=1))
+        self._cuadro()
+
+    def _cerrar_modal(self):
+        if self.app.mostrar_modal:
+            self.clic(PUNTO_NEUTRO)
+
+    def _avanzar_tiempo(self):
+        """Dispara de inmediato los temporizadores pendientes en lugar de esperar 2 segundos"""
+        for evento in self.app.disparar_temporizadores(todos=True):
+            self._procesar(evento)
+        self._cuadro()
+
+    def _construir_respuesta(self, solucion):
+        """Pulsa los botones de elementos que forman la solución, en orden"""
+        restante = solucion
+        usados = set()
+        while restante:
+            for i, btn in enumerate(self.app.elementos_botones):
+                if i not in usados and btn.activo and restante.startswith(btn.texto):
+                    usados.add(i)
+                    restante = restante[len(btn.texto):]
+                    self.clic(btn.rect.center)
+                    break
+            else:
+                return False
+        return True
+
+    def _responder(self, correcto):
+        app = self.app
+        self.clic(app.btn_borrar.rect.center)
+        datos = app.actividad_actual.datos
+        if datos["tipo"] == "rimas":
+            objetivo = set(datos["solucion"])
+            for checkbox in app.checkboxes_rimas:
+                marcar = (checkbox.texto in objetivo) == correcto
+                if marcar != checkbox.valor:
+                    self.clic(checkbox.rect.center)
+        elif correcto:
+            self._construir_respuesta(datos["solucion"])
+        else:
+            # Respuesta incompleta: solo el primer elemento
+            self.clic(app.elementos_botones[0].rect.center)
+        self.clic(app.btn_verificar.rect.center)
+
+    def jugar_actividad(self):
+        """Resuelve la actividad actual, a veces con errores para ejercitar las pistas"""
+        actividad = self.app.actividad_actual
+        while self.app.actividad_actual is actividad:
+            self._cerrar_modal()
+            correcto = self.aleatorio.random() >= self.tasa_error
+            self._responder(correcto)
+            if self.app.temporizadores:
+                self._avanzar_tiempo()
+        self.actividades += 1
+
+    def jugar_sesion(self, indice_modo, nivel, actividades):
+        """Elige modo y nivel en el menú, juega varias actividades y vuelve al menú"""
+        app = self.app
+        self._cerrar_modal()
+        self.clic(app.btn_modos[indice_modo].rect.center)
+        self.clic(app.btn_niveles[nivel - 1].rect.center)
+        self.clic(app.btn_iniciar.rect.center)
+        for _ in range(actividades):
+            self.jugar_actividad()
+        self._cerrar_modal()
+        self.clic(app.btn_cambiar_modo.rect.center)
+        self.sesiones += 1
+
+
+def simular(sesiones, actividades, tasa_error=0.2, dibujar=True, semilla=None, perfil=False):
+    """Juega las sesiones indicadas rotando por todos los modos y niveles; devuelve las métricas"""
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True, perfil=perfil)
+    bot = JugadorBot(app, tasa_error=tasa_error, dibujar=dibujar, semilla=semilla)
+    combinaciones = itertools.cycle(itertools.product(range(len(app.fabricas)), (1, 2, 3)))
+
+    inicio = time.perf_counter()
+    try:
+        for _ in range(sesiones):
+            indice_modo, nivel = next(combinaciones)
+            bot.jugar_sesion(indice_modo, nivel, actividades)
+        duracion = time.perf_counter() - inicio
+    finally:
+        app.cerrar()
+
+    return {
+        "sesiones": bot.sesiones,
+        "actividades": bot.actividades,
+        "eventos": bot.eventos,
+        "segundos": duracion,
+        "sesiones_por_segundo": bot.sesiones / duracion if duracion else 0.0,
+        "actividades_por_segundo": bot.actividades / duracion if duracion else 0.0,
+        "superficies": SUPERFICIES.estadisticas(),
+        "perfil": app.perfilador.resumen() if perfil else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simula sesiones de juego sin ventana")
+    parser.add_argument("--sesiones", type=int, default=90, help="número de sesiones a jugar")
+    parser.add_argument("--actividades", type=int, default=10, help="actividades por sesión")
+    parser.add_argument("--tasa-error", type=float, default=0.2, help="probabilidad de responder mal")
+    parser.add_argument("--sin-dibujo", action="store_true", help="no dibujar cuadros, solo lógica")
+    parser.add_argument("--semilla", type=int, default=None, help="semilla del jugador automático")
+    parser.add_argument("--perfil", action="store_true", help="mostrar los percentiles de cada fase del cuadro")
+    args = parser.parse_args()
+
+    if args.semilla is not None:
+        random.seed(args.semilla)
+    resultado = simular(args.sesiones, args.actividades, args.tasa_error,
+                        dibujar=not args.sin_dibujo, semilla=args.semilla, perfil=args.perfil)
+    print(f"Sesiones: {resultado['sesiones']}  Actividades: {resultado['actividades']}  "
+          f"Eventos: {resultado['eventos']}  Tiempo: {resultado['segundos']:.2f} s")
+    print(f"Sesiones/s: {resultado['sesiones_por_segundo']:.1f}  "
+          f"Actividades/s: {resultado['actividades_por_segundo']:.1f}")
+    superficies = resultado["superficies"]
+    if superficies["cuadros"]:
+        print(f"Superficies creadas: {superficies['total']}  "
+              f"Por cuadro: {superficies['media_por_cuadro']:.2f} (máximo {superficies['maximo_cuadro']})")
+    if resultado["perfil"]:
+        for fase, datos in sorted(resultado["perfil"].items()):
+            print(f"  {fase:<14} p50 {datos['p50_ms']:.3f}  p90 {datos['p90_ms']:.3f}  "
+                  f"p99 {datos['p99_ms']:.3f}  máx {datos['max_ms']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
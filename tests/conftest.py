@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Sin ventana ni tarjeta de sonido: pygame usa los controladores "dummy"
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+# Los módulos del juego están en la raíz del repositorio, sin paquete
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
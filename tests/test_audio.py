@@ -0,0 +1,87 @@
+import wave
+
+import pygame
+import pytest
+
+from audio import SistemaAudio
+
+
+def _clip(ruta, segundos=0.1, frecuencia=22050):
+    with wave.open(str(ruta), "wb") as archivo:
+        archivo.setnchannels(1)
+        archivo.setsampwidth(2)
+        archivo.setframerate(frecuencia)
+        archivo.writeframes(bytes(2 * int(segundos * frecuencia)))
+
+
+@pytest.fixture
+def directorio(tmp_path):
+    for texto in ("a", "ca", "sa", "casa"):
+        _clip(tmp_path / f"{texto}.wav")
+    return tmp_path
+
+
+@pytest.fixture
+def audio(directorio):
+    audio = SistemaAudio(str(directorio))
+    yield audio
+    audio.cerrar()
+
+
+@pytest.fixture(autouse=True)
+def mezclador():
+    try:
+        pygame.mixer.init()
+    except pygame.error:
+        pytest.skip("sin mezclador de audio")
+    yield
+    pygame.mixer.quit()
+
+
+def test_precargar_decodifica_en_segundo_plano(audio):
+    audio.precargar(["CA", "sa", "ca", "no-existe"])
+    audio.esperar()
+    estadisticas = audio.estadisticas()
+    assert (estadisticas["clips"], estadisticas["decodificados"]) == (4, 2)
+    audio.reproducir("ca")
+    audio.reproducir("casa")  # Aún no decodificado: se decodifica en el hilo de audio
+    audio.esperar()
+    estadisticas = audio.estadisticas()
+    assert (estadisticas["aciertos"], estadisticas["fallos"], estadisticas["decodificados"]) == (1, 1, 3)
+
+
+def test_la_cache_esta_acotada_por_memoria(directorio):
+    audio = SistemaAudio(str(directorio), memoria_maxima=1)
+    try:
+        audio.precargar(["a", "ca", "sa"])
+        audio.esperar()
+        # Siempre queda al menos el último decodificado
+        assert list(audio.sonidos) == ["sa"]
+        assert audio.memoria == audio.sonidos["sa"][1]
+    finally:
+        audio.cerrar()
+
+
+def test_clips_grandes_no_se_decodifican(directorio):
+    audio = SistemaAudio(str(directorio), limite_streaming=1)
+    try:
+        audio.precargar(["casa"])
+        audio.esperar()
+        assert audio.estadisticas()["decodificados"] == 0
+    finally:
+        audio.cerrar()
+
+
+def test_sin_directorio_ni_activo_no_hace_nada(tmp_path):
+    silencio = SistemaAudio(str(tmp_path / "no-existe"))
+    try:
+        silencio.precargar(["a"])
+        silencio.reproducir("a")
+        silencio.esperar()
+        assert silencio.estadisticas()["clips"] == 0
+    finally:
+        silencio.cerrar()
+    inactivo = SistemaAudio(activo=False)
+    inactivo.reproducir("a")
+    inactivo.esperar()
+    assert inactivo.estadisticas()["fallos"] == 0
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from juego import BolsaPalabras
+
+
+def _sacar(bolsa, cantidad):
+    return [bolsa.sacar() for _ in range(cantidad)]
+
+
+@pytest.mark.parametrize("tamano", [1, 2, 7, 50])
+def test_bolsa_cada_vuelta_es_una_permutacion(tamano):
+    bolsa = BolsaPalabras(tamano, ventana=0, aleatorio=random.Random(1))
+    for _ in range(5):  # La bolsa se rellena al vaciarse
+        assert sorted(_sacar(bolsa, tamano)) == list(range(tamano))
+
+
+@pytest.mark.parametrize("tamano, ventana", [(10, 5), (50, 5), (3, 5)])
+def test_bolsa_primera_vuelta_sin_repetir(tamano, ventana):
+    bolsa = BolsaPalabras(tamano, ventana=ventana, aleatorio=random.Random(2))
+    assert sorted(_sacar(bolsa, tamano)) == list(range(tamano))
+
+
+@pytest.mark.parametrize("tamano, ventana", [(10, 5), (50, 5), (3, 5)])
+def test_bolsa_no_repite_recientes_al_rellenar(tamano, ventana):
+    bolsa = BolsaPalabras(tamano, ventana=ventana, aleatorio=random.Random(3))
+    extraidas = _sacar(bolsa, tamano * 20)
+    tramo = bolsa.ventana + 1  # La ventana se recorta a tamano - 1
+    for inicio in range(len(extraidas) - tramo + 1):
+        assert len(set(extraidas[inicio:inicio + tramo])) == tramo
+
+
+def test_bolsa_determinista_con_semilla():
+    primera = _sacar(BolsaPalabras(30, aleatorio=random.Random(42)), 100)
+    segunda = _sacar(BolsaPalabras(30, aleatorio=random.Random(42)), 100)
+    otra = _sacar(BolsaPalabras(30, aleatorio=random.Random(43)), 100)
+    assert primera == segunda
+    assert primera != otra
+
+
+def test_bolsa_marcar_reciente():
+    bolsa = BolsaPalabras(4, ventana=3, aleatorio=random.Random(5))
+    bolsa.marcar_reciente(2)
+    assert bolsa.es_reciente(2)
+    assert 2 not in _sacar(bolsa, 3)
@@ -0,0 +1,57 @@
+import threading
+
+from juego import CacheTexto, ContadorSuperficies
+
+
+class FuenteFalsa:
+    """Cuenta las rasterizaciones en lugar de dibujar"""
+    def __init__(self):
+        self.renderizados = []
+
+    def render(self, texto, antialias, color):
+        self.renderizados.append(texto)
+        return ("superficie", texto, tuple(color))
+
+
+def test_cache_texto_reutiliza_y_cuenta_aciertos():
+    cache = CacheTexto(capacidad=4)
+    fuente = FuenteFalsa()
+    primera = cache.renderizar(fuente, "casa", True, (0, 0, 0))
+    assert cache.renderizar(fuente, "casa", True, [0, 0, 0]) is primera  # El color puede venir como lista
+    cache.renderizar(fuente, "casa", True, (255, 0, 0))
+    assert fuente.renderizados == ["casa", "casa"]
+    estadisticas = cache.estadisticas()
+    assert (estadisticas["aciertos"], estadisticas["fallos"], estadisticas["entradas"]) == (1, 2, 2)
+    assert estadisticas["tasa_aciertos"] == 1 / 3
+
+
+def test_cache_texto_expulsa_la_menos_usada():
+    cache = CacheTexto(capacidad=2)
+    fuente = FuenteFalsa()
+    cache.renderizar(fuente, "a", True, (0, 0, 0))
+    cache.renderizar(fuente, "b", True, (0, 0, 0))
+    cache.renderizar(fuente, "a", True, (0, 0, 0))  # "b" pasa a ser la menos usada
+    cache.renderizar(fuente, "c", True, (0, 0, 0))
+    assert cache.estadisticas()["entradas"] == 2
+    cache.renderizar(fuente, "a", True, (0, 0, 0))
+    cache.renderizar(fuente, "b", True, (0, 0, 0))
+    assert fuente.renderizados == ["a", "b", "c", "b"]
+
+
+def test_cache_texto_limpiar():
+    cache = CacheTexto()
+    cache.renderizar(FuenteFalsa(), "a", True, (0, 0, 0))
+    cache.limpiar()
+    assert cache.estadisticas() == {"entradas": 0, "capacidad": 512, "aciertos": 0, "fallos": 0, "tasa_aciertos": 0.0}
+
+
+def test_contador_superficies_desde_varios_hilos():
+    contador = ContadorSuperficies()
+    hilos = [threading.Thread(target=lambda: [contador.contar() for _ in range(5000)]) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    contador.cerrar_cuadro()
+    assert contador.estadisticas()["total"] == 20000
+    assert contador.estadisticas()["ultimo_cuadro"] == 20000
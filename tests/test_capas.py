@@ -0,0 +1,104 @@
+import pygame
+import pytest
+
+from juego import SUPERFICIES, AplicacionAlfabetizacion, CacheCapas
+
+
+class Compositor:
+    def __init__(self):
+        self.llamadas = 0
+
+    def __call__(self, superficie):
+        self.llamadas += 1
+        superficie.fill((self.llamadas, 0, 0))
+
+
+def test_misma_clave_reutiliza_la_capa():
+    capas = CacheCapas()
+    componer = Compositor()
+    primera = capas.obtener("fondo", ("a", 1), (20, 10), componer)
+    assert capas.obtener("fondo", ("a", 1), (20, 10), componer) is primera
+    assert componer.llamadas == 1 and capas.composiciones == 1
+
+
+def test_otra_clave_recompone_sobre_la_misma_superficie():
+    capas = CacheCapas()
+    componer = Compositor()
+    primera = capas.obtener("fondo", 1, (20, 10), componer)
+    creadas = SUPERFICIES.total
+    segunda = capas.obtener("fondo", 2, (20, 10), componer)
+    assert segunda is primera and segunda.get_at((0, 0))[0] == 2
+    assert SUPERFICIES.total == creadas  # Sin superficie nueva
+    tercera = capas.obtener("fondo", 3, (30, 10), componer)
+    assert tercera is not primera and tercera.get_size() == (30, 10)
+    assert SUPERFICIES.total == creadas + 1
+    assert capas.composiciones == 3
+
+
+def test_invalidar():
+    capas = CacheCapas()
+    componer = Compositor()
+    capas.obtener("a", 1, (4, 4), componer)
+    capas.obtener("b", 1, (4, 4), componer)
+    capas.invalidar("a")
+    capas.obtener("a", 1, (4, 4), componer)
+    capas.obtener("b", 1, (4, 4), componer)
+    assert componer.llamadas == 3
+    capas.invalidar()
+    assert capas.capas == {}
+
+
+@pytest.fixture
+def app():
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    yield app
+    app.cerrar()
+
+
+def _jugar(app):
+    app.seleccionar_modo(0)
+    app.seleccionar_nivel(1)
+    app.iniciar_actividad()
+    app.mostrar_modal = False
+
+
+def test_la_capa_de_juego_se_compone_una_vez_por_actividad(app):
+    _jugar(app)
+    app.dibujar_escena()
+    capa = app.capas.capas["juego"][1]
+    composiciones = app.capas.composiciones
+    for _ in range(5):
+        app.respuesta_actual += "a"  # Lo dinámico cambia, la capa estática no
+        app.dibujar_escena()
+    assert app.capas.composiciones == composiciones
+
+    app.siguiente_actividad()
+    app.dibujar_escena()
+    assert app.capas.composiciones == composiciones + 1
+    assert app.capas.capas["juego"][1] is capa
+
+
+def test_cada_actividad_nueva_cambia_la_generacion(app):
+    _jugar(app)
+    generaciones = [app.generacion_actividad]
+    app.actividad_actual = app.actividad_actual  # El mismo objeto no cuenta como cambio
+    assert app.generacion_actividad == generaciones[0]
+    for _ in range(3):
+        app.siguiente_actividad()
+        generaciones.append(app.generacion_actividad)
+    app.iniciar_actividad()  # La sesión cambia la actividad sin pasar por el setter
+    generaciones.append(app.generacion_actividad)
+    assert len(set(generaciones)) == len(generaciones)
+
+
+def test_la_capa_de_juego_sigue_a_la_generacion_y_no_al_id(app):
+    _jugar(app)
+    app.dibujar_escena()
+    composiciones = app.capas.composiciones
+    # Una actividad nueva puede ocupar la dirección de la anterior: mismo id(), otra generación
+    app.generacion_actividad += 1
+    app.dibujar_escena()
+    assert app.capas.composiciones == composiciones + 1
+    app.dibujar_escena()
+    assert app.capas.composiciones == composiciones + 1
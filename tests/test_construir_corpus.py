@@ -0,0 +1,142 @@
+import pytest
+
+import construir_corpus
+from construir_corpus import construir, procesar_bloque
+from corpus import Corpus, compilar, leer_fuente
+
+BRUTO = [
+    "sol", "casa\tdonde vives", "mariposa", "c4sa", "pst",  # Bloque 1
+    "Sol", "árbol", "mamá", "otorrinolaringólogo",  # Bloque 2
+    "# comentario", "", "perro", "casa\totra pista",  # Bloque 3
+]
+
+
+@pytest.fixture
+def rutas(tmp_path):
+    bruto = tmp_path / "bruto.txt"
+    bruto.write_text("\n".join(BRUTO) + "\n", encoding="utf-8")
+    return {"entrada": str(bruto), "salida": str(tmp_path / "palabras.tsv"), "cache": str(tmp_path / "cache"),
+            "directorio": tmp_path}
+
+
+def _construir(rutas, **opciones):
+    return construir(rutas["entrada"], rutas["salida"], procesos=2, tamano_bloque=4,
+                     directorio_cache=rutas["cache"], **opciones)
+
+
+def _palabras(ruta):
+    return [entrada.palabra for entrada, _ in leer_fuente(ruta)]
+
+
+def test_etapas_por_palabra():
+    resultado = procesar_bloque(["Mariposa\tun insecto", "c4sa", "pst", "# nada", "", "otorrinolaringólogo"])
+    assert resultado["entradas"] == [["mariposa", "letras:3", "ma-ri-po-sa", "osa", "un insecto"],
+                                     ["otorrinolaringólogo", "", "o-to-rri-no-la-rin-gó-lo-go", "ologo", ""]]
+    assert resultado["rechazos"] == [[1, "caracteres no válidos"], [2, "sin vocales"]]
+
+
+def test_duplicados_entre_bloques(rutas):
+    resumen = _construir(rutas)
+    assert _palabras(rutas["salida"]) == ["sol", "casa", "mariposa", "árbol", "mamá", "otorrinolaringólogo", "perro"]
+    assert resumen["duplicadas"] == 2  # "Sol" y el segundo "casa", de otros bloques
+    assert resumen["rechazos"] == {"caracteres no válidos": 1, "sin vocales": 1}
+    casa = next(entrada for entrada, _ in leer_fuente(rutas["salida"]) if entrada.palabra == "casa")
+    assert casa.pista == "donde vives"  # Gana la primera aparición
+
+
+def test_cache_de_bloques(rutas):
+    primera = _construir(rutas)
+    assert (primera["bloques"], primera["bloques_en_cache"]) == (4, 0)
+    segunda = _construir(rutas)
+    assert (segunda["bloques"], segunda["bloques_en_cache"]) == (4, 4)
+
+    # Cambiar una línea solo invalida su bloque
+    lineas = list(BRUTO)
+    lineas[5] = "luna"
+    (rutas["directorio"] / "bruto.txt").write_text("\n".join(lineas) + "\n", encoding="utf-8")
+    tercera = _construir(rutas)
+    assert tercera["bloques_en_cache"] == 3
+    assert "luna" in _palabras(rutas["salida"])
+
+
+def test_lista_de_bloqueo(rutas):
+    bloqueo = rutas["directorio"] / "bloqueadas.txt"
+    bloqueo.write_text("# sin tildes también vale\nmama\nPerro\n", encoding="utf-8")
+    sin_bloqueo = _construir(rutas)
+    resumen = _construir(rutas, ruta_bloqueo=str(bloqueo))
+    assert resumen["rechazos"]["bloqueada"] == 2
+    assert resumen["bloques_en_cache"] == 0  # La lista de bloqueo forma parte de la clave de la caché
+    assert set(_palabras(rutas["salida"])) == {"sol", "casa", "mariposa", "árbol", "otorrinolaringólogo"}
+    assert sin_bloqueo["aceptadas"] == resumen["aceptadas"] + 2
+
+
+def test_base_con_prioridad(rutas):
+    base = rutas["directorio"] / "base.tsv"
+    base.write_text("# corpus a mano\ncasa\tletras:2,rimas:2\tca-sa\tla de siempre\nluz\tletras:1\n", encoding="utf-8")
+    resumen = _construir(rutas, ruta_base=str(base))
+    assert resumen["lineas_base"] == 2
+    palabras = _palabras(rutas["salida"])
+    assert palabras[:3] == ["casa", "luz", "sol"] and palabras.count("casa") == 1
+    casa = next(entrada for entrada, _ in leer_fuente(rutas["salida"]) if entrada.palabra == "casa")
+    assert casa.pista == "la de siempre"
+
+
+def test_la_lista_de_bloqueo_filtra_tambien_la_base(rutas):
+    base = rutas["directorio"] / "base.tsv"
+    base.write_text("casa\tletras:2\nmamá\tletras:2\nluz\tletras:1\n", encoding="utf-8")
+    bloqueo = rutas["directorio"] / "bloqueadas.txt"
+    bloqueo.write_text("mama\n", encoding="utf-8")
+    resumen = _construir(rutas, ruta_base=str(base), ruta_bloqueo=str(bloqueo))
+    assert resumen["lineas_base"] == 2
+    assert resumen["rechazos"]["bloqueada en la base"] == 1
+    assert "mamá" not in _palabras(rutas["salida"])
+
+
+def test_escribir_el_corpus_del_juego_lo_conserva(rutas, monkeypatch):
+    monkeypatch.setattr(construir_corpus, "RUTA_CORPUS", rutas["salida"])
+    with open(rutas["salida"], "w", encoding="utf-8") as archivo:
+        archivo.write("luz\tletras:1\tluz\tla del sol\n")
+    resumen = _construir(rutas)
+    assert resumen["base"] == rutas["salida"] and resumen["lineas_base"] == 1
+    assert _palabras(rutas["salida"])[:2] == ["luz", "sol"]
+
+    reemplazado = _construir(rutas, reemplazar=True)
+    assert reemplazado["base"] is None
+    assert "luz" not in _palabras(rutas["salida"])
+
+
+def test_otra_salida_no_toma_base(rutas, monkeypatch):
+    monkeypatch.setattr(construir_corpus, "RUTA_CORPUS", str(rutas["directorio"] / "otro.tsv"))
+    _construir(rutas)
+    assert _construir(rutas)["lineas_base"] == 0
+
+
+def test_la_salida_se_compila_como_corpus(rutas):
+    resumen = _construir(rutas)
+    assert resumen["segundos_indice"] > 0
+    corpus = Corpus(str(rutas["directorio"] / "palabras.idx"))
+    try:
+        assert len(corpus) == 7
+        assert corpus.buscar("mariposa").silabas == ("ma", "ri", "po", "sa")
+        assert corpus.buscar("árbol").rima == "arbol"
+        assert corpus.tamano("letras=1") == 1 and corpus.tamano("letras=2") == 4
+        assert corpus.buscar("otorrinolaringólogo") is not None  # Demasiado larga para el modo letras
+        assert corpus.tamano("letras=3") == 1
+    finally:
+        corpus.cerrar()
+
+
+def test_la_salida_se_lee_como_la_fuente_del_juego(rutas, tmp_path):
+    # Ida y vuelta: compilar la salida sin pasar por construir da las mismas entradas
+    _construir(rutas, compilar_indice=False)
+    ruta_indice = str(tmp_path / "aparte.idx")
+    compilar(rutas["salida"], ruta_indice)
+    corpus = Corpus(ruta_indice)
+    try:
+        fuente = [entrada for entrada, _ in leer_fuente(rutas["salida"])]
+        assert len(corpus) == len(fuente)
+        for entrada in fuente:
+            compilada = corpus.buscar(entrada.palabra)
+            assert (compilada.silabas, compilada.pista) == (entrada.silabas, entrada.pista)
+    finally:
+        corpus.cerrar()
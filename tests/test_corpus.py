@@ -0,0 +1,172 @@
+import os
+import random
+
+import pytest
+
+from corpus import Corpus, _indice_vigente, cargar_corpus, compilar, leer_fuente
+from juego import AsociacionRima, RegistroMuestreo, UnionLetras
+from linguistica import clave_fonetica, distancia_edicion
+
+
+@pytest.fixture
+def corpus_pequeno(tmp_path):
+    fuente = tmp_path / "palabras.tsv"
+    fuente.write_text("\n".join([
+        "roma\tletras:1", "amor\tletras:1", "mora", "ramo", "mamá\tletras:1", "casa\tletras:1", "sol\tletras:1"
+    ]) + "\n", encoding="utf-8")
+    indice = str(tmp_path / "palabras.idx")
+    compilar(str(fuente), indice)
+    corpus = Corpus(indice)
+    yield corpus
+    corpus.cerrar()
+
+
+def test_buscar(corpus_pequeno):
+    assert corpus_pequeno.buscar(" Casa ").palabra == "casa"
+    assert corpus_pequeno.buscar("mamá").palabra == "mamá"
+    assert corpus_pequeno.buscar("perro") is None
+    assert len(corpus_pequeno) == 7
+
+
+def test_cubetas_por_nivel(corpus_pequeno):
+    assert corpus_pequeno.tamano("letras=1") == 5
+    assert corpus_pequeno.tamano("letras=9") == 0
+    with pytest.raises(KeyError):
+        corpus_pequeno.elegir("letras=9")
+    elegidas = corpus_pequeno.muestra("letras=1", 10, excluir=["roma"])
+    assert sorted(entrada.palabra for entrada in elegidas) == ["amor", "casa", "mamá", "sol"]
+
+
+def test_fuente_con_duplicados_y_comentarios(tmp_path):
+    fuente = tmp_path / "palabras.tsv"
+    fuente.write_text("# comentario\n\nSol\tletras:1\nsol\tletras:2\n", encoding="utf-8")
+    assert [(entrada.palabra, modos) for entrada, modos in leer_fuente(str(fuente))] == [("sol", [("letras", 1)])]
+
+
+@pytest.mark.parametrize("linea", ["sol\tletras:uno", "casa\tletras:1\tca-so"])
+def test_fuente_mal_formada(tmp_path, linea):
+    fuente = tmp_path / "palabras.tsv"
+    fuente.write_text(linea + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="palabras.tsv:1"):
+        leer_fuente(str(fuente))
+
+
+def test_indice_caduca_al_cambiar_la_fuente(tmp_path):
+    fuente = tmp_path / "palabras.tsv"
+    indice = str(tmp_path / "palabras.idx")
+    fuente.write_text("sol\tletras:1\n", encoding="utf-8")
+    assert not _indice_vigente(str(fuente), indice)
+    compilar(str(fuente), indice)
+    assert _indice_vigente(str(fuente), indice)
+    fuente.write_text("sol\tletras:1\nmar\tletras:1\n", encoding="utf-8")
+    assert not _indice_vigente(str(fuente), indice)
+    assert os.path.exists(indice)
+
+
+def test_anagramas(corpus_pequeno):
+    assert sorted(entrada.palabra for entrada in corpus_pequeno.anagramas("maro")) == ["amor", "mora", "ramo", "roma"]
+    assert [entrada.palabra for entrada in corpus_pequeno.anagramas("sol")] == ["sol"]
+    assert corpus_pequeno.anagramas("xyz") == []
+    assert corpus_pequeno.cantidad_anagramas("roma") == 4
+    assert corpus_pequeno.cantidad_anagramas("sol") == 1
+    assert corpus_pequeno.cantidad_anagramas("xyz") == 0
+
+
+def test_anagramas_fuera_de_las_cubetas(corpus_pequeno):
+    # Las firmas van en su propia tabla hash, no en la tabla de cubetas que se lee al abrir
+    assert not any(nombre.startswith("anagrama=") for nombre in corpus_pequeno.cubetas)
+
+
+def test_forma_palabra(corpus_pequeno):
+    assert corpus_pequeno.forma_palabra("amor", "roma")
+    assert corpus_pequeno.forma_palabra("RAMO", "roma")
+    assert corpus_pequeno.forma_palabra("mama", "mamá")  # Las tildes no cuentan
+    assert not corpus_pequeno.forma_palabra("oram", "roma")  # Mismas letras, pero no es una palabra
+    assert not corpus_pequeno.forma_palabra("casa", "roma")
+
+
+def test_union_letras_acepta_otra_palabra_con_las_mismas_letras():
+    estrategia = UnionLetras()
+    assert estrategia.verificar_respuesta("gato", "gato")
+    assert estrategia.verificar_respuesta("gota", "gato")
+    assert not estrategia.verificar_respuesta("toag", "gato")
+    assert not estrategia.verificar_respuesta("gatos", "gato")
+
+
+@pytest.fixture(scope="module")
+def corpus_sintetico(tmp_path_factory):
+    """Unas 1500 palabras inventadas con sílabas del español, para que el árbol BK tenga profundidad"""
+    aleatorio = random.Random(11)
+    ataques = ["", "b", "c", "ch", "d", "g", "gu", "ll", "m", "n", "p", "qu", "r", "s", "t", "v", "y", "z"]
+    vocales = ["a", "e", "i", "o", "u", "ue", "ia"]
+    palabras = set()
+    while len(palabras) < 1500:
+        palabras.add("".join(aleatorio.choice(ataques) + aleatorio.choice(vocales)
+                             for _ in range(aleatorio.randint(1, 3))))
+    directorio = tmp_path_factory.mktemp("sintetico")
+    fuente = directorio / "palabras.tsv"
+    fuente.write_text("\n".join(sorted(palabras)) + "\n", encoding="utf-8")
+    compilar(str(fuente), str(directorio / "palabras.idx"))
+    corpus = Corpus(str(directorio / "palabras.idx"))
+    yield corpus
+    corpus.cerrar()
+
+
+def _por_fuerza_bruta(corpus, palabra, minima, maxima):
+    clave = clave_fonetica(palabra)
+    return {identificador for identificador in range(len(corpus))
+            if minima <= distancia_edicion(clave, clave_fonetica(corpus.entrada(identificador).palabra)) <= maxima}
+
+
+@pytest.mark.parametrize("minima, maxima", [(0, 0), (1, 2), (2, 3), (3, 4)])
+@pytest.mark.parametrize("origen", ["incluido", "sintetico"])
+def test_parecidas_coincide_con_la_fuerza_bruta(origen, minima, maxima, corpus_sintetico):
+    corpus = cargar_corpus() if origen == "incluido" else corpus_sintetico
+    aleatorio = random.Random(5)
+    palabras = [corpus.entrada(aleatorio.randrange(len(corpus))).palabra for _ in range(15)] + ["zzz", "camion"]
+    for palabra in palabras:
+        encontradas = list(corpus.parecidas(palabra, minima, maxima, max_visitas=10 ** 9, aleatorio=aleatorio))
+        assert {identificador for identificador, _ in encontradas} == _por_fuerza_bruta(corpus, palabra, minima, maxima)
+        for identificador, distancia in encontradas:
+            assert distancia == distancia_edicion(clave_fonetica(palabra),
+                                                  clave_fonetica(corpus.entrada(identificador).palabra))
+
+
+def test_parecidas_respeta_max_visitas(corpus_sintetico):
+    assert len(list(corpus_sintetico.parecidas("casa", 0, 20, max_visitas=10))) <= 10
+
+
+@pytest.mark.parametrize("minima, maxima", [(1, 2), (2, 3), (3, 4)])
+def test_distractores_en_la_banda_y_sin_rimar(minima, maxima, corpus_sintetico):
+    aleatorio = random.Random(8)
+    for _ in range(20):
+        entrada = corpus_sintetico.entrada(aleatorio.randrange(len(corpus_sintetico)))
+        distractores = corpus_sintetico.distractores(entrada, 3, minima, maxima, aleatorio=aleatorio)
+        assert len(distractores) <= 3
+        assert len({distractor.palabra for distractor in distractores}) == len(distractores)
+        for distractor in distractores:
+            assert distractor.palabra != entrada.palabra
+            assert distractor.rima != entrada.rima
+            assert minima <= distancia_edicion(clave_fonetica(entrada.palabra),
+                                               clave_fonetica(distractor.palabra)) <= maxima
+
+
+def test_distractores_sin_cantidad(corpus_sintetico):
+    assert corpus_sintetico.distractores(corpus_sintetico.entrada(0), 0, 1, 2) == []
+
+
+@pytest.mark.parametrize("nivel, cantidad", [(1, 2), (2, 1), (3, 1)])
+def test_rimas_piden_distractores_en_la_banda_del_nivel(nivel, cantidad, monkeypatch):
+    llamadas = []
+    original = Corpus.distractores
+
+    def espia(self, base, pedidos, minima, maxima, *args, **opciones):
+        llamadas.append((pedidos, minima, maxima))
+        return original(self, base, pedidos, minima, maxima, *args, **opciones)
+
+    monkeypatch.setattr(Corpus, "distractores", espia)
+    estrategia = AsociacionRima(RegistroMuestreo("prueba"))
+    for _ in range(10):
+        datos = estrategia.generar_actividad(nivel)
+        assert len(set(datos["elementos"]) - set(datos["solucion"])) == cantidad
+    assert set(llamadas) == {(cantidad, *AsociacionRima.BANDAS_DISTRACTORES[nivel])}
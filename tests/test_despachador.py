@@ -0,0 +1,102 @@
+import pygame
+import pytest
+
+from juego import AplicacionAlfabetizacion, DespachadorEventos, IndiceEspacial
+from simulacion import JugadorBot
+
+
+class Widget:
+    def __init__(self, nombre, x, y, ancho, alto):
+        self.nombre = nombre
+        self.rect = pygame.Rect(x, y, ancho, alto)
+        self.clics = 0
+
+    def manejar_evento(self, evento):
+        self.clics += 1
+        return True
+
+
+def _indice(*widgets, tamano_celda=64):
+    indice = IndiceEspacial(tamano_celda)
+    for widget in widgets:
+        indice.insertar(widget)
+    return indice
+
+
+@pytest.mark.parametrize("posicion, esperado", [
+    ((64, 64), "a"),  # Esquina superior izquierda: dentro
+    ((127, 127), "a"),  # Último píxel, en la misma celda
+    ((128, 64), "b"),  # El borde derecho no pertenece al rect; ya es la celda siguiente
+    ((63, 64), None),
+    ((64, 128), None),
+])
+def test_bordes_de_celda(posicion, esperado):
+    a = Widget("a", 64, 64, 64, 64)  # Ocupa exactamente la celda (1, 1)
+    b = Widget("b", 128, 0, 64, 200)
+    widget = _indice(a, b).en_punto(posicion)
+    assert (widget.nombre if widget else None) == esperado
+
+
+def test_widget_que_cruza_varias_celdas():
+    ancho = Widget("ancho", 30, 30, 200, 10)
+    indice = _indice(ancho)
+    assert sorted(celda for celda, widgets in indice.celdas.items() if ancho in widgets) == [(0, 0), (1, 0), (2, 0), (3, 0)]
+    for x in (30, 100, 229):
+        assert indice.en_punto((x, 35)) is ancho
+    assert indice.en_punto((230, 35)) is None
+
+
+def test_widgets_superpuestos_gana_el_primero_indexado():
+    abajo = Widget("abajo", 0, 0, 100, 100)
+    encima = Widget("encima", 50, 50, 100, 100)
+    assert _indice(abajo, encima).en_punto((75, 75)) is abajo
+    assert _indice(encima, abajo).en_punto((75, 75)) is encima
+    assert _indice(abajo, encima).en_punto((120, 120)) is encima
+
+
+def test_reindexar_tras_mover_widgets():
+    despachador = DespachadorEventos()
+    widget = Widget("a", 0, 0, 40, 40)
+    despachador.indexar([widget], firma=1)
+    widget.rect.topleft = (300, 300)
+    assert despachador.widget_en((310, 310)) is None  # Índice desactualizado hasta reindexar
+    despachador.indexar([widget], firma=2)
+    assert despachador.widget_en((10, 10)) is None
+    assert despachador.widget_en((310, 310)) is widget
+    assert despachador.firma_widgets == 2
+
+
+def test_despacha_por_tipo_y_clic_al_widget():
+    despachador = DespachadorEventos()
+    widget = Widget("a", 0, 0, 40, 40)
+    despachador.indexar([widget])
+    recibidos = []
+    despachador.suscribir(pygame.KEYDOWN, recibidos.append)
+    assert not despachador.despachar(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(100, 100), button=1))
+    assert despachador.despachar(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(10, 10), button=1))
+    despachador.despachar(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_a))
+    assert widget.clics == 1
+    assert [evento.type for evento in recibidos] == [pygame.KEYDOWN]
+
+
+def test_la_aplicacion_reindexa_al_cambiar_de_pantalla():
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    try:
+        bot = JugadorBot(app, dibujar=False, semilla=1)
+        bot._cerrar_modal()
+        app._sincronizar_indice()
+        assert app.despachador.widget_en(app.btn_iniciar.rect.center) is app.btn_iniciar
+
+        bot.clic(app.btn_modos[0].rect.center)
+        bot.clic(app.btn_niveles[0].rect.center)
+        bot.clic(app.btn_iniciar.rect.center)
+        assert app.estado == "juego"
+        for _ in range(3):
+            app._sincronizar_indice()
+            assert app.despachador.widget_en(app.btn_iniciar.rect.center) is not app.btn_iniciar
+            for boton in app.elementos_botones:
+                assert app.despachador.widget_en(boton.rect.center) is boton
+            app.siguiente_actividad()
+    finally:
+        app.cerrar()
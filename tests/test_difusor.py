@@ -0,0 +1,172 @@
+import asyncio
+import threading
+
+import pytest
+
+import servidor
+from juego import (AplicacionAlfabetizacion, DifusorPuntuacion, ESPERA_OBSERVADORES, GestorPuntuacion,
+                   ObservadorPuntuacion)
+
+
+class Anotador(ObservadorPuntuacion):
+    def __init__(self, bloqueo=None, falla_al_actualizar=False):
+        self.puntuaciones = []
+        self.hitos = []
+        self.bloqueo = bloqueo  # threading.Event que el observador espera antes de anotar
+        self.falla_al_actualizar = falla_al_actualizar
+
+    def actualizar(self, puntuacion):
+        if self.bloqueo is not None:
+            self.bloqueo.wait()
+        if self.falla_al_actualizar:
+            raise RuntimeError("observador roto")
+        self.puntuaciones.append(puntuacion)
+
+    def hito_alcanzado(self, hito):
+        self.hitos.append(hito)
+
+
+def test_difusor_entrega_en_orden_desde_varios_hilos():
+    gestor = GestorPuntuacion()
+    anotador = Anotador()
+    gestor.registrar_observador(anotador)
+    hilos = [threading.Thread(target=lambda: [gestor.aumentar_puntuacion(1) for _ in range(500)]) for _ in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    gestor.cerrar()
+    assert anotador.puntuaciones == sorted(anotador.puntuaciones)
+    assert anotador.puntuaciones[-1] == 2000
+    assert anotador.hitos == list(range(100, 2001, 100))
+
+
+@pytest.mark.parametrize("politica", DifusorPuntuacion.POLITICAS)
+def test_difusor_contrapresion(politica):
+    bloqueo = threading.Event()
+    gestor = GestorPuntuacion(capacidad_difusion=4, politica_difusion=politica)
+    anotador = Anotador(bloqueo)
+    gestor.registrar_observador(anotador)
+    for _ in range(30):
+        gestor.aumentar_puntuacion(10)  # No espera al observador bloqueado
+    assert gestor.difusor.metricas()["profundidad"] <= 4
+    bloqueo.set()
+    assert gestor.difusor.cerrar(5)
+
+    metricas = gestor.difusor.metricas()
+    assert metricas["publicadas"] == 30
+    assert anotador.puntuaciones[-1] == 300
+    if politica == "coalescer":
+        assert metricas["coalescidas"] > 0 and metricas["descartadas"] == 0
+        assert anotador.hitos == [100, 200, 300]  # Fundir instantáneas no pierde hitos
+    else:
+        assert metricas["descartadas"] > 0 and metricas["coalescidas"] == 0
+    assert metricas["entregadas"] + metricas["coalescidas"] + metricas["descartadas"] == 30
+    assert set(metricas["latencias"]) == {"espera", "Anotador"}
+
+
+def test_difusor_observador_roto_no_afecta_a_los_demas():
+    gestor = GestorPuntuacion()
+    roto = Anotador(falla_al_actualizar=True)
+    sano = Anotador()
+    gestor.registrar_observador(roto)
+    gestor.registrar_observador(sano)
+    gestor.aumentar_puntuacion(150)
+    gestor.aumentar_puntuacion(10)
+    gestor.cerrar()
+    assert sano.puntuaciones == [150, 160] and sano.hitos == [100]
+    metricas = gestor.difusor.metricas()
+    assert metricas["errores"] == 2
+    assert metricas["ultimo_error"].startswith("Anotador")
+
+
+def test_difusor_observador_roto_no_pierde_hitos():
+    gestor = GestorPuntuacion()
+    roto = Anotador(falla_al_actualizar=True)
+    sano = Anotador()
+    gestor.registrar_observador(roto)
+    gestor.registrar_observador(sano)
+    gestor.aumentar_puntuacion(150)
+    gestor.cerrar()
+    assert roto.hitos == [100]
+    assert sano.puntuaciones == [150] and sano.hitos == [100]
+    metricas = gestor.difusor.metricas()
+    assert metricas["errores"] == 1
+    assert metricas["ultimo_error"].startswith("Anotador.actualizar")
+
+
+def test_difusor_cerrar_con_plazo_descarta_lo_pendiente():
+    bloqueo = threading.Event()
+    gestor = GestorPuntuacion()
+    anotador = Anotador(bloqueo)
+    gestor.registrar_observador(anotador)
+    for _ in range(3):
+        gestor.aumentar_puntuacion(10)
+    assert not gestor.difusor.cerrar(0.05)
+    assert gestor.difusor.metricas()["descartadas"] == 2  # La primera ya estaba en manos del observador
+    gestor.aumentar_puntuacion(10)  # Cerrado: ya no se encola nada
+    bloqueo.set()
+    assert gestor.difusor.vaciar(5)
+    assert anotador.puntuaciones == [10]
+
+
+def test_un_observador_bloqueado_no_retiene_otras_sesiones():
+    # Un hilo de entrega por difusor: los demás gestores siguen entregando
+    bloqueo = threading.Event()
+    atascados = [GestorPuntuacion() for _ in range(4)]
+    for gestor in atascados:
+        gestor.registrar_observador(Anotador(bloqueo))
+        gestor.aumentar_puntuacion(10)
+    libre = GestorPuntuacion()
+    anotador = Anotador()
+    libre.registrar_observador(anotador)
+    try:
+        libre.aumentar_puntuacion(10)
+        assert libre.difusor.vaciar(1)
+        assert anotador.puntuaciones == [10]
+    finally:
+        bloqueo.set()
+    for gestor in atascados:
+        gestor.cerrar(5)
+
+
+def test_la_aplicacion_cierra_con_el_plazo_de_los_observadores(monkeypatch):
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    plazos = []
+    monkeypatch.setattr(app.gestor_puntuacion, "cerrar", lambda timeout=None: plazos.append(timeout))
+    app.cerrar()
+    assert plazos == [ESPERA_OBSERVADORES]
+    assert servidor.ESPERA_OBSERVADORES == ESPERA_OBSERVADORES
+
+
+def test_servidor_cierra_sesiones_sin_bloquear_el_bucle(monkeypatch):
+    monkeypatch.setattr(servidor, "ESPERA_OBSERVADORES", 0.3)
+    servidor_sesiones = servidor.ServidorSesiones()
+    identificador = servidor_sesiones.atender({"op": "crear", "jugador": "ana"})["sesion"]
+    bloqueo = threading.Event()
+    gestor = servidor_sesiones.sesiones[identificador].gestor_puntuacion
+    gestor.registrar_observador(Anotador(bloqueo))
+    gestor.aumentar_puntuacion(10)
+    gestor.aumentar_puntuacion(10)
+
+    async def probar():
+        latidos = 0
+
+        async def latir():
+            nonlocal latidos
+            while True:
+                await asyncio.sleep(0.01)
+                latidos += 1
+
+        latido = asyncio.create_task(latir())
+        respuesta = await servidor_sesiones.atender_sin_bloquear({"op": "cerrar", "sesion": identificador})
+        latido.cancel()
+        return respuesta, latidos
+
+    try:
+        respuesta, latidos = asyncio.run(probar())
+    finally:
+        bloqueo.set()
+    assert respuesta == {"puntuacion": 20}
+    assert latidos >= 5  # El bucle siguió atendiendo mientras se esperaba al observador
+    assert identificador not in servidor_sesiones.sesiones
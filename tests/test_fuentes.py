@@ -0,0 +1,59 @@
+import json
+import os
+import shutil
+
+import pygame
+import pytest
+
+import fuentes
+from fuentes import FuenteDiferida, resolver
+
+
+@pytest.fixture
+def sin_fuentes(tmp_path, monkeypatch):
+    """Directorio de fuentes incluidas vacío, caché en tmp_path y match_font que no encuentra nada"""
+    incluidas = tmp_path / "fuentes"
+    incluidas.mkdir()
+    monkeypatch.setattr(fuentes, "RUTA_FUENTES_INCLUIDAS", str(incluidas))
+    monkeypatch.setattr(fuentes, "RUTA_CACHE_FUENTES", str(tmp_path / "fuentes.json"))
+    monkeypatch.setattr(fuentes, "_cache", None)
+    busquedas = []
+
+    def match_font(nombre, negrita=False, cursiva=False):
+        busquedas.append((nombre, negrita, cursiva))
+        return None
+
+    monkeypatch.setattr(pygame.font, "match_font", match_font)
+    return incluidas, busquedas
+
+
+def test_sin_fuente_usa_la_de_pygame(sin_fuentes):
+    _, busquedas = sin_fuentes
+    assert resolver("NoExiste", negrita=True) == (None, True, False)
+    fuente = FuenteDiferida("NoExiste", 24, negrita=True)
+    assert fuente._fuente is None  # Nada se abre hasta el primer uso
+    superficie = fuente.render("hola", True, (0, 0, 0))
+    assert superficie.get_width() > 0 and fuente.get_height() > 0
+    assert fuente.cargar().get_bold()
+    assert len(busquedas) == 1  # La segunda resolución sale de la caché
+
+
+def test_la_cache_evita_buscar_en_el_siguiente_arranque(sin_fuentes, monkeypatch):
+    _, busquedas = sin_fuentes
+    resolver("Arial")
+    assert json.loads(open(fuentes.RUTA_CACHE_FUENTES, encoding="utf-8").read()) == {"Arial|0|0": [None, False, False]}
+    monkeypatch.setattr(fuentes, "_cache", None)  # Como un proceso nuevo
+    resolver("Arial")
+    assert busquedas == [("Arial", False, False)]
+
+
+def test_fuente_incluida_con_estilo_sintetico(sin_fuentes):
+    incluidas, busquedas = sin_fuentes
+    origen = os.path.join(os.path.dirname(pygame.__file__), pygame.font.get_default_font())
+    shutil.copy(origen, incluidas / "Lectura.ttf")
+    ruta = str(incluidas / "Lectura.ttf")
+    assert resolver("Lectura") == (ruta, False, False)
+    assert resolver("Lectura", negrita=True) == (ruta, True, False)  # Sin Lectura-Bold.ttf: negrita simulada
+    shutil.copy(origen, incluidas / "Lectura-Bold.ttf")
+    assert resolver("Lectura", negrita=True) == (str(incluidas / "Lectura-Bold.ttf"), False, False)
+    assert busquedas == []
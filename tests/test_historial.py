@@ -0,0 +1,63 @@
+import pytest
+
+from juego import HistorialPuntuacion
+
+
+def _historial(registros, capacidad=4, **opciones):
+    """Historial con un registro por segundo desde t=100: (100 + i, puntos, total acumulado)"""
+    historial = HistorialPuntuacion(capacidad, **opciones)
+    total = 0
+    for indice, puntos in enumerate(registros):
+        total += puntos
+        historial.registrar(100.0 + indice, puntos, total)
+    return historial
+
+
+def test_historial_sin_llenar():
+    historial = _historial([10, 20])
+    assert len(historial) == 2
+    assert list(historial) == [(100.0, 10, 10), (101.0, 20, 30)]
+    assert historial[-1] == (101.0, 20, 30)
+    with pytest.raises(IndexError):
+        historial[2]
+
+
+def test_historial_expulsa_los_mas_antiguos_al_dar_la_vuelta():
+    historial = _historial([1, 2, 3, 4, 5, 6, 7], capacidad=4)
+    assert len(historial) == 4
+    assert [puntos for _, puntos, _ in historial] == [4, 5, 6, 7]
+    assert historial[0] == (103.0, 4, 10)
+    assert historial[-1] == (106.0, 7, 28)
+    tiempos, puntos, totales = historial.exportar()
+    assert list(tiempos) == [103.0, 104.0, 105.0, 106.0]
+    assert list(puntos) == [4, 5, 6, 7]
+    assert list(totales) == [10, 15, 21, 28]
+
+
+def test_historial_vuelca_los_expulsados(tmp_path):
+    ruta = tmp_path / "volcado.bin"
+    historial = _historial([1, 2, 3, 4, 5, 6], capacidad=4, ruta_volcado=str(ruta))
+    historial.cerrar()
+    datos = ruta.read_bytes()
+    formato = HistorialPuntuacion.FORMATO_VOLCADO
+    assert [formato.unpack_from(datos, desde) for desde in range(0, len(datos), formato.size)] == [
+        (100.0, 1, 1), (101.0, 2, 3)]
+
+
+@pytest.mark.parametrize("registros", [[5, 10, 15], [1, 2, 3, 4, 5, 6, 7, 8, 9]])
+def test_historial_consultas_agregadas(registros):
+    historial = _historial(registros, capacidad=4)
+    retenidos = list(historial)
+    for desde in range(98, 112):
+        esperado = sum(puntos for tiempo, puntos, _ in retenidos if tiempo >= desde)
+        assert historial.puntos_desde(desde) == esperado
+        assert historial.rango(desde, desde + 2) == [r for r in retenidos if desde <= r[0] < desde + 2]
+    ultimo = retenidos[-1][0]
+    assert historial.puntos_ultimos_minutos(1 / 60, ahora=ultimo + 0.5) == retenidos[-1][1]
+
+
+def test_historial_vacio():
+    historial = HistorialPuntuacion(4)
+    assert historial.puntos_desde(0) == 0
+    assert historial.rango(0, 1000) == []
+    assert [list(columna) for columna in historial.exportar()] == [[], [], []]
@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from linguistica import (clave_fonetica, distancia_edicion, medidor_distancia, nucleo_rima, nucleo_tonico, riman,
+                         silabear)
+
+SILABAS = [
+    # Hiato con débil tónica
+    ("día", ("dí", "a")),
+    ("baúl", ("ba", "úl")),
+    ("país", ("pa", "ís")),
+    ("río", ("rí", "o")),
+    # Hiato entre fuertes y diptongos
+    ("leer", ("le", "er")),
+    ("cielo", ("cie", "lo")),
+    ("aire", ("ai", "re")),
+    ("ahora", ("a", "ho", "ra")),
+    # Grupos inseparables y consonantes agrupadas
+    ("instruir", ("ins", "truir")),
+    ("construir", ("cons", "truir")),
+    ("transporte", ("trans", "por", "te")),
+    ("abstracto", ("abs", "trac", "to")),
+    ("flor", ("flor",)),
+    ("extraño", ("ex", "tra", "ño")),
+    # Dígrafos
+    ("chocolate", ("cho", "co", "la", "te")),
+    ("perro", ("pe", "rro")),
+    ("llave", ("lla", "ve")),
+    # Y final y u muda en que/gui; la ü sí suena
+    ("rey", ("rey",)),
+    ("hoy", ("hoy",)),
+    ("buey", ("buey",)),
+    ("guiso", ("gui", "so")),
+    ("queso", ("que", "so")),
+    ("guerra", ("gue", "rra")),
+    ("pingüino", ("pin", "güi", "no")),
+]
+
+RIMAS = [
+    ("casa", "asa"),
+    ("canción", "on"),
+    ("día", "ia"),
+    ("baúl", "ul"),
+    ("pájaro", "ajaro"),
+    ("árbol", "arbol"),
+    ("rey", "ey"),
+    ("guiso", "iso"),
+    ("queso", "eso"),
+    ("pingüino", "ino"),
+    ("instruir", "ir"),
+    ("cielo", "elo"),
+]
+
+TONICAS = [
+    ("casa", 1),  # Llana terminada en vocal
+    ("flor", 2),  # Aguda terminada en consonante
+    ("canción", 5),  # Tilde
+    ("cielo", 2),  # Diptongo: la fuerte
+    ("instruir", 6),  # Dos débiles: la segunda
+    ("muy", 1),  # Y final: la vocal anterior
+    ("día", 1),
+]
+
+
+@pytest.mark.parametrize("palabra, esperadas", SILABAS)
+def test_silabear(palabra, esperadas):
+    assert silabear(palabra) == esperadas
+
+
+@pytest.mark.parametrize("palabra, nucleo", RIMAS)
+def test_nucleo_rima(palabra, nucleo):
+    assert nucleo_rima(palabra) == nucleo
+
+
+@pytest.mark.parametrize("palabra, posicion", TONICAS)
+def test_nucleo_tonico(palabra, posicion):
+    assert nucleo_tonico(palabra) == posicion
+
+
+def test_nucleo_tonico_sin_vocales():
+    assert nucleo_tonico("pst") is None
+
+
+def test_riman():
+    assert riman("canción", "corazón")
+    assert riman("Casa", "masa")
+    assert not riman("casa", "CASA")
+    assert not riman("casa", "cosa")
+
+
+@pytest.mark.parametrize("palabra, otra", [
+    ("vaca", "baca"),  # b/v
+    ("llave", "yabe"),  # Yeísmo
+    ("cielo", "sielo"),  # Seseo
+    ("zapato", "sapato"),
+    ("queso", "keso"),
+    ("quilo", "kilo"),
+    ("gente", "jente"),
+    ("hielo", "ielo"),  # H muda
+])
+def test_clave_fonetica_iguala_grafias(palabra, otra):
+    assert clave_fonetica(palabra) == clave_fonetica(otra)
+
+
+@pytest.mark.parametrize("palabra, clave", [
+    ("guerra", "geRa"),  # u muda y rr
+    ("guiso", "giso"),
+    ("pingüino", "pinguino"),  # La ü suena
+    ("chocolate", "Cokolate"),
+    ("examen", "eksamen"),
+    ("rey", "rei"),
+    ("Árbol", "arbol"),
+    ("guía", "gia"),  # La tilde no impide leer la u muda ni la c suave
+    ("acción", "aksion"),
+])
+def test_clave_fonetica(palabra, clave):
+    assert clave_fonetica(palabra) == clave
+
+
+def _levenshtein(a, b):
+    fila = list(range(len(b) + 1))
+    for i, letra in enumerate(a, 1):
+        anterior, fila[0] = fila[0], i
+        for j, otra in enumerate(b, 1):
+            anterior, fila[j] = fila[j], min(fila[j] + 1, fila[j - 1] + 1, anterior + (letra != otra))
+    return fila[-1]
+
+
+def test_distancia_edicion_casos_conocidos():
+    assert distancia_edicion("", "") == 0
+    assert distancia_edicion("abc", "") == 3
+    assert distancia_edicion("", "abc") == 3
+    assert distancia_edicion("kitten", "sitting") == 3
+    assert distancia_edicion("casa", "casa") == 0
+
+
+def test_distancia_edicion_coincide_con_la_tabla_completa():
+    aleatorio = random.Random(3)
+    for _ in range(300):
+        # Hasta 80 letras: más de 64 comprueba las máscaras de bits largas
+        a = "".join(aleatorio.choice("abcñ") for _ in range(aleatorio.randint(0, 80)))
+        b = "".join(aleatorio.choice("abcñ") for _ in range(aleatorio.randint(0, 80)))
+        assert distancia_edicion(a, b) == _levenshtein(a, b)
+
+
+def test_medidor_distancia_reutilizable():
+    medir = medidor_distancia("baka")
+    assert [medir(otra) for otra in ("baka", "bata", "ka", "")] == [0, 1, 2, 4]
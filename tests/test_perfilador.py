@@ -0,0 +1,87 @@
+import csv
+import json
+
+import pytest
+
+from perfilador import FASE_NULA, BuferCircular, PerfiladorCuadros
+
+
+def test_bufer_circular_da_la_vuelta():
+    bufer = BuferCircular(3)
+    assert list(bufer.muestras()) == []
+    for valor in (1.0, 2.0):
+        bufer.agregar(valor)
+    assert list(bufer.muestras()) == [1.0, 2.0]
+    for valor in (3.0, 4.0, 5.0):
+        bufer.agregar(valor)
+    # Los dos más antiguos se sobrescribieron; el orden no importa para los percentiles
+    assert sorted(bufer.muestras()) == [3.0, 4.0, 5.0]
+    assert bufer.cantidad == 3
+
+
+def _perfilador_con_cuadros(cuadros, capacidad=600):
+    """Cuadros como listas de (fase, segundos); se acumulan sin medir tiempo real"""
+    perfilador = PerfiladorCuadros(capacidad)
+    for fases in cuadros:
+        for nombre, segundos in fases:
+            perfilador.acumular(nombre, segundos)
+        perfilador.cerrar_cuadro()
+    return perfilador
+
+
+def test_totales_por_fase_y_por_cuadro():
+    perfilador = _perfilador_con_cuadros([
+        [("eventos", 0.001), ("dibujo", 0.002), ("dibujo", 0.003), ("flip", 0.004), ("dibujar_juego", 0.002)],
+        [("eventos", 0.001), ("flip", 0.002)],
+    ])
+    resumen = perfilador.resumen()
+    assert perfilador.cuadros == 2
+    # Las mediciones de una fase dentro del mismo cuadro se suman
+    assert resumen["dibujo"]["muestras"] == 1 and resumen["dibujo"]["max_ms"] == pytest.approx(5)
+    # El cuadro suma solo las fases principales, no las anidadas como dibujar_juego
+    assert sorted(perfilador.buferes["cuadro"].muestras()) == pytest.approx([0.003, 0.010])
+    assert resumen["eventos"]["media_ms"] == pytest.approx(1)
+
+
+def test_percentiles_sobre_los_ultimos_cuadros():
+    perfilador = _perfilador_con_cuadros([[("dibujo", milisegundos / 1000)] for milisegundos in range(1, 201)],
+                                         capacidad=100)
+    dibujo = perfilador.resumen()["dibujo"]
+    assert dibujo["muestras"] == 100  # Solo quedan los cuadros 101..200
+    assert (dibujo["p50_ms"], dibujo["p90_ms"], dibujo["p99_ms"], dibujo["max_ms"]) == pytest.approx((151, 191, 200, 200))
+
+
+def test_cuadro_sin_fases_no_cuenta():
+    perfilador = PerfiladorCuadros()
+    perfilador.cerrar_cuadro()
+    assert perfilador.cuadros == 0 and perfilador.resumen() == {}
+
+
+def test_desactivado_no_mide():
+    perfilador = PerfiladorCuadros(activo=False)
+    assert perfilador.fase("dibujo") is FASE_NULA
+    with perfilador.fase("dibujo"):
+        pass
+    perfilador.cerrar_cuadro()
+    assert perfilador.resumen() == {}
+
+
+def test_fase_mide_tiempo_real():
+    perfilador = PerfiladorCuadros()
+    with perfilador.fase("eventos"):
+        sum(range(1000))
+    perfilador.cerrar_cuadro()
+    assert perfilador.resumen()["eventos"]["max_ms"] > 0
+
+
+@pytest.mark.parametrize("nombre", ["perfil.csv", "perfil.ndjson"])
+def test_volcar(tmp_path, nombre):
+    perfilador = _perfilador_con_cuadros([[("eventos", 0.001), ("flip", 0.002)]])
+    ruta = tmp_path / nombre
+    perfilador.volcar(str(ruta))
+    if nombre.endswith(".csv"):
+        filas = list(csv.DictReader(ruta.open(encoding="utf-8")))
+    else:
+        filas = [json.loads(linea) for linea in ruta.read_text(encoding="utf-8").splitlines()]
+    assert [fila["fase"] for fila in filas] == ["cuadro", "eventos", "flip"]
+    assert float(filas[0]["max_ms"]) == pytest.approx(3)
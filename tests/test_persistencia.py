@@ -0,0 +1,111 @@
+import sqlite3
+
+import pytest
+
+from persistencia import AlmacenProgreso
+
+
+@pytest.fixture
+def almacen(tmp_path):
+    almacen = AlmacenProgreso(str(tmp_path / "progreso.sqlite3"), intervalo=0.01, reintentos=2)
+    yield almacen
+    almacen.cerrar()
+
+
+def test_guarda_y_carga(almacen):
+    almacen.registrar_puntuacion("ana", 30)
+    almacen.registrar_cambio_nivel("ana", "rimas", 2)
+    almacen.registrar_intento("ana", "rimas", 2, "casa", 2, True)
+    assert almacen.vaciar(5)
+    progreso = almacen.cargar("ana")
+    assert (progreso["puntuacion"], progreso["modo"], progreso["nivel"]) == (30, "rimas", 2)
+    assert progreso["palabras"]["casa"]["intentos"] == 2
+
+
+def test_jugador_sin_progreso(almacen):
+    assert almacen.cargar("nadie") == {"jugador": "nadie", "puntuacion": 0, "modo": None, "nivel": 1, "palabras": {}}
+
+
+def test_acumula_intentos_por_palabra(almacen):
+    almacen.registrar_intento("ana", "letras", 1, "sol", 1, True)
+    almacen.registrar_intento("ana", "letras", 1, "sol", 3, False)
+    assert almacen.vaciar(5)
+    palabra = almacen.cargar("ana")["palabras"]["sol"]
+    assert (palabra["intentos"], palabra["aciertos"], palabra["fallos"]) == (4, 1, 3)
+
+
+@pytest.mark.parametrize("max_lote, lotes", [(1000, 1), (100, 5)])
+def test_agrupa_los_registros_en_lotes(tmp_path, max_lote, lotes):
+    # Con un intervalo largo el lote solo se cierra al llenarse o al pedir vaciar()
+    almacen = AlmacenProgreso(str(tmp_path / "progreso.sqlite3"), intervalo=5, max_lote=max_lote)
+    try:
+        for total in range(500):
+            almacen.registrar_puntuacion("ana", total)
+        assert almacen.vaciar(10)
+        assert (almacen.lotes_escritos, almacen.registros_escritos) == (lotes, 500)
+        assert almacen.cargar("ana")["puntuacion"] == 499
+    finally:
+        almacen.cerrar()
+
+
+def test_cerrar_escribe_lo_pendiente(tmp_path):
+    ruta = str(tmp_path / "progreso.sqlite3")
+    almacen = AlmacenProgreso(ruta, intervalo=5)
+    almacen.registrar_puntuacion("ana", 40)
+    almacen.cerrar()
+    otro = AlmacenProgreso(ruta)
+    try:
+        assert otro.cargar("ana")["puntuacion"] == 40
+    finally:
+        otro.cerrar()
+
+
+def test_registrar_tras_cerrar_se_descarta_y_avisa_una_vez(almacen, caplog):
+    almacen.registrar_puntuacion("ana", 10)
+    almacen.cerrar()
+    almacen.registrar_puntuacion("ana", 20)
+    almacen.registrar_intento("ana", "letras", 1, "sol", 1, True)
+    assert almacen.registros_descartados == 2
+    assert caplog.text.count("almacén ya cerrado") == 1
+    assert almacen.cargar("ana")["puntuacion"] == 10
+
+
+def test_reintenta_un_lote_que_falla(almacen, monkeypatch):
+    confirmar = almacen._confirmar
+    fallos = []
+
+    def confirmar_con_fallo(conexion, filas):
+        if len(fallos) < 2:
+            fallos.append(1)
+            raise sqlite3.OperationalError("database is locked")
+        confirmar(conexion, filas)
+
+    monkeypatch.setattr(almacen, "_confirmar", confirmar_con_fallo)
+    almacen.registrar_puntuacion("ana", 10)
+    assert almacen.vaciar(5)
+    assert almacen.cargar("ana")["puntuacion"] == 10
+    assert almacen.registros_descartados == 0
+
+
+def test_descarta_solo_el_registro_invalido(almacen):
+    almacen.registrar_puntuacion("ana", 10)
+    almacen.registrar_puntuacion("ana", object())  # SQLite no sabe guardarlo
+    almacen.registrar_pista("ana", "casa", "Empieza por c")
+    assert almacen.vaciar(5)
+    assert almacen.registros_descartados == 1
+    assert almacen.cargar("ana")["puntuacion"] == 10
+
+    # El hilo escritor sigue vivo
+    almacen.registrar_puntuacion("ana", 20)
+    assert almacen.vaciar(5)
+    assert almacen.cargar("ana")["puntuacion"] == 20
+
+
+def test_vaciar_no_espera_si_el_lote_falla_del_todo(almacen, monkeypatch):
+    def fallar(conexion, filas):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(almacen, "_confirmar", fallar)
+    almacen.registrar_puntuacion("ana", 10)
+    assert almacen.vaciar(5)
+    assert almacen.registros_descartados == 1
@@ -0,0 +1,149 @@
+import random
+
+import pytest
+
+from corpus import clave
+from juego import PlanificadorRepaso, RegistroMuestreo
+
+
+def _planificador(tamano=50, ventana=2, semilla=1, **opciones):
+    return PlanificadorRepaso(tamano, ventana, aleatorio=random.Random(semilla), **opciones)
+
+
+def test_la_fallada_vuelve_antes_que_las_nuevas():
+    planificador = _planificador()
+    fallada = planificador.sacar()
+    planificador.registrar(fallada, correcto=False)
+    siguientes = [planificador.sacar() for _ in range(PlanificadorRepaso.INTERVALOS[0])]
+    # Sale en cuanto vence (caja 0: tres turnos) y ya no está entre las recientes
+    assert fallada not in siguientes[:-1]
+    assert siguientes[-1] == fallada
+
+
+def test_las_vencidas_salen_por_orden_de_vencimiento():
+    planificador = _planificador(ventana=0)
+    primera, segunda = planificador.sacar(), planificador.sacar()
+    planificador.registrar(segunda, correcto=False)
+    planificador.registrar(primera, correcto=False)
+    vistas = [planificador.sacar() for _ in range(4)]
+    assert vistas[-2:] == [segunda, primera]
+
+
+@pytest.mark.parametrize("resultados, caja", [
+    ([(True, 1)], 1),
+    ([(True, 1), (True, 1)], 2),
+    ([(True, 1)] * 10, len(PlanificadorRepaso.INTERVALOS) - 1),  # La última caja es el tope
+    ([(True, 1), (True, 3)], 1),  # Acertar tras varios intentos no sube de caja
+    ([(True, 1), (True, 1), (False, 3)], 0),  # Fallar la devuelve a la primera
+])
+def test_cajas_de_leitner(resultados, caja):
+    planificador = _planificador()
+    posicion = planificador.sacar()
+    assert planificador.caja(posicion) == 0
+    for correcto, intentos in resultados:
+        planificador.registrar(posicion, correcto, intentos)
+    assert planificador.caja(posicion) == caja
+
+
+def test_la_caja_fija_cuando_vuelve():
+    planificador = _planificador()
+    dominada = planificador.sacar()
+    for _ in range(3):
+        planificador.registrar(dominada, correcto=True)
+    turno = planificador.turno
+    vistas = [planificador.sacar() for _ in range(PlanificadorRepaso.INTERVALOS[3] - 1)]
+    assert dominada not in vistas
+    assert planificador.estado[dominada][1] == turno + PlanificadorRepaso.INTERVALOS[3]
+
+
+@pytest.mark.parametrize("tamano, ventana", [(3, 2), (6, 5), (40, 5)])
+def test_no_repite_dentro_de_la_ventana(tamano, ventana):
+    planificador = _planificador(tamano, ventana, semilla=4)
+    aleatorio = random.Random(9)
+    vistas = []
+    for _ in range(300):
+        posicion = planificador.sacar()
+        vistas.append(posicion)
+        planificador.registrar(posicion, aleatorio.random() < 0.6, aleatorio.randint(1, 3))
+    for inicio in range(len(vistas) - ventana):
+        assert len(set(vistas[inicio:inicio + ventana + 1])) == ventana + 1
+    assert set(vistas) == set(range(tamano))
+
+
+def test_el_historial_guardado_fija_la_caja_inicial():
+    historial = {"p3": {"aciertos": 4, "fallos": 1}}
+    planificador = _planificador(tamano=10, historial=historial)
+    cajas = {}
+    for _ in range(40):
+        posicion = planificador.sacar(lambda posicion: f"p{posicion}")
+        cajas.setdefault(posicion, planificador.caja(posicion))
+    assert cajas[3] == 3
+    assert len(cajas) == 10
+    assert all(caja == 0 for posicion, caja in cajas.items() if posicion != 3)
+
+
+def test_proponer_no_programa_la_palabra():
+    planificador = _planificador()
+    propuesta = planificador.siguiente()
+    assert planificador.turno == 0
+    assert planificador.caja(propuesta) is None
+    assert not planificador.bolsa.es_reciente(propuesta)
+    # Sin confirmar, la misma palabra se vuelve a proponer en vez de perderse
+    assert planificador.siguiente() == propuesta
+    planificador.confirmar(propuesta)
+    assert planificador.turno == 1
+    assert planificador.caja(propuesta) == 0
+    assert planificador.bolsa.es_reciente(propuesta)
+
+
+def test_las_rechazadas_no_se_pierden():
+    planificador = _planificador(tamano=5, ventana=0)
+    rechazada = planificador.siguiente()
+    aceptada = planificador.siguiente([rechazada])
+    assert aceptada != rechazada
+    planificador.confirmar(aceptada)
+    assert planificador.caja(rechazada) is None
+    # La rechazada sigue siendo nueva y es la siguiente en salir, sin esperar a que se rellene la bolsa
+    assert planificador.sacar() == rechazada
+    assert planificador.caja(rechazada) == 0
+
+
+def test_una_vencida_rechazada_sigue_pendiente():
+    planificador = _planificador(ventana=0)
+    fallada = planificador.sacar()
+    planificador.registrar(fallada, correcto=False)
+    for _ in range(PlanificadorRepaso.INTERVALOS[0] - 1):
+        planificador.sacar()
+    assert planificador.siguiente() == fallada
+    otra = planificador.siguiente([fallada])
+    assert otra != fallada
+    planificador.confirmar(otra)
+    assert planificador.sacar() == fallada
+
+
+def test_el_registro_solo_programa_la_palabra_aceptada():
+    registro = RegistroMuestreo("prueba", ventana=0)
+    rechazadas = []
+
+    def aceptable(entrada):
+        if len(rechazadas) < 2:
+            rechazadas.append(entrada.palabra)
+            return False
+        return True
+
+    entrada = registro.sacar("UnionLetras", 1, clave("letras", 1), aceptable, propuestas=3)
+    assert entrada.palabra not in rechazadas
+    planificador = registro.planificadores[("UnionLetras", 1, "prueba")]
+    assert planificador.turno == 1
+    assert len(planificador.estado) == 1
+    assert list(registro.posiciones[("UnionLetras", 1)]) == [entrada.palabra]
+
+
+def test_sin_ninguna_aceptable_se_queda_la_ultima():
+    registro = RegistroMuestreo("prueba")
+    propuestas = []
+    entrada = registro.sacar("UnionLetras", 1, clave("letras", 1),
+                             lambda entrada: propuestas.append(entrada.palabra) and False, propuestas=3)
+    assert len(set(propuestas)) == 3
+    assert entrada.palabra == propuestas[-1]
+    assert len(registro.planificadores[("UnionLetras", 1, "prueba")].estado) == 1
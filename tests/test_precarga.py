@@ -0,0 +1,80 @@
+import threading
+
+import pygame
+import pytest
+
+from juego import AplicacionAlfabetizacion, Boton
+
+
+@pytest.fixture
+def app():
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    app.seleccionar_modo(0)
+    app.seleccionar_nivel(1)
+    app.iniciar_actividad()
+    yield app
+    app.cerrar()
+
+
+def test_usa_la_actividad_precargada(app):
+    app._precargar(app.nivel_actual)
+    actividad, botones, _ = app._precarga[2].result()
+    app.siguiente_actividad()
+    assert app._precarga is None
+    assert app.actividad_actual is actividad
+    assert app.elementos_botones is botones
+
+
+def test_precarga_de_otro_nivel_se_descarta(app):
+    app._precargar(app.nivel_actual + 1)
+    futuro = app._precarga[2]
+    futuro.result()
+    app.siguiente_actividad()
+    assert app._precarga is None
+    assert app.actividad_actual is not futuro.result()[0]
+
+
+def test_precarga_fallida_se_prepara_en_el_hilo_principal(app, monkeypatch, caplog):
+    preparar = app._preparar_actividad
+
+    def fallar_en_segundo_plano(modo, nivel):
+        if threading.current_thread() is not threading.main_thread():
+            raise RuntimeError("corpus roto")
+        return preparar(modo, nivel)
+
+    monkeypatch.setattr(app, "_preparar_actividad", fallar_en_segundo_plano)
+    anterior = app.actividad_actual
+    app._precargar(app.nivel_actual)
+    app.siguiente_actividad()
+    assert app.actividad_actual is not anterior
+    assert "Falló la precarga" in caplog.text
+
+
+def test_precargar_dos_veces_aprovecha_la_precarga_en_marcha(app, monkeypatch):
+    preparar = app._preparar_actividad
+    preparadas = []
+
+    def contar(modo, nivel):
+        preparadas.append(nivel)
+        return preparar(modo, nivel)
+
+    monkeypatch.setattr(app, "_preparar_actividad", contar)
+    app._precargar(app.nivel_actual)
+    futuro = app._precarga[2]
+    app._precargar(app.nivel_actual)
+    assert app._precarga[2] is futuro
+    futuro.result()
+    assert preparadas == [app.nivel_actual]  # Una sola palabra sorteada
+
+
+def test_precargar_otro_nivel_devuelve_los_controles_de_la_anterior(app):
+    app._precargar(app.nivel_actual)
+    anterior = app._precarga[2]
+    _, botones, _ = anterior.result()
+    app._precargar(app.nivel_actual + 1)
+    assert app._precarga[1] == app.nivel_actual + 1
+    _, nuevos, _ = app._precarga[2].result()
+    # Vuelven a la reserva, de donde la nueva precarga puede haberlos tomado
+    disponibles = app.reserva_widgets.libres.get(Boton, []) + nuevos
+    assert all(any(boton is disponible for disponible in disponibles) for boton in botones)
@@ -0,0 +1,14 @@
+from juego import GestorPuntuacion
+
+
+def test_un_aumento_grande_cruza_varios_hitos():
+    gestor = GestorPuntuacion()
+    assert gestor.aumentar_puntuacion(90) == {"puntuacion": 90, "hitos": [], "cambio_nivel": True}
+    assert gestor.aumentar_puntuacion(250)["hitos"] == [100, 200, 300]
+    assert gestor.aumentar_puntuacion(5) == {"puntuacion": 345, "hitos": [], "cambio_nivel": False}
+
+
+def test_cambio_de_nivel_cada_cincuenta_puntos():
+    gestor = GestorPuntuacion()
+    cambios = [gestor.aumentar_puntuacion(10)["cambio_nivel"] for _ in range(10)]
+    assert cambios == [False, False, False, False, True, False, False, False, False, True]
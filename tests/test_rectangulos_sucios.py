@@ -0,0 +1,67 @@
+from types import SimpleNamespace
+
+import pygame
+
+from juego import AplicacionAlfabetizacion
+
+
+def _sucios(previas, regiones):
+    aplicacion = SimpleNamespace(_regiones_previas=previas)
+    return sorted(tuple(rect) for rect in AplicacionAlfabetizacion._calcular_rectangulos_sucios(aplicacion, regiones))
+
+
+def test_sin_cambios_no_hay_rectangulos_sucios():
+    regiones = {"a": (pygame.Rect(0, 0, 10, 10), "casa"), "b": (pygame.Rect(20, 0, 10, 10), 3)}
+    assert _sucios(regiones, dict(regiones)) == []
+
+
+def test_solo_la_region_que_cambia_de_aspecto():
+    previas = {"a": (pygame.Rect(0, 0, 10, 10), "casa"), "b": (pygame.Rect(20, 0, 10, 10), 3)}
+    regiones = {"a": (pygame.Rect(0, 0, 10, 10), "casa"), "b": (pygame.Rect(20, 0, 10, 10), 4)}
+    assert _sucios(previas, regiones) == [(20, 0, 10, 10)]
+
+
+def test_region_movida_incluye_la_posicion_anterior():
+    previas = {"a": (pygame.Rect(0, 0, 10, 10), "casa")}
+    regiones = {"a": (pygame.Rect(50, 0, 10, 10), "casa")}
+    assert _sucios(previas, regiones) == [(0, 0, 10, 10), (50, 0, 10, 10)]
+
+
+def test_regiones_que_aparecen_y_desaparecen():
+    previas = {"vieja": (pygame.Rect(0, 0, 10, 10), 1)}
+    regiones = {"nueva": (pygame.Rect(30, 30, 5, 5), 1)}
+    assert _sucios(previas, regiones) == [(0, 0, 10, 10), (30, 30, 5, 5)]
+
+
+def test_muchos_cambios_se_funden_en_un_rectangulo():
+    previas = {i: (pygame.Rect(i * 10, 0, 10, 10), 0) for i in range(10)}
+    regiones = {i: (pygame.Rect(i * 10, 0, 10, 10), 1) for i in range(10)}
+    assert _sucios(previas, regiones) == [(0, 0, 100, 10)]
+
+
+def test_un_solo_dibujo_por_cuadro_recortado_a_la_envolvente(monkeypatch):
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    try:
+        app.mostrar_modal = False
+        app.dibujar_cuadro()  # Primer cuadro: completo
+        recortes = []
+        presentados = []
+        dibujar_escena = app.dibujar_escena
+        monkeypatch.setattr(app, "dibujar_escena", lambda: (recortes.append(app.pantalla.get_clip()), dibujar_escena()))
+        monkeypatch.setattr(app, "_presentar", lambda rects=None: presentados.append(rects))
+
+        app.dibujar_cuadro()
+        assert recortes == [] and presentados == []  # Nada cambió: ni se dibuja ni se presenta
+
+        app.gestor_puntuacion.aumentar_puntuacion(10)
+        app.btn_iniciar.texto = "¡Vamos!"
+        app.dibujar_cuadro()
+        assert len(recortes) == 1
+        (sucios,) = presentados
+        assert sorted(map(tuple, sucios)) == sorted([tuple(app.btn_iniciar.rect),
+                                                     (app.ancho // 2, 10, app.ancho // 2, 40)])
+        assert recortes[0] == sucios[0].unionall(sucios[1:])
+        assert app.pantalla.get_clip() == app.pantalla.get_rect()
+    finally:
+        app.cerrar()
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+
+import pygame
+import pytest
+
+from juego import AplicacionAlfabetizacion
+
+
+@pytest.fixture
+def reloj(monkeypatch):
+    """Reloj de pygame controlado por la prueba (milisegundos)"""
+    reloj = SimpleNamespace(ahora=10000)
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: reloj.ahora)
+    return reloj
+
+
+def _aplicacion(**estado):
+    valores = {"temporizadores": {}, "mensaje_feedback": "", "estado": "juego", "timer_feedback": 0}
+    valores.update(estado)
+    return SimpleNamespace(**valores)
+
+
+def _plazo(aplicacion):
+    return AplicacionAlfabetizacion._proximo_plazo(aplicacion)
+
+
+def test_sin_nada_pendiente_se_espera_sin_plazo(reloj):
+    assert _plazo(_aplicacion()) is None
+
+
+def test_el_plazo_es_el_temporizador_mas_cercano(reloj):
+    aplicacion = _aplicacion()
+    AplicacionAlfabetizacion.programar_evento(aplicacion, pygame.USEREVENT, 2000)
+    AplicacionAlfabetizacion.programar_evento(aplicacion, pygame.USEREVENT + 1, 500)
+    assert _plazo(aplicacion) == 500
+    reloj.ahora += 400
+    assert _plazo(aplicacion) == 100
+
+
+def test_la_retroalimentacion_caduca_a_los_cinco_segundos(reloj):
+    aplicacion = _aplicacion(mensaje_feedback="¡Correcto!", timer_feedback=reloj.ahora - 1000)
+    assert _plazo(aplicacion) == 4000
+    reloj.ahora += 4000
+    assert _plazo(aplicacion) is None  # Ya caducó: no hay motivo para despertar
+    assert _plazo(_aplicacion(mensaje_feedback="¡Correcto!", timer_feedback=reloj.ahora, estado="menu")) is None
+
+
+def test_un_plazo_vencido_despierta_enseguida(reloj):
+    aplicacion = _aplicacion(temporizadores={pygame.USEREVENT: reloj.ahora - 50})
+    assert _plazo(aplicacion) == 1
@@ -0,0 +1,72 @@
+import pygame
+import pytest
+
+from juego import AplicacionAlfabetizacion, Boton, Checkbox, ReservaWidgets
+
+
+def test_tomar_y_devolver():
+    reserva = ReservaWidgets()
+    assert reserva.tomar(Boton, 3) == []
+    botones = [Boton(0, 0, 10, 10, letra) for letra in "abc"]
+    reserva.devolver(Boton, botones)
+    assert reserva.tomar(Checkbox, 2) == []  # Cada clase tiene sus propios libres
+    tomados = reserva.tomar(Boton, 2)
+    assert len(tomados) == 2 and all(boton in botones for boton in tomados)
+    assert len(reserva.tomar(Boton, 5)) == 1
+    assert reserva.tomar(Boton, 1) == []
+    assert (reserva.reutilizados, reserva.creados) == (3, 10)
+
+
+def test_la_reserva_esta_acotada():
+    reserva = ReservaWidgets(maximo=4)
+    for _ in range(3):
+        reserva.devolver(Boton, [Boton(0, 0, 10, 10, "x") for _ in range(3)])
+    assert len(reserva.libres[Boton]) == 4
+
+
+def test_configurar_no_arrastra_estado():
+    boton = Boton(0, 0, 10, 10, "a", accion=print, param=(0, "a"))
+    boton.activo = False
+    boton.configurar(5, 6, 20, 30, "b")
+    assert (tuple(boton.rect), boton.texto, boton.activo, boton.accion, boton.param) == ((5, 6, 20, 30), "b", True, None, None)
+    checkbox = Checkbox(0, 0, 100, 20, "casa")
+    checkbox.valor = True
+    checkbox.configurar(10, 10, 100, 30, "masa")
+    assert (checkbox.texto, checkbox.valor, tuple(checkbox.check_rect)) == ("masa", False, (10, 10, 30, 30))
+
+
+@pytest.fixture
+def app():
+    pygame.init()
+    app = AplicacionAlfabetizacion(sin_ventana=True)
+    yield app
+    app.cerrar()
+
+
+@pytest.mark.parametrize("modo", [0, 2])  # Letras (botones) y rimas (checkboxes)
+def test_las_actividades_reutilizan_controles_limpios(app, modo):
+    app.seleccionar_modo(modo)
+    app.seleccionar_nivel(2)
+    app.iniciar_actividad()
+    for _ in range(30):
+        # Ensuciar los controles como lo haría el jugador
+        if app.elementos_botones:
+            app.agregar_elemento(app.elementos_botones[0].param)
+            assert not app.elementos_botones[0].activo
+        for checkbox in app.checkboxes_rimas:
+            checkbox.valor = True
+        app.siguiente_actividad()
+
+        elementos = app.actividad_actual.datos["elementos"]
+        if app.elementos_botones:
+            assert [boton.texto for boton in app.elementos_botones] == list(elementos)
+            assert [boton.param for boton in app.elementos_botones] == list(enumerate(elementos))
+            assert all(boton.activo for boton in app.elementos_botones)
+        else:
+            assert [checkbox.texto for checkbox in app.checkboxes_rimas] == list(elementos)
+            assert not any(checkbox.valor for checkbox in app.checkboxes_rimas)
+        assert app.respuesta_actual == ""
+
+    reserva = app.reserva_widgets
+    assert reserva.reutilizados > reserva.creados
+    assert all(len(libres) <= reserva.maximo for libres in reserva.libres.values())
@@ -0,0 +1,144 @@
+import asyncio
+import json
+
+import servidor
+from persistencia import AlmacenProgreso
+
+
+def _con_servidor(escenario, servidor_sesiones=None):
+    """Arranca el servidor en un puerto libre y ejecuta escenario(servidor_sesiones, cliente)"""
+    servidor_sesiones = servidor_sesiones or servidor.ServidorSesiones()
+
+    async def probar():
+        tcp = await asyncio.start_server(servidor_sesiones._cliente, "127.0.0.1", 0)
+        puerto = tcp.sockets[0].getsockname()[1]
+        cliente = await servidor.ClienteSesion.conectar("127.0.0.1", puerto)
+        try:
+            return await escenario(servidor_sesiones, cliente)
+        finally:
+            await cliente.cerrar()
+            tcp.close()
+            await tcp.wait_closed()
+
+    return asyncio.run(probar())
+
+
+async def _pedir(cliente, peticion):
+    """Envía una línea tal cual y devuelve la respuesta sin interpretar errores"""
+    linea = peticion if isinstance(peticion, bytes) else json.dumps(peticion).encode("utf-8")
+    cliente.escritor.write(linea + b"\n")
+    await cliente.escritor.drain()
+    return json.loads(await cliente.lector.readline())
+
+
+def test_partida_completa():
+    async def escenario(servidor_sesiones, cliente):
+        sesion = (await cliente.pedir("crear", jugador="ana"))["sesion"]
+        estado = (await cliente.pedir("iniciar", sesion=sesion, modo="letras", nivel=1))["estado"]
+        assert estado["jugador"] == "ana" and estado["modo"] == "letras"
+        assert "solucion" not in estado["actividad"]
+        solucion = servidor_sesiones.sesiones[sesion].actividad_actual.datos["solucion"]
+        resultado = (await cliente.pedir("verificar", sesion=sesion, respuesta=solucion))["resultado"]
+        assert resultado["correcto"] and resultado["puntos"] > 0 and resultado["siguiente"]
+        await cliente.pedir("siguiente", sesion=sesion, cambio_nivel=False)
+        assert (await cliente.pedir("cerrar", sesion=sesion))["puntuacion"] == resultado["puntuacion"]
+        assert (await cliente.pedir("metricas"))["sesiones_activas"] == 0
+
+    _con_servidor(escenario)
+
+
+def test_errores_no_cortan_la_conexion():
+    async def escenario(servidor_sesiones, cliente):
+        respuestas = [
+            await _pedir(cliente, b"{esto no es json"),
+            await _pedir(cliente, {"id": 7, "op": "bailar"}),
+            await _pedir(cliente, {"id": 8, "op": "estado", "sesion": "s99"}),
+            await _pedir(cliente, {"op": "iniciar"}),
+            await _pedir(cliente, [1, 2]),
+        ]
+        assert all(respuesta["ok"] is False and respuesta["error"] for respuesta in respuestas)
+        assert respuestas[1]["id"] == 7 and "bailar" in respuestas[1]["error"]
+        assert respuestas[2]["id"] == 8 and "s99" in respuestas[2]["error"]
+
+        sesion = (await cliente.pedir("crear"))["sesion"]
+        sin_actividad = await _pedir(cliente, {"op": "verificar", "sesion": sesion, "respuesta": "sol"})
+        assert sin_actividad["ok"] is False
+        fuera_de_rango = await _pedir(cliente, {"op": "iniciar", "sesion": sesion, "modo": "letras", "nivel": 9})
+        assert fuera_de_rango["ok"] is False
+        assert (await cliente.pedir("estado", sesion=sesion))["ok"]
+
+    _con_servidor(escenario)
+
+
+def test_una_actividad_resuelta_no_vuelve_a_puntuar():
+    async def escenario(servidor_sesiones, cliente):
+        sesion = (await cliente.pedir("crear"))["sesion"]
+        await cliente.pedir("iniciar", sesion=sesion, modo="letras", nivel=1)
+        solucion = servidor_sesiones.sesiones[sesion].actividad_actual.datos["solucion"]
+        resultado = (await cliente.pedir("verificar", sesion=sesion, respuesta=solucion))["resultado"]
+        assert resultado["siguiente"] == "actividad"
+        repetida = await _pedir(cliente, {"op": "verificar", "sesion": sesion, "respuesta": solucion})
+        assert repetida["ok"] is False and "terminó" in repetida["error"]
+
+        # Sin haber llegado a "nivel", cambio_nivel no sube de nivel
+        estado = (await cliente.pedir("siguiente", sesion=sesion, cambio_nivel=True))["estado"]
+        assert estado["nivel"] == 1 and estado["puntuacion"] == resultado["puntuacion"]
+
+        # Agotar los intentos también cierra la actividad
+        for _ in range(3):
+            fallo = (await cliente.pedir("verificar", sesion=sesion, respuesta="-"))["resultado"]
+        assert fallo["siguiente"] == "actividad" and not fallo["correcto"]
+        solucion = servidor_sesiones.sesiones[sesion].actividad_actual.datos["solucion"]
+        tardia = await _pedir(cliente, {"op": "verificar", "sesion": sesion, "respuesta": solucion})
+        assert tardia["ok"] is False
+        assert (await cliente.pedir("estado", sesion=sesion))["estado"]["puntuacion"] == resultado["puntuacion"]
+
+        await cliente.pedir("siguiente", sesion=sesion)
+        solucion = servidor_sesiones.sesiones[sesion].actividad_actual.datos["solucion"]
+        assert (await cliente.pedir("verificar", sesion=sesion, respuesta=solucion))["resultado"]["correcto"]
+
+    _con_servidor(escenario)
+
+
+def test_un_error_inesperado_no_corta_la_conexion(monkeypatch):
+    servidor_sesiones = servidor.ServidorSesiones()
+    atender = servidor_sesiones.atender
+
+    def atender_con_fallo(peticion):
+        if peticion.get("op") == "estado":
+            raise RuntimeError("fallo interno")
+        return atender(peticion)
+
+    monkeypatch.setattr(servidor_sesiones, "atender", atender_con_fallo)
+
+    async def escenario(servidor_sesiones, cliente):
+        sesion = (await cliente.pedir("crear"))["sesion"]
+        respuesta = await _pedir(cliente, {"id": 3, "op": "estado", "sesion": sesion})
+        assert respuesta == {"ok": False, "error": "Error interno: RuntimeError", "id": 3}
+        assert (await cliente.pedir("metricas"))["sesiones_activas"] == 1
+
+    _con_servidor(escenario, servidor_sesiones)
+
+
+def test_maximo_de_sesiones():
+    async def escenario(servidor_sesiones, cliente):
+        await cliente.pedir("crear")
+        respuesta = await _pedir(cliente, {"op": "crear"})
+        assert respuesta["ok"] is False and "máximo" in respuesta["error"]
+
+    _con_servidor(escenario, servidor.ServidorSesiones(max_sesiones=1))
+
+
+def test_crear_recupera_el_progreso_guardado(tmp_path):
+    almacen = AlmacenProgreso(str(tmp_path / "progreso.sqlite3"), intervalo=0.01)
+    try:
+        almacen.registrar_puntuacion("ana", 70)
+        assert almacen.vaciar(5)
+
+        async def escenario(servidor_sesiones, cliente):
+            assert (await cliente.pedir("crear", jugador="ana"))["estado"]["puntuacion"] == 70
+            assert (await cliente.pedir("crear", jugador="bea"))["estado"]["puntuacion"] == 0
+
+        _con_servidor(escenario, servidor.ServidorSesiones(almacen=almacen))
+    finally:
+        almacen.cerrar()
@@ -0,0 +1,13 @@
+import pytest
+
+from simulacion import simular
+
+
+@pytest.mark.parametrize("dibujar", [False, True])
+def test_el_bot_completa_todas_las_sesiones(dibujar):
+    # Seis sesiones: los dos modos en los tres niveles
+    resultado = simular(6, 3, tasa_error=0.5, dibujar=dibujar, semilla=7)
+    assert resultado["sesiones"] == 6
+    assert resultado["actividades"] == 18
+    assert resultado["eventos"] > resultado["actividades"]
+    assert resultado["sesiones_por_segundo"] > 0